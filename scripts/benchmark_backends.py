@@ -0,0 +1,91 @@
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+import db_backend
+from dashboard_queries import PAGE_QUERIES
+from schema_catalog import SchemaCatalog
+
+# Load the same data into every backend first, each embedded backend into
+# its own file, e.g.
+#   DB_BACKEND=sqlite DB_PATH=phonepe_pulse.sqlite python extract_and_load.py
+#   DB_BACKEND=duckdb DB_PATH=phonepe_pulse.duckdb python extract_and_load.py
+
+
+def time_page(cursor, queries, repeats):
+    """Median wall time (ms) to run all of a page's (rendered) queries once"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for query in queries:
+            cursor.execute(query)
+            cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dashboard page query latency across backends")
+    parser.add_argument("--backends", default="mysql,sqlite,duckdb",
+                        help="comma separated backends to compare")
+    parser.add_argument("--repeats", type=int, default=20, help="runs per page (median is reported)")
+    parser.add_argument("--year", type=int, default=2023)
+    parser.add_argument("--quarter", type=int, default=1)
+    parser.add_argument("--state", default="tamil-nadu")
+    for backend in db_backend.EMBEDDED_BACKENDS:
+        parser.add_argument(f"--{backend}-path",
+                            help=f"{backend} file to read (default: <repo>/<DB_NAME>.{backend})")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # DB_PATH names a single file; every embedded backend reads its own here
+    db_name = os.getenv("DB_NAME") or "phonepe_pulse"
+    db_paths = {backend: getattr(args, f"{backend}_path")
+                or os.path.join(db_backend.REPO_DIR, f"{db_name}.{backend}")
+                for backend in db_backend.EMBEDDED_BACKENDS}
+    if len(set(db_paths.values())) < len(db_paths):
+        parser.error("each embedded backend needs its own file")
+    params = {"year": args.year, "quarter": args.quarter, "state": args.state,
+              "from_year": 2018, "to_year": args.year}
+
+    results = {}
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        os.environ["DB_BACKEND"] = backend
+        if backend in db_paths:
+            os.environ["DB_PATH"] = db_paths[backend]
+        try:
+            conn, cursor = db_backend.connect()
+        except Exception as e:
+            print(f"⚠️ Skipping {backend}: {e}")
+            continue
+
+        print(f"📊 {db_backend.describe_backend()}")
+        results[backend] = {}
+        catalog = SchemaCatalog.load(cursor)
+        for page, queries in PAGE_QUERIES.items():
+            try:
+                rendered = [catalog.render(query, **params) for query in queries]
+                results[backend][page] = time_page(cursor, rendered, args.repeats)
+            except Exception as e:
+                print(f"⚠️ {backend} / {page}: {e}")
+        cursor.close()
+        conn.close()
+
+    if not results:
+        print("No backend could be reached.")
+        return
+
+    backends = list(results)
+    print()
+    print(f"{'page':<24}" + "".join(f"{b + ' (ms)':>16}" for b in backends))
+    for page in PAGE_QUERIES:
+        row = "".join(f"{results[b][page]:>16.2f}" if page in results[b] else f"{'-':>16}"
+                      for b in backends)
+        print(f"{page:<24}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from bulk_loader import build_insert_query, bulk_insert
+from datasets import DATASETS, create_table_sql
+from db_backend import connect, describe_backend
+from load_pipeline import SQL_DTYPES
+from star_schema import fact_columns
+
+# Dataset whose table layout is benchmarked, and the scratch copy dropped after the run
+BENCH_DATASET = "aggregated_transaction"
+BENCH_TABLE = "bench_aggregated_transaction"
+
+
+def make_sample_frame(rows):
+    """Build a synthetic chunk as the loader writes it to aggregated_transaction.
+
+    Labels are already swapped for dimension keys and every column has its
+    table dtype; keys are enumerated so rows never collide on the primary key.
+    """
+    rng = random.Random(42)
+    i = np.arange(rows)
+    df = pd.DataFrame({
+        'State_id': i // 140 + 1,
+        'Year': 2018 + (i // 20) % 7,
+        'Quarter': (i // 5) % 4 + 1,
+        'Transacion_type_id': i % 5 + 1,
+        'Transacion_count': [rng.randint(1, 10_000_000) for _ in range(rows)],
+        'Transacion_amount': [rng.random() * 1e10 for _ in range(rows)],
+    })
+    return df.astype({column: SQL_DTYPES.get(sql_type.split('(')[0], object)
+                      for column, sql_type in fact_columns(DATASETS[BENCH_DATASET]['columns'])})
+
+
+def reset_table(cursor):
+    """Recreate the scratch table with the dataset's typed layout and primary key"""
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    cursor.execute(create_table_sql(BENCH_DATASET, BENCH_TABLE))
+
+
+def time_row_by_row(conn, cursor, df):
+    """Old loader behaviour: one cursor.execute per row"""
+    reset_table(cursor)
+    insert_query = build_insert_query(BENCH_TABLE, list(df.columns))
+    start = time.perf_counter()
+    for row in df.astype(object).itertuples(index=False, name=None):
+        cursor.execute(insert_query, row)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def time_bulk(conn, cursor, df, batch_size):
+    """New loader behaviour: batched multi-row inserts"""
+    reset_table(cursor)
+    start = time.perf_counter()
+    bulk_insert(cursor, BENCH_TABLE, df, batch_size=batch_size)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row-by-row and batched inserts on the configured backend")
+    parser.add_argument("--rows", type=int, default=20000, help="number of synthetic rows")
+    parser.add_argument("--batch-sizes", default="500,1000,5000,10000",
+                        help="comma separated batch sizes to try")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn, cursor = connect(create_database=True)
+
+    df = make_sample_frame(args.rows)
+    print(f"📊 Benchmarking {len(df)} rows against {describe_backend()}")
+
+    elapsed = time_row_by_row(conn, cursor, df)
+    baseline = len(df) / elapsed
+    print(f"{'row-by-row':>20}: {elapsed:8.2f}s  {baseline:12,.0f} rows/sec")
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(",") if b.strip()]:
+        elapsed = time_bulk(conn, cursor, df, batch_size)
+        rate = len(df) / elapsed
+        print(f"{'batch ' + str(batch_size):>20}: {elapsed:8.2f}s  {rate:12,.0f} rows/sec"
+              f"  ({rate / baseline:.1f}x)")
+
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print("✅ Benchmark finished.")
+
+
+if __name__ == "__main__":
+    main()
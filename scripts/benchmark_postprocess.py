@@ -0,0 +1,80 @@
+import argparse
+import random
+import statistics
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from postprocess import safe_float_conversion, format_number, rows_to_frame, safe_ratio, format_amounts
+
+COLUMNS = ['District', 'Total_Count', 'Total_Amount']
+
+
+def make_rows(n_rows, seed=42):
+    """District rows as MySQL returns them: str, Decimal SUMs, and the odd NULL / zero count"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        count = Decimal(rng.randint(0, 50_000_000)) if i % 97 else None
+        amount = Decimal(f"{rng.uniform(0, 5e10):.2f}")
+        rows.append((f"district-{i}", count, amount))
+    return rows
+
+
+def row_by_row(rows):
+    """The dashboard's original post-processing: apply() per value and per row"""
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df['Total_Count'] = df['Total_Count'].apply(safe_float_conversion)
+    df['Total_Amount'] = df['Total_Amount'].apply(safe_float_conversion)
+    df['Avg_Amount'] = df.apply(
+        lambda row: safe_float_conversion(row['Total_Amount'] / row['Total_Count'])
+        if row['Total_Count'] > 0 else 0, axis=1
+    )
+    df['Total_Amount_Formatted'] = df['Total_Amount'].apply(format_number)
+    return df
+
+
+def vectorised(rows):
+    """postprocess.py: bulk float64 conversion, masked division, bulk labels"""
+    df = rows_to_frame(rows, COLUMNS, numeric=['Total_Count', 'Total_Amount'])
+    df['Avg_Amount'] = safe_ratio(df['Total_Amount'], df['Total_Count'])
+    df['Total_Amount_Formatted'] = format_amounts(df['Total_Amount'])
+    return df
+
+
+def time_it(func, rows, repeats):
+    """Median wall time (ms) of func(rows)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row-by-row and vectorised dashboard post-processing")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows in the synthetic district frame")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per variant (median is reported)")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    # Both variants must produce the same frame
+    expected, actual = row_by_row(rows), vectorised(rows)
+    for column in ['Total_Count', 'Total_Amount', 'Avg_Amount']:
+        assert np.allclose(expected[column].astype(float), actual[column]), column
+    assert (expected['Total_Amount_Formatted'] == actual['Total_Amount_Formatted']).all()
+
+    slow = time_it(row_by_row, rows, args.repeats)
+    fast = time_it(vectorised, rows, args.repeats)
+    print(f"📊 Post-processing {args.rows:,} district rows (median of {args.repeats})")
+    print(f"{'row-by-row apply()':<22}{slow:>10.1f} ms")
+    print(f"{'vectorised':<22}{fast:>10.1f} ms")
+    print(f"⚡ {slow / fast:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
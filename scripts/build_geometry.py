@@ -0,0 +1,371 @@
+import argparse
+import glob
+import json
+import os
+from collections import defaultdict, deque
+
+import numpy as np
+
+from datasets import get_data_dir
+from india_geometry import GEOMETRY_DIR, GEOMETRY_LEVELS, STATE_IDS, geometry_path, state_slug
+
+# Country-level insurance heat map: grid points labelled with their state
+PULSE_GRID_SOURCE = ('map', 'insurance', 'country', 'india')
+
+# Vertices are written with 3 decimals (~100 m), plenty at state level
+COORDINATE_DECIMALS = 3
+
+# Alternative state names found in public India GeoJSON files
+STATE_NAME_ALIASES = {
+    'andaman-&-nicobar-island': 'andaman-&-nicobar-islands',
+    'andaman-&-nicobar': 'andaman-&-nicobar-islands',
+    'nct-of-delhi': 'delhi',
+    'orissa': 'odisha',
+    'pondicherry': 'puducherry',
+    'uttaranchal': 'uttarakhand',
+    'dadra-&-nagar-haveli': 'dadra-&-nagar-haveli-&-daman-&-diu',
+    'daman-&-diu': 'dadra-&-nagar-haveli-&-daman-&-diu',
+    'dadara-&-nagar-havelli': 'dadra-&-nagar-haveli-&-daman-&-diu',
+    'the-dadra-&-nagar-haveli-&-daman-&-diu': 'dadra-&-nagar-haveli-&-daman-&-diu',
+}
+NAME_PROPERTIES = ('ST_NM', 'st_nm', 'NAME_1', 'name', 'State', 'state')
+
+# Credit written into outlines traced from the Pulse grid. They follow the
+# grid cells, not surveyed borders: edges are stepped and small islands may
+# be missing, so the dashboard labels maps drawn with them as approximate.
+TRACED_ATTRIBUTION = ("Approximate outlines traced from the PhonePe Pulse insurance grid; "
+                      "not official state boundaries")
+
+
+# -- Simplification -----------------------------------------------------------
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker: keep the vertices farther than tolerance from the simplified line"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack += [(first, split), (split, last)]
+    return points[keep]
+
+
+def simplify_ring(ring, tolerance):
+    """Simplified closed ring, or None when it collapses below a triangle"""
+    points = np.asarray(ring, dtype=np.float64)
+    if len(points) < 4:
+        return None
+    # Split at the vertex farthest from the start so both halves are open lines
+    split = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    if split == 0:
+        return None
+    ring = np.concatenate([simplify_line(points[:split + 1], tolerance)[:-1],
+                           simplify_line(points[split:], tolerance)])
+    return ring if len(ring) >= 4 else None
+
+
+def signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+def contains(ring, point):
+    """Even-odd point in polygon test"""
+    x, y = ring[:, 0], ring[:, 1]
+    crosses = (y[:-1] > point[1]) != (y[1:] > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at_x = x[:-1] + (point[1] - y[:-1]) * (x[1:] - x[:-1]) / (y[1:] - y[:-1])
+    return bool(np.count_nonzero(crosses & (point[0] < at_x)) % 2)
+
+
+def simplify_polygons(polygons, tolerance):
+    """Simplify [[outer, hole, ...], ...] rings, dropping collapsed ones.
+
+    A state whose every polygon collapses keeps its largest outer ring
+    unsimplified, so small union territories never vanish from the map.
+    """
+    simplified = []
+    for rings in polygons:
+        outer = simplify_ring(rings[0], tolerance)
+        if outer is None:
+            continue
+        holes = [hole for hole in (simplify_ring(ring, tolerance) for ring in rings[1:]) if hole is not None]
+        simplified.append([outer] + holes)
+    if not simplified:
+        largest = max(polygons, key=lambda rings: abs(signed_area(np.asarray(rings[0]))))
+        simplified = [[np.asarray(largest[0])]]
+    return simplified
+
+
+# -- Outlines from the Pulse grid ---------------------------------------------
+
+def read_pulse_grid(data_dir):
+    """(lat, lng, state slug) arrays from every country-level map/insurance file"""
+    lats, lngs, states = [], [], []
+    pattern = os.path.join(data_dir, *PULSE_GRID_SOURCE, '*', '*.json')
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f).get('data', {}).get('data', {})
+        columns = entries.get('columns', [])
+        for row in entries.get('data', []):
+            row_dict = dict(zip(columns, row))
+            if None in (row_dict.get('lat'), row_dict.get('lng'), row_dict.get('label')):
+                continue
+            lats.append(row_dict['lat'])
+            lngs.append(row_dict['lng'])
+            states.append(state_slug(row_dict['label']))
+    return np.array(lats), np.array(lngs), states
+
+
+def neighbour_counts(labels, n_states):
+    """(state, row, col) count of 8-neighbours carrying each label"""
+    one_hot = np.zeros((n_states,) + labels.shape, dtype=np.int16)
+    rows, cols = np.nonzero(labels >= 0)
+    one_hot[labels[rows, cols], rows, cols] = 1
+    counts = np.zeros_like(one_hot)
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            if di or dj:
+                counts += np.roll(np.roll(one_hot, di, axis=1), dj, axis=2)
+    return counts
+
+
+def grow(labels, n_states, steps, min_neighbours=1):
+    """Give empty cells the most common label among their neighbours, steps times"""
+    for _ in range(steps):
+        counts = neighbour_counts(labels, n_states)
+        total = counts.sum(axis=0)
+        fill = (labels < 0) & (total >= min_neighbours)
+        labels = np.where(fill, counts.argmax(axis=0), labels)
+    return labels
+
+
+def outside_cells(occupied):
+    """Empty cells connected to the grid border (everything else empty is a hole)"""
+    outside = np.zeros_like(occupied)
+    height, width = occupied.shape
+    queue = deque((i, j) for i in range(height) for j in (0, width - 1) if not occupied[i, j])
+    queue.extend((i, j) for j in range(width) for i in (0, height - 1) if not occupied[i, j])
+    while queue:
+        i, j = queue.popleft()
+        if outside[i, j]:
+            continue
+        outside[i, j] = True
+        for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+            if 0 <= ni < height and 0 <= nj < width and not occupied[ni, nj] and not outside[ni, nj]:
+                queue.append((ni, nj))
+    return outside
+
+
+def rasterise(lats, lngs, states, cell, closing):
+    """Grid of state indexes (-1 = outside India) from labelled points.
+
+    Each cell takes the state with most points in it; a morphological
+    closing of `closing` cells then fills the gaps between sparse points
+    without moving the coastline, and enclosed holes are filled last.
+    """
+    slugs = sorted(set(states))
+    codes = np.array([slugs.index(state) for state in states])
+    pad = closing + 2
+    lat0, lng0 = np.floor(lats.min()) - pad * cell, np.floor(lngs.min()) - pad * cell
+    rows = ((lats - lat0) / cell).astype(int)
+    cols = ((lngs - lng0) / cell).astype(int)
+    shape = (len(slugs), rows.max() + pad + 1, cols.max() + pad + 1)
+
+    votes = np.zeros(shape, dtype=np.int32)
+    np.add.at(votes, (codes, rows, cols), 1)
+    labels = np.where(votes.sum(axis=0) > 0, votes.argmax(axis=0), -1)
+
+    # Closing: dilate every state into empty cells, then erode the union back
+    dilated = grow(labels, len(slugs), closing)
+    occupied = dilated >= 0
+    eroded = occupied.copy()
+    for _ in range(closing):
+        ring = np.zeros_like(eroded)
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            ring |= ~np.roll(np.roll(eroded, di, axis=0), dj, axis=1)
+        eroded &= ~ring
+    # Erosion only trims the coast: original cells always stay
+    labels = np.where(eroded | (labels >= 0), dilated, -1)
+
+    holes = (labels < 0) & ~outside_cells(labels >= 0)
+    while holes.any():
+        labels = np.where(holes, grow(labels, len(slugs), 1), labels)
+        holes = (labels < 0) & ~outside_cells(labels >= 0)
+    return labels, slugs, (lat0, lng0)
+
+
+def trace_rings(mask):
+    """Boundary rings of a cell mask as (row, col) corner lists.
+
+    Every cell contributes its four edges counter-clockwise; edges shared by
+    two cells of the mask cancel, and the rest chain into closed rings:
+    outer boundaries counter-clockwise, holes clockwise.
+    """
+    padded = np.pad(mask, 1)
+    edges = defaultdict(list)
+    rows, cols = np.nonzero(mask)
+    for i, j in zip(rows + 1, cols + 1):
+        r, c = i - 1, j - 1
+        if not padded[i - 1, j]:
+            edges[(r, c)].append((r, c + 1))
+        if not padded[i, j + 1]:
+            edges[(r, c + 1)].append((r + 1, c + 1))
+        if not padded[i + 1, j]:
+            edges[(r + 1, c + 1)].append((r + 1, c))
+        if not padded[i, j - 1]:
+            edges[(r + 1, c)].append((r, c))
+
+    rings = []
+    while edges:
+        start = next(iter(edges))
+        ring = [start]
+        vertex = start
+        while True:
+            ends = edges[vertex]
+            end = ends.pop()
+            if not ends:
+                del edges[vertex]
+            if end == start:
+                break
+            ring.append(end)
+            vertex = end
+        ring.append(start)
+        rings.append(ring)
+    return rings
+
+
+def drop_collinear(ring):
+    """Remove the staircase's straight-run vertices (keeps corners only)"""
+    ring = np.asarray(ring, dtype=np.float64)
+    before = ring[:-1] - np.roll(ring[:-1], 1, axis=0)
+    after = np.roll(ring[:-1], -1, axis=0) - ring[:-1]
+    corner = np.abs(before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]) > 0
+    corners = ring[:-1][corner]
+    return np.vstack([corners, corners[:1]])
+
+
+def group_rings(rings):
+    """[[outer, hole, ...], ...] from counter-clockwise outers and clockwise holes"""
+    outers = [ring for ring in rings if signed_area(ring) > 0]
+    polygons = [[outer] for outer in outers]
+    for hole in (ring for ring in rings if signed_area(ring) < 0):
+        for polygon in polygons:
+            if contains(polygon[0], hole[0]):
+                polygon.append(hole)
+                break
+    return polygons
+
+
+def outlines_from_pulse(data_dir, cell, closing):
+    """{slug: [[outer, hole, ...], ...]} in (lng, lat) traced from the Pulse grid"""
+    lats, lngs, states = read_pulse_grid(data_dir)
+    if not len(lats):
+        raise SystemExit(f"❌ No country-level map/insurance files under {data_dir}")
+    print(f"📍 {len(lats):,} labelled grid points")
+    labels, slugs, (lat0, lng0) = rasterise(lats, lngs, states, cell, closing)
+
+    outlines = {}
+    for index, slug in enumerate(slugs):
+        rings = []
+        for ring in trace_rings(labels == index):
+            corners = drop_collinear(ring)
+            # (row, col) -> (lng, lat)
+            rings.append(np.column_stack([lng0 + corners[:, 1] * cell, lat0 + corners[:, 0] * cell]))
+        outlines[slug] = group_rings(rings)
+    return outlines
+
+
+# -- Outlines from a GeoJSON file ---------------------------------------------
+
+def outlines_from_geojson(path):
+    """{slug: [[outer, hole, ...], ...]} from a state boundary GeoJSON"""
+    with open(path, encoding='utf-8') as f:
+        features = json.load(f)['features']
+    outlines = defaultdict(list)
+    for feature in features:
+        properties = feature.get('properties') or {}
+        name = next((properties[key] for key in NAME_PROPERTIES if properties.get(key)), None)
+        if name is None:
+            continue
+        slug = state_slug(name)
+        slug = STATE_NAME_ALIASES.get(slug, slug)
+        if slug not in STATE_IDS:
+            print(f"⚠️ Skipping unknown state '{name}'")
+            continue
+        geometry = feature['geometry']
+        polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+        outlines[slug] += [[np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon]
+                           for polygon in polygons]
+    return dict(outlines)
+
+
+# -- Output -------------------------------------------------------------------
+
+def feature_collection(outlines, tolerance, source):
+    features = []
+    for slug in sorted(outlines):
+        polygons = simplify_polygons(outlines[slug], tolerance)
+        coordinates = [[np.round(ring, COORDINATE_DECIMALS).tolist() for ring in rings] for rings in polygons]
+        features.append({
+            'type': 'Feature',
+            'id': STATE_IDS[slug],
+            'properties': {'state': slug, 'name': slug.replace('-', ' ').title()},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates},
+        })
+    return {'type': 'FeatureCollection', 'metadata': source, 'features': features}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dashboard's simplified India state outlines")
+    parser.add_argument("--source", help="state boundary GeoJSON to simplify "
+                        "(default: trace approximate outlines from the Pulse country-level insurance grid)")
+    parser.add_argument("--attribution", help="source and licence credit of --source, "
+                        "shown under the dashboard maps")
+    parser.add_argument("--cell", type=float, default=0.05,
+                        help="raster cell size in degrees when tracing the Pulse grid")
+    parser.add_argument("--closing", type=int, default=4,
+                        help="gap-filling radius in cells when tracing the Pulse grid")
+    args = parser.parse_args()
+
+    if args.source:
+        print(f"🗺️ Reading state boundaries from {args.source}")
+        outlines = outlines_from_geojson(args.source)
+        source = {'approximate': False,
+                  'attribution': args.attribution or os.path.basename(args.source)}
+    else:
+        print("🗺️ Tracing approximate state outlines from the Pulse insurance grid")
+        outlines = outlines_from_pulse(get_data_dir(), args.cell, args.closing)
+        source = {'approximate': True, 'attribution': TRACED_ATTRIBUTION}
+
+    missing = sorted(set(STATE_IDS) - set(outlines))
+    if missing:
+        print(f"⚠️ No outline for: {', '.join(missing)}")
+
+    os.makedirs(GEOMETRY_DIR, exist_ok=True)
+    for level, tolerance in GEOMETRY_LEVELS.items():
+        collection = feature_collection(outlines, tolerance, source)
+        with open(geometry_path(level), 'w', encoding='utf-8') as f:
+            json.dump(collection, f, separators=(',', ':'))
+        vertices = sum(len(ring) for feature in collection['features']
+                       for rings in feature['geometry']['coordinates'] for ring in rings)
+        size = os.path.getsize(geometry_path(level)) / 1024
+        print(f"✅ {level:<9} tolerance {tolerance:<5} {vertices:>7,} vertices {size:>8.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+
+# Default number of rows sent to MySQL in one INSERT statement
+DEFAULT_BATCH_SIZE = 5000
+
+
+def get_batch_size():
+    """Read the insert batch size from LOAD_BATCH_SIZE (falls back to the default)"""
+    try:
+        batch_size = int(os.getenv("LOAD_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    except ValueError:
+        batch_size = DEFAULT_BATCH_SIZE
+    return max(batch_size, 1)
+
+
+def build_insert_query(table_name, columns):
+    """Build a parameterised INSERT statement for the given columns"""
+    column_list = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+
+
+def bulk_insert(cursor, table_name, df, batch_size=None):
+    """Insert a DataFrame in batches of multi-row INSERT statements.
+
+    cursor.executemany() rewrites a plain INSERT ... VALUES into a single
+    multi-row statement, so each batch costs one round trip instead of one
+    per row. Returns the number of rows inserted.
+    """
+    if batch_size is None:
+        batch_size = get_batch_size()
+
+    if df.empty:
+        return 0
+
+    # Embedded DuckDB can ingest the whole frame in one statement
+    insert_dataframe = getattr(cursor, "insert_dataframe", None)
+    if insert_dataframe is not None:
+        inserted = insert_dataframe(table_name, df)
+        if inserted is not None:
+            return inserted
+
+    insert_query = build_insert_query(table_name, list(df.columns))
+
+    # Plain tuples of Python scalars (no numpy types) for the connector
+    rows = list(df.astype(object).itertuples(index=False, name=None))
+
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(insert_query, rows[start:start + batch_size])
+
+    return len(rows)
@@ -0,0 +1,87 @@
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+import db_backend
+from dashboard_queries import PAGE_QUERIES
+from schema_catalog import SchemaCatalog
+
+
+def explain_mysql(cursor, query):
+    """(index served?, plan summary) from MySQL EXPLAIN"""
+    cursor.execute(f"EXPLAIN {query}")
+    columns = [d[0] for d in cursor.description]
+    problems, summary = [], []
+    for row in cursor.fetchall():
+        step = dict(zip(columns, row))
+        summary.append(f"{step['table']}: type={step['type']} key={step['key']}")
+        # type ALL is a full table scan; anything else reads through an index.
+        # <derivedN> rows come from a subquery that was itself checked above.
+        if step['table'] and step['type'] == 'ALL' and not step['table'].startswith('<derived'):
+            problems.append(step['table'])
+    return not problems, "; ".join(summary)
+
+
+def explain_sqlite(cursor, query):
+    """(index served?, plan summary) from SQLite EXPLAIN QUERY PLAN"""
+    cursor.execute(f"EXPLAIN QUERY PLAN {query}")
+    details = [row[-1] for row in cursor.fetchall()]
+    # Scans of a materialized subquery read its (already grouped) result, not a table
+    materialized = {d.split()[1] for d in details if d.startswith("MATERIALIZE ")}
+    # "SCAN <table>" without "USING ... INDEX" reads the whole table
+    scans = [d for d in details
+             if d.startswith("SCAN ") and "INDEX" not in d and "TEMP B-TREE" not in d
+             and d.split()[1] not in materialized]
+    return not scans, "; ".join(details)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that every dashboard query is served by an index")
+    parser.add_argument("--year", type=int, default=2023)
+    parser.add_argument("--quarter", type=int, default=1)
+    parser.add_argument("--state", default="tamil-nadu")
+    parser.add_argument("--verbose", action="store_true", help="print the plan of every query")
+    args = parser.parse_args()
+
+    load_dotenv()
+    backend = db_backend.get_backend()
+    if backend == "duckdb":
+        # DuckDB only uses its ART indexes for point lookups; scans rely on zone maps
+        print("ℹ️ DuckDB plans are not index based; run this check against MySQL or SQLite.")
+        return
+
+    explain = explain_mysql if backend == "mysql" else explain_sqlite
+    params = {"year": args.year, "quarter": args.quarter, "state": args.state,
+              "from_year": 2018, "to_year": args.year}
+
+    conn, cursor = db_backend.connect()
+    print(f"🔍 Checking query plans on {db_backend.describe_backend()}")
+
+    catalog = SchemaCatalog.load(cursor)
+    failures = 0
+    for page, queries in PAGE_QUERIES.items():
+        for number, query in enumerate(queries, start=1):
+            if "WHERE" not in query.upper():
+                # Unfiltered totals read every row whichever access path is used
+                print(f"⚪ {page} #{number} (whole-table aggregate, no filter to index)")
+                continue
+            served, plan = explain(cursor, catalog.render(query, **params))
+            mark = "✅" if served else "❌"
+            if not served:
+                failures += 1
+            print(f"{mark} {page} #{number}")
+            if args.verbose or not served:
+                print(f"     {plan}")
+
+    cursor.close()
+    conn.close()
+
+    if failures:
+        print(f"❌ {failures} dashboard queries are not index-served.")
+        sys.exit(1)
+    print("✅ Every dashboard query is index-served.")
+
+
+if __name__ == "__main__":
+    main()
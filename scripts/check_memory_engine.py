@@ -0,0 +1,95 @@
+import argparse
+import inspect
+import math
+import sys
+import time
+
+from dotenv import load_dotenv
+
+import db_backend
+from dashboard_queries import QUERIES
+from memory_engine import MemoryEngine
+from schema_catalog import SchemaCatalog
+
+
+def normalise(rows):
+    """Rows as sorted tuples of str / float, so SQL and engine results compare"""
+    return sorted(tuple(str(v) if isinstance(v, str) else (None if v is None else float(v)) for v in row)
+                  for row in rows)
+
+
+def rows_match(expected, actual, tolerance):
+    expected, actual = normalise(expected), normalise(actual)
+    if len(expected) != len(actual):
+        return False
+    for left, right in zip(expected, actual):
+        for a, b in zip(left, right):
+            if isinstance(a, float) and isinstance(b, float):
+                if not math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance):
+                    return False
+            elif a != b:
+                return False
+    return True
+
+
+def parameter_sets(query_id, engine, states):
+    """Every filter combination a query is checked with"""
+    needed = set(inspect.signature(getattr(engine, f"_{query_id}")).parameters)
+    periods = sorted(engine.tables['aggregated_transaction'].period_index)
+    if not needed:
+        return [{}]
+    if needed == {"from_year", "to_year"}:
+        years = sorted({year for year, _ in periods})
+        return [{"from_year": years[0], "to_year": year} for year in years]
+    if "state" in needed:
+        return [{"state": state, "year": year, "quarter": quarter}
+                for year, quarter in periods for state in states]
+    return [{"year": year, "quarter": quarter} for year, quarter in periods]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the in-memory engine against SQL for every dashboard query")
+    parser.add_argument("--states", default="",
+                        help="comma separated states for state-filtered queries (default: all)")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="relative tolerance for sums")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn, cursor = db_backend.connect()
+    print(f"🔍 Comparing the in-memory engine with {db_backend.describe_backend()}")
+
+    start = time.perf_counter()
+    engine = MemoryEngine.load(cursor)
+    print(f"📦 Engine loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+    catalog = SchemaCatalog.load(cursor)
+
+    states = [s.strip() for s in args.states.split(",") if s.strip()] or \
+        sorted(engine.tables['map_transaction'].state_index)
+
+    failures = 0
+    for query_id, template in QUERIES.items():
+        checked, mismatched = 0, []
+        for params in parameter_sets(query_id, engine, states):
+            cursor.execute(catalog.render(template, **params))
+            expected = cursor.fetchall()
+            actual = engine.run(query_id, **params)
+            checked += 1
+            if not rows_match(expected, actual, args.tolerance):
+                mismatched.append(params)
+        failures += len(mismatched)
+        mark = "✅" if not mismatched else "❌"
+        print(f"{mark} {query_id}: {checked - len(mismatched)}/{checked} filter sets match")
+        for params in mismatched[:3]:
+            print(f"     mismatch for {params}")
+
+    cursor.close()
+    conn.close()
+
+    if failures:
+        print(f"❌ {failures} engine results differ from SQL.")
+        sys.exit(1)
+    print("✅ The in-memory engine matches SQL for every dashboard query.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from db_backend import table_exists
+from snapshot import staging_table
+
+# Files whose rows are committed to a dataset's staging table but not yet
+# published, one row per (table, file). Each quarter file is one
+# (State, Year, Quarter) unit of a dataset. A load that dies part way
+# resumes from here instead of starting the table over; publishing clears it.
+CHECKPOINT_TABLE = "load_checkpoint"
+
+# How each dataset's staging table was started, one row per table:
+# 'empty' (full reload) or 'copy' (of the live rows, partial reload)
+STAGE_TABLE = "load_stage"
+
+
+def create_checkpoint_table(cursor):
+    """Create the load checkpoint and stage tables if they do not exist"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+        Table_name VARCHAR(64) NOT NULL,
+        File_path VARCHAR(255) NOT NULL,
+        Content_hash CHAR(64),
+        PRIMARY KEY (Table_name, File_path)
+    )
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {STAGE_TABLE} (
+        Table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+        Start VARCHAR(8) NOT NULL
+    )
+    """)
+
+
+def load_checkpoint(cursor, table_name):
+    """Return {relative path: hash} of the files staged so far for table_name"""
+    cursor.execute(f"SELECT File_path, Content_hash FROM {CHECKPOINT_TABLE} WHERE Table_name = %s",
+                   (table_name,))
+    return dict(cursor.fetchall())
+
+
+def resume_point(cursor, table_name, start, changed_paths):
+    """Files already staged for table_name, or None when its staging table can't be resumed.
+
+    A staging table is only picked up again when it still exists, was
+    started the same way ('empty' or 'copy') this load would start it, and
+    every file it staged is still among changed_paths. A staged file that
+    was reverted or removed since would not be reloaded, so its staged rows
+    would be published as they are.
+    """
+    cursor.execute(f"SELECT Start FROM {STAGE_TABLE} WHERE Table_name = %s", (table_name,))
+    row = cursor.fetchone()
+    if row is None or row[0] != start or not table_exists(cursor, staging_table(table_name)):
+        return None
+    staged = load_checkpoint(cursor, table_name)
+    if not staged.keys() <= set(changed_paths):
+        print(f"♻️ Files staged for '{table_name}' changed back since: staging it again from the start.")
+        return None
+    return staged
+
+
+def record_checkpoint(cursor, rows):
+    """Upsert (table, relative path, hash) rows for files whose staged rows are about to commit"""
+    if rows:
+        cursor.executemany(
+            f"REPLACE INTO {CHECKPOINT_TABLE} (Table_name, File_path, Content_hash) VALUES (%s, %s, %s)",
+            rows
+        )
+
+
+def start_checkpoint(cursor, table_name, start):
+    """Forget earlier progress of table_name and record how its new staging table starts"""
+    clear_checkpoint(cursor, [table_name])
+    cursor.execute(f"INSERT INTO {STAGE_TABLE} (Table_name, Start) VALUES (%s, %s)", (table_name, start))
+
+
+def clear_checkpoint(cursor, table_names=None):
+    """Drop the checkpoint and stage rows of table_names (default: every table)"""
+    for table in (CHECKPOINT_TABLE, STAGE_TABLE):
+        if table_names is None:
+            cursor.execute(f"DELETE FROM {table}")
+        elif table_names:
+            cursor.executemany(f"DELETE FROM {table} WHERE Table_name = %s",
+                               [(table_name,) for table_name in table_names])
@@ -0,0 +1,145 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from db_backend import connect, get_backend
+
+# Connections kept open for the dashboard (DB_POOL_SIZE in .env)
+DEFAULT_POOL_SIZE = 4
+
+# Seconds a connection may sit idle before it is pinged on checkout
+HEALTH_CHECK_INTERVAL = 30
+
+# Seconds to wait for a free connection before giving up
+CHECKOUT_TIMEOUT = 30
+
+
+def get_pool_size():
+    """Read the pool size from DB_POOL_SIZE (falls back to the default)"""
+    try:
+        size = int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+    except ValueError:
+        size = DEFAULT_POOL_SIZE
+    return max(size, 1)
+
+
+class PooledConnection:
+    """A (conn, cursor) pair owned by the pool, with the time it was last used"""
+
+    def __init__(self):
+        self.conn, self.cursor = connect()
+        if get_backend() == "mysql":
+            # Read-only use: without autocommit a connection keeps reading
+            # the InnoDB snapshot taken at its first query and misses new loads
+            self.conn.autocommit = True
+        self.last_used = time.monotonic()
+
+    def is_healthy(self):
+        try:
+            self.cursor.execute("SELECT 1")
+            self.cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        for resource in (self.cursor, self.conn):
+            try:
+                resource.close()
+            except Exception:
+                pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections for concurrent dashboard sessions.
+
+    Connections are opened lazily up to `size`. A connection idle for longer
+    than HEALTH_CHECK_INTERVAL is pinged before it is handed out and replaced
+    when the ping fails, so a restarted MySQL server or a dropped link is
+    reconnected transparently. One connection is opened up front so that
+    configuration errors surface immediately.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or get_pool_size()
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        # Slots taken by open connections and by connections being opened
+        self._opened = 1
+        self.reconnects = 0
+        self._release(self._open())
+
+    def _open(self):
+        """Connection for a slot already counted in _opened (freed again if connecting fails)"""
+        try:
+            return PooledConnection()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _discard(self, pooled):
+        pooled.close()
+        with self._lock:
+            self._opened -= 1
+
+    def _release(self, pooled):
+        pooled.last_used = time.monotonic()
+        self._idle.put(pooled)
+
+    def _acquire(self):
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            # Reserve a slot for another connection while under the limit,
+            # in the same locked step as the check, else wait for one
+            with self._lock:
+                reserved = self._opened < self.size
+                if reserved:
+                    self._opened += 1
+            if reserved:
+                pooled = self._open()
+            else:
+                try:
+                    pooled = self._idle.get(timeout=CHECKOUT_TIMEOUT)
+                except queue.Empty:
+                    raise TimeoutError(f"No database connection free after {CHECKOUT_TIMEOUT}s "
+                                       f"(pool size {self.size})") from None
+
+        if time.monotonic() - pooled.last_used > HEALTH_CHECK_INTERVAL and not pooled.is_healthy():
+            # The replacement takes over the dead connection's slot
+            pooled.close()
+            pooled = self._open()
+            with self._lock:
+                self.reconnects += 1
+        return pooled
+
+    @contextmanager
+    def cursor(self):
+        """Check out a cursor for one request; it goes back to the pool afterwards"""
+        pooled = self._acquire()
+        try:
+            yield pooled.cursor
+        except Exception:
+            # Keep the connection only if the failure was the query, not the link
+            if pooled.is_healthy():
+                self._release(pooled)
+            else:
+                self._discard(pooled)
+            raise
+        else:
+            self._release(pooled)
+
+    def stats(self):
+        """Open / idle connection counts and reconnects so far"""
+        return {"open": self._opened, "idle": self._idle.qsize(), "reconnects": self.reconnects}
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
@@ -0,0 +1,87 @@
+# Every query issued by the dashboard (streamlit_app/dashboard.py), keyed by a
+# query id. Placeholders: {year}, {quarter}, {state}, {from_year}, {to_year},
+# plus {table[metric]} for columns resolved through the schema catalog
+# (schema_catalog.py); render with SchemaCatalog.render().
+# Panels read the load-time rollups (rollups.py) except Market Expansion, whose
+# map_transaction / top_user rows are already stored at the panel's grain; those
+# group on integer keys (star_schema.py) and join the labels of the top rows only.
+QUERIES = {
+    "home_totals":
+        """SELECT (SELECT COUNT(*) FROM dimension_catalog
+                   WHERE Table_name = 'aggregated_transaction' AND Dimension = 'state'),
+                  Total_Count, Total_Amount
+           FROM rollup_country_totals WHERE State = 'india'""",
+    "txn_top_states":
+        """SELECT State, Total_Amount, Total_Count
+           FROM rollup_txn_state WHERE Year = {year} AND Quarter = {quarter}
+           ORDER BY Total_Amount DESC LIMIT 10""",
+    "txn_types":
+        """SELECT Transacion_type, Total_Count as Count, Total_Amount as Amount
+           FROM rollup_txn_type WHERE Year = {year} AND Quarter = {quarter}""",
+    "device_check":
+        """SELECT COALESCE(SUM(Records), 0), COUNT(*), SUM(Total_Users)
+           FROM rollup_user_brand WHERE Year = {year} AND Quarter = {quarter}""",
+    "device_top_brands":
+        """SELECT Device_Brand, Total_Users, Sum_Percentage / Records as Avg_Percentage
+           FROM rollup_user_brand WHERE Year = {year} AND Quarter = {quarter}
+           ORDER BY Total_Users DESC LIMIT 10""",
+    "device_top_brands_all_time":
+        """SELECT Device_Brand, SUM(Total_Users) as Total_Users,
+                  SUM(Sum_Percentage) / SUM(Records) as Avg_Percentage
+           FROM rollup_user_brand
+           GROUP BY Device_Brand ORDER BY Total_Users DESC LIMIT 10""",
+    "users_top_states":
+        """SELECT State, Total_Users, Total_Opens
+           FROM rollup_map_user_state WHERE Year = {year} AND Quarter = {quarter}
+           ORDER BY Total_Users DESC LIMIT 15""",
+    "users_by_state":
+        """SELECT State, Total_Users, Total_Opens
+           FROM rollup_map_user_state WHERE Year = {year} AND Quarter = {quarter}
+           ORDER BY Total_Users DESC""",
+    "users_trend":
+        """SELECT Year, Quarter, Total_Users, Total_Opens
+           FROM rollup_map_user_period WHERE Year BETWEEN {from_year} AND {to_year}
+           ORDER BY Year, Quarter""",
+    "insurance_top_states":
+        """SELECT State, Total_Count, Total_Amount
+           FROM rollup_ins_state WHERE Year = {year} AND Quarter = {quarter}
+           ORDER BY Total_Amount DESC LIMIT 15""",
+    "insurance_types":
+        """SELECT Insurance_type, Total_Count as Count, Total_Amount as Amount
+           FROM rollup_ins_type WHERE Year = {year} AND Quarter = {quarter}""",
+    "market_districts":
+        """SELECT dim_district.District, g.Total_Count, g.Total_Amount
+           FROM (SELECT District_id, SUM({map_transaction[transaction_count]}) as Total_Count,
+                        SUM({map_transaction[transaction_amount]}) as Total_Amount
+                 FROM map_transaction
+                 WHERE State_id = (SELECT State_id FROM dim_state WHERE State = '{state}')
+                     AND Year = {year} AND Quarter = {quarter}
+                     AND {map_transaction[transaction_count]} > 0 AND {map_transaction[transaction_amount]} > 0
+                 GROUP BY District_id ORDER BY Total_Amount DESC LIMIT 15) g
+           JOIN dim_district ON dim_district.District_id = g.District_id
+           ORDER BY g.Total_Amount DESC""",
+    "market_top_user_districts":
+        """SELECT dim_district.District, g.Total_Users
+           FROM (SELECT District_id, SUM({top_user[registered_users]}) as Total_Users
+                 FROM top_user
+                 WHERE State_id = (SELECT State_id FROM dim_state WHERE State = '{state}')
+                     AND Year = {year} AND Quarter = {quarter} AND {top_user[registered_users]} > 0
+                 GROUP BY District_id ORDER BY Total_Users DESC LIMIT 10) g
+           JOIN dim_district ON dim_district.District_id = g.District_id
+           ORDER BY g.Total_Users DESC""",
+}
+
+# Queries each page runs for one set of filters. Used by benchmark_backends.py
+# and check_indexes.py.
+PAGE_QUERIES = {
+    page: [QUERIES[query_id] for query_id in query_ids]
+    for page, query_ids in {
+        "Home": ["home_totals"],
+        "Transaction Dynamics": ["txn_top_states", "txn_types"],
+        "Device & User Analysis": ["device_check", "device_top_brands", "users_top_states"],
+        "Insurance Analytics": ["insurance_top_states", "insurance_types"],
+        "Market Expansion": ["market_districts", "market_top_user_districts"],
+        "User Engagement": ["users_trend", "users_top_states"],
+        "Geo Analysis": ["users_by_state"],
+    }.items()
+}
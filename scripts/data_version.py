@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from db_backend import table_exists
+
+# Single-row table holding a counter the loader bumps whenever data changes.
+# The dashboard keys its query cache on it, so a load invalidates every
+# cached result without restarting Streamlit.
+DATA_VERSION_TABLE = "data_version"
+
+
+def create_data_version_table(cursor):
+    """Create the data version table if it doesn't exist"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+        Id TINYINT NOT NULL PRIMARY KEY,
+        Version INT NOT NULL,
+        Updated_at VARCHAR(32)
+    )
+    """)
+
+
+def get_data_version(cursor):
+    """Current data version (0 when nothing has been loaded yet)"""
+    if not table_exists(cursor, DATA_VERSION_TABLE):
+        return 0
+    cursor.execute(f"SELECT Version FROM {DATA_VERSION_TABLE} WHERE Id = 1")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def bump_data_version(cursor):
+    """Advance the data version after a load changed rows. Returns the new version."""
+    create_data_version_table(cursor)
+    version = get_data_version(cursor) + 1
+    cursor.execute(
+        f"REPLACE INTO {DATA_VERSION_TABLE} (Id, Version, Updated_at) VALUES (%s, %s, %s)",
+        (1, version, datetime.now().isoformat(timespec='seconds'))
+    )
+    return version
@@ -0,0 +1,226 @@
+import os
+
+from pulse_extract import (
+    parse_aggregated_transaction, parse_aggregated_user, parse_aggregated_insurance,
+    parse_map_transaction, parse_map_user, parse_map_insurance,
+    parse_top_transaction, parse_top_user, parse_top_insurance,
+    parse_top_transaction_pincode, parse_top_user_pincode, parse_country_user,
+)
+from star_schema import fact_columns, key_column
+
+# Root of the PhonePe Pulse data checkout (override with PULSE_DATA_DIR in .env)
+DEFAULT_DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+
+
+def get_data_dir():
+    """Directory holding the aggregated/, map/ and top/ Pulse folders"""
+    return os.getenv("PULSE_DATA_DIR", DEFAULT_DATA_DIR)
+
+
+# Columns shared by every table: the (State, Year, Quarter) of the source file
+PERIOD_COLUMNS = [('State', 'VARCHAR(64)'), ('Year', 'SMALLINT'), ('Quarter', 'TINYINT')]
+
+# ---------------------------------------------------------------------------
+# Dataset registry: one entry per database table.
+#   source      - path under the data dir that holds <state>/<year>/<quarter>.json
+#                 (country-level sources hold india/<year>/<quarter>.json, so
+#                 their rows have State = 'india')
+#   parser      - function that appends one quarter file's rows to the column dict
+#   columns     - (column name, SQL type) in table order, as parsed; the table
+#                 stores labelled columns as keys (star_schema.py)
+#   primary_key - natural key of a row
+#   indexes     - (index name, columns) matching the dashboard's WHERE/GROUP BY
+#                 patterns; metric columns are included so the index covers the query
+# ---------------------------------------------------------------------------
+DATASETS = {
+    'aggregated_transaction': {
+        'source': ('aggregated', 'transaction', 'country', 'india', 'state'),
+        'parser': parse_aggregated_transaction,
+        'columns': PERIOD_COLUMNS + [
+            ('Transacion_type', 'VARCHAR(64)'), ('Transacion_count', 'BIGINT'),
+            ('Transacion_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Transacion_type'],
+        'indexes': [
+            ('idx_agg_txn_period', ['Year', 'Quarter', 'State', 'Transacion_type',
+                                    'Transacion_count', 'Transacion_amount']),
+        ],
+    },
+    'aggregated_user': {
+        'source': ('aggregated', 'user', 'country', 'india', 'state'),
+        'parser': parse_aggregated_user,
+        'columns': PERIOD_COLUMNS + [
+            ('Device_Brand', 'VARCHAR(64)'), ('User_Count', 'BIGINT'),
+            ('User_Percentage', 'FLOAT'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Device_Brand'],
+        'indexes': [
+            ('idx_agg_user_period', ['Year', 'Quarter', 'Device_Brand', 'User_Count', 'User_Percentage']),
+        ],
+    },
+    'aggregated_insurance': {
+        'source': ('aggregated', 'insurance', 'country', 'india', 'state'),
+        'parser': parse_aggregated_insurance,
+        'columns': PERIOD_COLUMNS + [
+            ('Insurance_type', 'VARCHAR(64)'), ('Insurance_count', 'BIGINT'),
+            ('Insurance_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Insurance_type'],
+        'indexes': [
+            ('idx_agg_ins_period', ['Year', 'Quarter', 'State', 'Insurance_type',
+                                    'Insurance_count', 'Insurance_amount']),
+        ],
+    },
+    'map_transaction': {
+        'source': ('map', 'transaction', 'hover', 'country', 'india', 'state'),
+        'parser': parse_map_transaction,
+        'columns': PERIOD_COLUMNS + [
+            ('District', 'VARCHAR(128)'), ('Transaction_count', 'BIGINT'),
+            ('Transaction_amount', 'DOUBLE'),
+        ],
+        # Market Expansion filters on (State, Year, Quarter): served by the primary key
+        'primary_key': ['State', 'Year', 'Quarter', 'District'],
+        'indexes': [],
+    },
+    'map_user': {
+        'source': ('map', 'user', 'hover', 'country', 'india', 'state'),
+        'parser': parse_map_user,
+        'columns': PERIOD_COLUMNS + [
+            ('District', 'VARCHAR(128)'), ('RegisteredUsers', 'BIGINT'),
+            ('AppOpens', 'BIGINT'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'District'],
+        'indexes': [
+            ('idx_map_user_period', ['Year', 'Quarter', 'State', 'RegisteredUsers', 'AppOpens']),
+        ],
+    },
+    'map_insurance': {
+        'source': ('map', 'insurance', 'country', 'india', 'state'),
+        'parser': parse_map_insurance,
+        'columns': PERIOD_COLUMNS + [
+            ('District', 'VARCHAR(128)'), ('Latitude', 'DOUBLE'), ('Longitude', 'DOUBLE'),
+            ('Insurance_Count', 'BIGINT'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Latitude', 'Longitude'],
+        'indexes': [
+            ('idx_map_ins_period', ['Year', 'Quarter', 'State']),
+        ],
+    },
+    'top_transaction': {
+        'source': ('top', 'transaction', 'country', 'india', 'state'),
+        'parser': parse_top_transaction,
+        'columns': PERIOD_COLUMNS + [
+            ('District', 'VARCHAR(128)'), ('Transaction_count', 'BIGINT'),
+            ('Transaction_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'District'],
+        'indexes': [
+            ('idx_top_txn_period', ['Year', 'Quarter', 'State']),
+        ],
+    },
+    'top_user': {
+        'source': ('top', 'user', 'country', 'india', 'state'),
+        'parser': parse_top_user,
+        'columns': PERIOD_COLUMNS + [
+            ('District', 'VARCHAR(128)'), ('Registered_users', 'BIGINT'),
+            ('App_opens', 'BIGINT'),
+        ],
+        # Market Expansion filters on (State, Year, Quarter): served by the primary key
+        'primary_key': ['State', 'Year', 'Quarter', 'District'],
+        'indexes': [],
+    },
+    'top_insurance': {
+        'source': ('top', 'insurance', 'country', 'india', 'state'),
+        'parser': parse_top_insurance,
+        'columns': PERIOD_COLUMNS + [
+            ('Pincode', 'VARCHAR(10)'), ('Count', 'BIGINT'), ('Amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Pincode'],
+        'indexes': [
+            ('idx_top_ins_period', ['Year', 'Quarter', 'State']),
+        ],
+    },
+    # Pincode lists that ship alongside the districts in the top/ state files
+    'top_transaction_pincode': {
+        'source': ('top', 'transaction', 'country', 'india', 'state'),
+        'parser': parse_top_transaction_pincode,
+        'columns': PERIOD_COLUMNS + [
+            ('Pincode', 'VARCHAR(10)'), ('Transaction_count', 'BIGINT'),
+            ('Transaction_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Pincode'],
+        'indexes': [
+            ('idx_top_txn_pin_period', ['Year', 'Quarter', 'State']),
+        ],
+    },
+    'top_user_pincode': {
+        'source': ('top', 'user', 'country', 'india', 'state'),
+        'parser': parse_top_user_pincode,
+        'columns': PERIOD_COLUMNS + [
+            ('Pincode', 'VARCHAR(10)'), ('Registered_users', 'BIGINT'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Pincode'],
+        'indexes': [
+            ('idx_top_user_pin_period', ['Year', 'Quarter', 'State']),
+        ],
+    },
+    # National totals from the country-level files (one 'india' row set per quarter)
+    'country_transaction': {
+        'source': ('aggregated', 'transaction', 'country'),
+        'parser': parse_aggregated_transaction,
+        'columns': PERIOD_COLUMNS + [
+            ('Transacion_type', 'VARCHAR(64)'), ('Transacion_count', 'BIGINT'),
+            ('Transacion_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Transacion_type'],
+        'indexes': [],
+    },
+    'country_user': {
+        'source': ('aggregated', 'user', 'country'),
+        'parser': parse_country_user,
+        'columns': PERIOD_COLUMNS + [
+            ('Registered_users', 'BIGINT'), ('App_opens', 'BIGINT'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter'],
+        'indexes': [],
+    },
+    'country_insurance': {
+        'source': ('aggregated', 'insurance', 'country'),
+        'parser': parse_aggregated_insurance,
+        'columns': PERIOD_COLUMNS + [
+            ('Insurance_type', 'VARCHAR(64)'), ('Insurance_count', 'BIGINT'),
+            ('Insurance_amount', 'DOUBLE'),
+        ],
+        'primary_key': ['State', 'Year', 'Quarter', 'Insurance_type'],
+        'indexes': [],
+    },
+}
+
+
+def source_path(name, data_dir=None):
+    """Absolute path of a dataset's state folder"""
+    return os.path.join(data_dir or get_data_dir(), *DATASETS[name]['source'])
+
+
+def column_names(name):
+    """Column names of a dataset, in table order"""
+    return [column for column, _ in DATASETS[name]['columns']]
+
+
+def create_table_sql(name, table=None):
+    """CREATE TABLE IF NOT EXISTS statement for a dataset, including its primary key.
+
+    Text columns with a dimension table (star_schema.py) are stored as
+    their integer key, in the primary key and indexes as well. Pass `table`
+    to create the layout under another name (e.g. a staging copy).
+    """
+    spec = DATASETS[name]
+    column_defs = [f"{column} {sql_type}" for column, sql_type in fact_columns(spec['columns'])]
+    column_defs.append(f"PRIMARY KEY ({', '.join(map(key_column, spec['primary_key']))})")
+    return f"CREATE TABLE IF NOT EXISTS {table or name} (\n    " + ",\n    ".join(column_defs) + "\n)"
+
+
+def create_index_sql(name, table=None):
+    """CREATE INDEX statements for a dataset's secondary indexes (on `table` when given)"""
+    return [f"CREATE INDEX {index_name} ON {table or name} ({', '.join(map(key_column, columns))})"
+            for index_name, columns in DATASETS[name]['indexes']]
@@ -0,0 +1,219 @@
+import os
+import re
+import sqlite3
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# Storage backends, selected with DB_BACKEND in .env:
+#   mysql  - MySQL server at DB_HOST (default)
+#   sqlite - embedded SQLite file at DB_PATH, no server needed
+#   duckdb - embedded DuckDB file at DB_PATH (pip install duckdb)
+BACKENDS = ("mysql", "sqlite", "duckdb")
+EMBEDDED_BACKENDS = ("sqlite", "duckdb")
+
+# "VALUES (?, ?, ...)" tail of a single-row INSERT statement
+VALUES_CLAUSE = re.compile(r"\s+VALUES\s*\([?,\s]*\)\s*$", re.IGNORECASE)
+
+# Quoted SQL literals and identifiers ('' and "" escape a quote inside them)
+QUOTED_SPAN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+REPO_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+def get_backend():
+    """Backend name from DB_BACKEND (mysql when unset)"""
+    load_dotenv()
+    backend = os.getenv("DB_BACKEND", "mysql").strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def get_db_path(backend):
+    """File used by an embedded backend (DB_PATH, default <repo>/<DB_NAME>.<backend>)"""
+    db_name = os.getenv("DB_NAME") or "phonepe_pulse"
+    return os.getenv("DB_PATH", os.path.join(REPO_DIR, f"{db_name}.{backend}"))
+
+
+class EmbeddedCursor:
+    """Cursor wrapper that accepts the MySQL-style SQL used across the project.
+
+    Translates %s placeholders to ? and REPLACE INTO to INSERT OR REPLACE INTO,
+    so loader and dashboard queries run unchanged on SQLite and DuckDB.
+    A %s inside a quoted literal or identifier is left as it is.
+    """
+
+    def __init__(self, cursor, backend):
+        self._cursor = cursor
+        self.backend = backend
+
+    @staticmethod
+    def translate(query):
+        if "%s" in query:
+            # Odd parts of the split are the quoted spans
+            parts = QUOTED_SPAN.split(query)
+            query = "".join(part if i % 2 else part.replace("%s", "?") for i, part in enumerate(parts))
+        stripped = query.lstrip()
+        if stripped[:12].upper() == "REPLACE INTO":
+            query = "INSERT OR REPLACE INTO" + stripped[12:]
+        return query
+
+    def execute(self, query, params=None):
+        if params is None:
+            self._cursor.execute(self.translate(query))
+        else:
+            self._cursor.execute(self.translate(query), tuple(params))
+        return self
+
+    def executemany(self, query, rows):
+        query = self.translate(query)
+        rows = [tuple(row) for row in rows]
+
+        # DuckDB executes executemany row by row; feed INSERTs from a frame instead
+        match = VALUES_CLAUSE.search(query)
+        if self.backend == "duckdb" and match and query.lstrip()[:6].upper() == "INSERT" and rows:
+            self._cursor.register("incoming_rows", pd.DataFrame(rows))
+            try:
+                self._cursor.execute(query[:match.start()] + " SELECT * FROM incoming_rows")
+            finally:
+                self._cursor.unregister("incoming_rows")
+            return self
+
+        self._cursor.executemany(query, rows)
+        return self
+
+    def insert_dataframe(self, table_name, df):
+        """DuckDB bulk path: insert straight from the DataFrame (None when unsupported)"""
+        if self.backend != "duckdb":
+            return None
+        column_list = ", ".join(df.columns)
+        self._cursor.register("incoming_frame", df)
+        try:
+            self._cursor.execute(
+                f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM incoming_frame"
+            )
+        finally:
+            self._cursor.unregister("incoming_frame")
+        return len(df)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+def connect(create_database=False):
+    """Open a connection to the configured backend and return (conn, cursor).
+
+    For MySQL the database DB_NAME is selected, and created first when
+    create_database is True (the loader does this). Embedded backends open
+    (or create) the file at DB_PATH.
+    """
+    backend = get_backend()
+
+    if backend == "mysql":
+        import mysql.connector
+
+        db_name = os.getenv("DB_NAME")
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD")
+        )
+        cursor = conn.cursor(buffered=True)
+        if create_database:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
+        conn.database = db_name
+        return conn, cursor
+
+    db_path = get_db_path(backend)
+    if backend == "sqlite":
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Write-ahead log: dashboard reads don't wait for (or block) a running load
+        conn.execute("PRAGMA journal_mode=WAL")
+    else:
+        if duckdb is None:
+            raise ImportError("DB_BACKEND=duckdb needs the duckdb package: pip install duckdb")
+        conn = duckdb.connect(db_path)
+    return conn, EmbeddedCursor(conn.cursor(), backend)
+
+
+def is_locked_by_another_process(error):
+    """True when connect() failed because another process holds the DuckDB file.
+
+    DuckDB lets one process at a time open a file for writing, and none
+    while another process has it open, so the loader can't start while
+    the dashboard is running against the same file.
+    """
+    return duckdb is not None and isinstance(error, duckdb.IOException) and "lock" in str(error).lower()
+
+
+def describe_backend():
+    """Human readable description of where the data lives"""
+    backend = get_backend()
+    if backend == "mysql":
+        return f"MySQL database '{os.getenv('DB_NAME')}' on {os.getenv('DB_HOST', 'localhost')}"
+    return f"{backend} file {get_db_path(backend)}"
+
+
+def get_table_columns(cursor, table_name):
+    """Column names of a table on any backend"""
+    backend = get_backend()
+    if backend == "sqlite":
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        return [row[1] for row in cursor.fetchall()]
+    cursor.execute(f"DESCRIBE {table_name}")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def table_exists(cursor, table_name):
+    """True when table_name exists in the current database"""
+    backend = get_backend()
+    if backend == "sqlite":
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (table_name,))
+    elif backend == "duckdb":
+        cursor.execute("SELECT 1 FROM information_schema.tables WHERE table_name = %s", (table_name,))
+    else:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+            (table_name,)
+        )
+    return cursor.fetchone() is not None
+
+
+def get_schema(cursor):
+    """{table: [column, ...]} for every table of the current database, in one statement"""
+    backend = get_backend()
+    if backend == "sqlite":
+        cursor.execute("""
+        SELECT m.name, p.name FROM sqlite_master m, pragma_table_info(m.name) p
+        WHERE m.type = 'table' ORDER BY m.name, p.cid
+        """)
+    elif backend == "duckdb":
+        cursor.execute("""
+        SELECT table_name, column_name FROM information_schema.columns
+        ORDER BY table_name, ordinal_position
+        """)
+    else:
+        cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.columns
+        WHERE table_schema = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+    schema = {}
+    for table_name, column_name in cursor.fetchall():
+        schema.setdefault(table_name, []).append(column_name)
+    return schema
@@ -0,0 +1,125 @@
+from datasets import column_names
+from db_backend import get_table_columns, table_exists
+from star_schema import label_joins, stored_column
+
+# Table listing the distinct filter values present in each dataset table
+DIMENSION_TABLE = "dimension_catalog"
+
+# ---------------------------------------------------------------------------
+# Dimension registry: filter values the dashboard offers.
+#   value  - dataset column holding the values
+#   parent - column the values are listed under ('' when none), e.g. the
+#            quarters of each year or the districts of each state
+# A dimension is recorded for every dataset table that has its columns.
+# ---------------------------------------------------------------------------
+DIMENSIONS = {
+    'year': {'value': 'Year', 'parent': None},
+    'quarter': {'value': 'Quarter', 'parent': 'Year'},
+    'state': {'value': 'State', 'parent': None},
+    'district': {'value': 'District', 'parent': 'State'},
+    'device_brand': {'value': 'Device_Brand', 'parent': None},
+    'transaction_type': {'value': 'Transacion_type', 'parent': None},
+    'insurance_type': {'value': 'Insurance_type', 'parent': None},
+}
+
+
+def create_dimension_table(cursor, table=DIMENSION_TABLE):
+    """Create the dimension catalog table (or a copy named `table`) if it doesn't exist"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        Table_name VARCHAR(64) NOT NULL,
+        Dimension VARCHAR(32) NOT NULL,
+        Parent VARCHAR(128) NOT NULL,
+        Value VARCHAR(128) NOT NULL,
+        PRIMARY KEY (Table_name, Dimension, Parent, Value)
+    )
+    """)
+
+
+def dimensions_of(name):
+    """Dimensions recorded for a dataset table"""
+    columns = set(column_names(name))
+    return [dimension for dimension, spec in DIMENSIONS.items()
+            if spec['value'] in columns and (spec['parent'] is None or spec['parent'] in columns)]
+
+
+def rebuild_dimension_sql(name, dimension, table_columns, table_suffix=""):
+    """INSERT ... SELECT statement listing one dimension of a dataset table.
+
+    Distinct stored values (keys, for labelled columns) are found first and
+    only those are joined to their labels. table_suffix reads and writes
+    suffixed copies of the tables (staging).
+    """
+    spec = DIMENSIONS[dimension]
+    columns = [spec['value']] + ([spec['parent']] if spec['parent'] else [])
+    stored = [stored_column(column, table_columns) for column in columns]
+    labels, joins = label_joins('f', columns, table_columns)
+    parent = f"CAST({labels[1]} AS CHAR(128))" if spec['parent'] else "''"
+    return (f"INSERT INTO {DIMENSION_TABLE}{table_suffix} (Table_name, Dimension, Parent, Value) "
+            f"SELECT '{name}', '{dimension}', {parent}, CAST({labels[0]} AS CHAR(128)) "
+            f"FROM (SELECT DISTINCT {', '.join(stored)} FROM {name}{table_suffix} "
+            f"WHERE {stored[0]} IS NOT NULL) f "
+            f"{joins}").rstrip()
+
+
+def refresh_dimensions(cursor, names, table_suffix=""):
+    """Re-list the dimension values of dataset tables (creating the catalog if needed).
+
+    With a table_suffix the values are read from the suffixed (staging)
+    copies of the tables into a suffixed copy of the catalog, which starts
+    as a copy of the live catalog.
+    """
+    catalog = DIMENSION_TABLE + table_suffix
+    if table_suffix:
+        cursor.execute(f"DROP TABLE IF EXISTS {catalog}")
+        create_dimension_table(cursor, catalog)
+        if table_exists(cursor, DIMENSION_TABLE):
+            cursor.execute(f"INSERT INTO {catalog} SELECT * FROM {DIMENSION_TABLE}")
+    else:
+        create_dimension_table(cursor)
+    for name in names:
+        cursor.execute(f"DELETE FROM {catalog} WHERE Table_name = %s", (name,))
+        table_columns = get_table_columns(cursor, name + table_suffix)
+        for dimension in dimensions_of(name):
+            cursor.execute(rebuild_dimension_sql(name, dimension, table_columns, table_suffix))
+    return len(names)
+
+
+class DimensionCatalog:
+    """Filter values present in the database, per dataset table.
+
+    Loaded once from the loader's dimension_catalog table, so the dashboard
+    only offers years, quarters, states and districts that have rows.
+    Every lookup takes an optional list of tables and returns the values
+    present in any of them (all tables when omitted), sorted.
+    """
+
+    def __init__(self, rows):
+        self.entries = {}
+        for table, dimension, parent, value in rows:
+            self.entries.setdefault((dimension, parent), {}).setdefault(value, set()).add(table)
+
+    @classmethod
+    def load(cls, cursor):
+        if not table_exists(cursor, DIMENSION_TABLE):
+            return cls([])
+        cursor.execute(f"SELECT Table_name, Dimension, Parent, Value FROM {DIMENSION_TABLE}")
+        return cls(cursor.fetchall())
+
+    def values(self, dimension, parent='', tables=None):
+        """Values of a dimension (under a parent value, for nested dimensions)"""
+        present = self.entries.get((dimension, str(parent)), {})
+        return sorted(value for value, found_in in present.items()
+                      if tables is None or found_in.intersection(tables))
+
+    def years(self, tables=None):
+        return sorted(int(year) for year in self.values('year', tables=tables))
+
+    def quarters(self, year, tables=None):
+        return sorted(int(quarter) for quarter in self.values('quarter', year, tables))
+
+    def states(self, tables=None):
+        return self.values('state', tables=tables)
+
+    def districts(self, state, tables=None):
+        return self.values('district', state, tables)
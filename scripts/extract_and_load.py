@@ -1,860 +1,226 @@
-import mysql.connector
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
-import pandas as pd
-import json
-
-# Load environment variables from .env
-load_dotenv()
-
-# Get DB credentials
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-
-cursor = conn.cursor()
-
-# Create database if not exists
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-print(f"✅ Database '{db_name}' checked/created successfully.")
-
-# Reconnect with the database specified
-conn.database = db_name
-
-# Step 1: Create table if not exists
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_transaction (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    Transacion_type VARCHAR(255),
-    Transacion_count BIGINT,
-    Transacion_amount DOUBLE
-)
-""")
-print("✅ Table 'aggregated_transaction' checked/created successfully.")
-
-# Step 2: Define path to data
-data_path = r"D:\phonepe_data_dashboard\data\aggregated\transaction\country\india\state"
-
-# Step 3: Load data into DataFrame
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'Transacion_type': [], 'Transacion_count': [], 'Transacion_amount': []
-}
-
-state_list = os.listdir(data_path)
-
-for state in state_list:
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    years = os.listdir(state_path)
-    for year in years:
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        quarters = os.listdir(year_path)
-        for quarter_file in quarters:
-            try:
-                file_path = os.path.join(year_path, quarter_file)
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-
-                for txn in data['data']['transactionData']:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['Transacion_type'].append(txn['name'])
-                    clm['Transacion_count'].append(txn['paymentInstruments'][0]['count'])
-                    clm['Transacion_amount'].append(txn['paymentInstruments'][0]['amount'])
-            except Exception as e:
-                print(f"⚠️ Error reading/parsing file {file_path}: {e}")
-
-# Step 4: Convert to DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created with aggregated transaction data.")
-
-# Step 5: Insert DataFrame into MySQL
-insert_query = """
-INSERT INTO aggregated_transaction 
-(State, Year, Quarter, Transacion_type, Transacion_count, Transacion_amount)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into MySQL table 'aggregated_transaction'.")
-
-# Step 6: Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed. All done!")
-
-
-
-
-
-
-#*************************************************************aggregated_user***********************************
-# Load environment variables
-load_dotenv()
-
-# Get DB credentials
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-
-cursor = conn.cursor()
-
-# Ensure the DB exists (optional safety)
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-print(f"✅ Database '{db_name}' checked/created successfully.")
-
-# Use the database
-conn.database = db_name  # ✅ Yes, this line is needed in each script
-
-
-
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_user (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    Device_Brand VARCHAR(255),
-    User_Count BIGINT,
-    User_Percentage FLOAT
-)
-""")
-print("✅ Table 'aggregated_user' checked/created successfully.")
-
-# Step 2: Define path to data
-data_path = r"D:\phonepe_data_dashboard\data\aggregated\user\country\india\state"
-
-# Step 3: Load data into DataFrame
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'Device_Brand': [], 'User_Count': [], 'User_Percentage': []
-}
-
-state_list = os.listdir(data_path)
-
-for state in state_list:
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    years = os.listdir(state_path)
-    for year in years:
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        quarters = os.listdir(year_path)
-        for quarter_file in quarters:
-            try:
-                file_path = os.path.join(year_path, quarter_file)
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-
-                if data['data']['usersByDevice'] is not None:
-                    for user in data['data']['usersByDevice']:
-                        clm['State'].append(state)
-                        clm['Year'].append(year)
-                        clm['Quarter'].append(int(quarter_file.strip('.json')))
-                        clm['Device_Brand'].append(user['brand'])
-                        clm['User_Count'].append(user['count'])
-                        clm['User_Percentage'].append(user['percentage'])
-
-            except Exception as e:
-                print(f"⚠️ Error reading/parsing file {file_path}: {e}")
-
-# Step 4: Convert to DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created with aggregated user data.")
-
-# Step 5: Insert DataFrame into MySQL
-insert_query = """
-INSERT INTO aggregated_user 
-(State, Year, Quarter, Device_Brand, User_Count, User_Percentage)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into MySQL table 'aggregated_user'.")
-
-# Step 6: Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed. All done!")
-
-
-
-
-
-
-#*******************************************************MAP_transaction***********************************************
-
-
-# Load environment variables
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-cursor = conn.cursor()
-
-# Ensure DB exists and reconnect with it
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-print(f"✅ Connected to database '{db_name}'")
-
-# Step 1: Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_transaction (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    District VARCHAR(255),
-    Transaction_count BIGINT,
-    Transaction_amount DOUBLE
-)
-""")
-print("✅ Table 'map_transaction' checked/created successfully.")
-
-# Step 2: Define data path
-data_path = r"D:\phonepe_data_dashboard\data\map\transaction\hover\country\india\state"
-
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'District': [], 'Transaction_count': [], 'Transaction_amount': []
-}
-
-state_list = os.listdir(data_path)
-
-# Step 3: Extract data
-for state in state_list:
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    years = os.listdir(state_path)
-    for year in years:
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        quarters = os.listdir(year_path)
-        for quarter_file in quarters:
-            try:
-                file_path = os.path.join(year_path, quarter_file)
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-
-                for district_info in data['data']['hoverDataList']:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['District'].append(district_info['name'])
-                    clm['Transaction_count'].append(district_info['metric'][0]['count'])
-                    clm['Transaction_amount'].append(district_info['metric'][0]['amount'])
-
-            except Exception as e:
-                print(f"⚠️ Error parsing {file_path}: {e}")
-
-# Step 4: Create DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created for 'map_transaction'.")
-
-# Step 5: Insert into MySQL
-insert_query = """
-INSERT INTO map_transaction 
-(State, Year, Quarter, District, Transaction_count, Transaction_amount)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into 'map_transaction'.")
-
-# Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed.")
-
-#************************************************************************MAP_USER*************************
-# Load environment variables
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-cursor = conn.cursor()
-
-# Ensure DB exists and reconnect
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-print(f"✅ Connected to database '{db_name}'")
-
-# Step 1: Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_user (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    District VARCHAR(255),
-    RegisteredUsers BIGINT,
-    AppOpens BIGINT
-)
-""")
-print("✅ Table 'map_user' checked/created successfully.")
-
-# Step 2: Set path
-data_path = r"D:\phonepe_data_dashboard\data\map\user\hover\country\india\state"
-
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'District': [], 'RegisteredUsers': [], 'AppOpens': []
-}
-
-# Step 3: Extract data
-for state in os.listdir(data_path):
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    for year in os.listdir(state_path):
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        for quarter_file in os.listdir(year_path):
-            file_path = os.path.join(year_path, quarter_file)
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-
-                hover_data = data['data']['hoverData']
-                for district, values in hover_data.items():
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['District'].append(district)
-                    clm['RegisteredUsers'].append(values.get('registeredUsers', 0))
-                    clm['AppOpens'].append(values.get('appOpens', 0))
-
-            except Exception as e:
-                print(f"⚠️ Error parsing {file_path}: {e}")
-
-# Step 4: Create DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created for 'map_user'.")
-
-# Step 5: Insert into MySQL
-insert_query = """
-INSERT INTO map_user 
-(State, Year, Quarter, District, RegisteredUsers, AppOpens)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into 'map_user'.")
-
-# Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed.")
-
-#***********************************************************************TOP_TRANSACTION*******************************************
-# Load environment variables
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-cursor = conn.cursor()
-
-# Ensure DB exists and reconnect
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-print(f"✅ Connected to database '{db_name}'")
-
-# Step 1: Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_transaction (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    District VARCHAR(255),
-    Transaction_count BIGINT,
-    Transaction_amount DOUBLE
-)
-""")
-print("✅ Table 'top_transaction' checked/created successfully.")
-
-# Step 2: Set path
-data_path = r"D:\phonepe_data_dashboard\data\top\transaction\country\india\state"
-
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'District': [], 'Transaction_count': [], 'Transaction_amount': []
-}
-
-# Step 3: Extract data
-for state in os.listdir(data_path):
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    for year in os.listdir(state_path):
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        for quarter_file in os.listdir(year_path):
-            file_path = os.path.join(year_path, quarter_file)
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-
-                districts = data['data'].get('districts', [])
-                for district in districts:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['District'].append(district.get('entityName', 'Unknown'))
-                    clm['Transaction_count'].append(district['metric'].get('count', 0))
-                    clm['Transaction_amount'].append(district['metric'].get('amount', 0.0))
-
-            except Exception as e:
-                print(f"⚠️ Error parsing {file_path}: {e}")
-
-# Step 4: Create DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created for 'top_transaction'.")
-
-# Step 5: Insert into MySQL
-insert_query = """
-INSERT INTO top_transaction 
-(State, Year, Quarter, District, Transaction_count, Transaction_amount)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into 'top_transaction'.")
-
-# Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed.")
-
-#***************************************************************TOP_USER****************************************
-# Load environment variables
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-cursor = conn.cursor()
-
-# Ensure database exists and reconnect
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-print(f"✅ Connected to database '{db_name}'")
-
-# Step 1: Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_user (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    District VARCHAR(255),
-    Registered_users BIGINT,
-    App_opens BIGINT
-)
-""")
-print("✅ Table 'top_user' checked/created successfully.")
-
-# Step 2: Set path
-data_path = r"D:\phonepe_data_dashboard\data\top\user\country\india\state"
-
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'District': [], 'Registered_users': [], 'App_opens': []
-}
-
-# Step 3: Extract data
-for state in os.listdir(data_path):
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    for year in os.listdir(state_path):
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        for quarter_file in os.listdir(year_path):
-            file_path = os.path.join(year_path, quarter_file)
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-
-                districts = data['data'].get('districts', [])
-                for district in districts:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['District'].append(district.get('name', 'Unknown'))
-                    clm['Registered_users'].append(district.get('registeredUsers', 0))
-                    clm['App_opens'].append(district.get('appOpens', 0))
-
-            except Exception as e:
-                print(f"⚠️ Error parsing {file_path}: {e}")
-
-# Step 4: Create DataFrame
-df = pd.DataFrame(clm)
-print("✅ DataFrame created for 'top_user'.")
-
-# Step 5: Insert into MySQL
-insert_query = """
-INSERT INTO top_user 
-(State, Year, Quarter, District, Registered_users, App_opens)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into 'top_user'.")
-
-# Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed.")
-
-#************************************************************AGGREGATED_INSURANCE**********************************************
-
-# Load credentials
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect
-conn = mysql.connector.connect(host=host, user=user, password=password)
-cursor = conn.cursor()
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-print("✅ Connected to database.")
-
-# Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS aggregated_insurance (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    Insurance_type VARCHAR(255),
-    Insurance_count BIGINT,
-    Insurance_amount DOUBLE
-)
-""")
-print("✅ Table 'aggregated_insurance' created.")
-
-# Load data
-path = r"D:\phonepe_data_dashboard\data\aggregated\insurance\country\india\state"
-clm = {'State': [], 'Year': [], 'Quarter': [], 'Insurance_type': [], 'Insurance_count': [], 'Insurance_amount': []}
-
-for state in os.listdir(path):
-    for year in os.listdir(os.path.join(path, state)):
-        for file in os.listdir(os.path.join(path, state, year)):
-            try:
-                with open(os.path.join(path, state, year, file), 'r') as f:
-                    data = json.load(f)
-
-                for entry in data['data']['transactionData']:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(file.strip('.json')))
-                    clm['Insurance_type'].append(entry['name'])
-                    clm['Insurance_count'].append(entry['paymentInstruments'][0]['count'])
-                    clm['Insurance_amount'].append(entry['paymentInstruments'][0]['amount'])
-            except Exception as e:
-                print(f"⚠️ Error reading {file}: {e}")
-
-df = pd.DataFrame(clm)
-print("✅ DataFrame created for 'aggregated_insurance'.")
-
-# Insert into SQL
-insert_query = """
-INSERT INTO aggregated_insurance 
-(State, Year, Quarter, Insurance_type, Insurance_count, Insurance_amount)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into 'aggregated_insurance'.")
-cursor.close()
-conn.close()
-
-
-#*************************************************MAP_INSURANCE*********************************
-import os
-import json
-import pandas as pd
-import mysql.connector
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(host=host, user=user, password=password)
-cursor = conn.cursor()
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-
-# Create table if not exists
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS map_insurance (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    District VARCHAR(255),
-    Latitude DOUBLE,
-    Longitude DOUBLE,
-    Insurance_Count BIGINT
-)
-""")
-
-# Path to data
-data_path = r"D:\phonepe_data_dashboard\data\map\insurance\country\india\state"
-
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'District': [], 'Latitude': [], 'Longitude': [],
-    'Insurance_Count': []
-}
-
-state_list = os.listdir(data_path)
-
-for state in state_list:
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    for year in os.listdir(state_path):
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
+from bulk_loader import bulk_insert
+from data_version import bump_data_version
+from db_backend import connect, describe_backend, is_locked_by_another_process
+from datasets import DATASETS, source_path, get_data_dir
+from manifest import find_changed_files, delete_affected_rows, record_files, relative_path
+from checkpoint import (clear_checkpoint, create_checkpoint_table, record_checkpoint, resume_point,
+                        start_checkpoint)
+from migrations import migrate, create_dataset_table
+from parse_cache import stream_with_cache
+from load_pipeline import plan_chunk_rows, stream_parsed, whole_units
+from dimensions import DIMENSION_TABLE, refresh_dimensions
+from rollups import rollups_for, refresh_rollups
+from snapshot import STAGING_SUFFIX, check_staged_dataset, count_rows, publish, stage_dataset, staging_table
+from star_schema import StarKeys
+from pulse_extract import list_quarter_files, get_default_jobs
+
+
+def connect_to_database():
+    """Connect to the configured backend (DB_BACKEND), creating the MySQL database if missing"""
+    try:
+        conn, cursor = connect(create_database=True)
+    except Exception as e:
+        if not is_locked_by_another_process(e):
+            raise
+        raise SystemExit(f"❌ {describe_backend()} is in use by another process: {e}\n"
+                         "   DuckDB files can't be loaded while the dashboard (or any other "
+                         "process) has them open. Stop the dashboard first, then rerun the load.")
+    print(f"✅ Connected to {describe_backend()}")
+    return conn, cursor
+
+
+def scan_sources(names):
+    """Walk the source folder of every selected dataset once, up front"""
+    sources = {}
+    for name in names:
+        data_path = source_path(name)
+        if not os.path.isdir(data_path):
+            print(f"⚠️ Source folder for '{name}' not found: {data_path}")
+            sources[name] = (data_path, [])
             continue
-
-        for quarter_file in os.listdir(year_path):
-            file_path = os.path.join(year_path, quarter_file)
-            try:
-                with open(file_path, 'r') as file:
-                    data = json.load(file)
-                columns_in_file = data.get("data", {}).get("columns", [])
-                entries = data.get("data", {}).get("data", [])
-                for row in entries:
-                    row_dict = dict(zip(columns_in_file, row))
-                    lat = row_dict.get("lat")
-                    lng = row_dict.get("lng")
-                    metric = row_dict.get("metric")
-                    district = row_dict.get("label")
-                    if None in [lat, lng, metric, district]:
-                        continue
-                    clm["State"].append(state)
-                    clm["Year"].append(year)
-                    clm["Quarter"].append(int(quarter_file.strip(".json")))
-                    clm["District"].append(district)
-                    clm["Latitude"].append(lat)
-                    clm["Longitude"].append(lng)
-                    clm["Insurance_Count"].append(int(metric))
-            except Exception as e:
-                print(f"⚠️ Error processing {file_path}: {e}")
-
-# Convert to DataFrame
-df = pd.DataFrame(clm)
-print(f"✅ DataFrame created with {len(df)} records.")
-
-# Insert DataFrame into MySQL
-insert_query = """
-INSERT INTO map_insurance 
-(State, Year, Quarter, District, Latitude, Longitude, Insurance_Count)
-VALUES (%s, %s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into MySQL table 'map_insurance'.")
-
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed. All done!")
-
-
-#*************************************TOP_INSURANCE*****************************
-load_dotenv()
-
-# DB Credentials
-host = os.getenv("DB_HOST")
-user = os.getenv("DB_USER")
-password = os.getenv("DB_PASSWORD")
-db_name = os.getenv("DB_NAME")
-
-# Connect to MySQL
-conn = mysql.connector.connect(
-    host=host,
-    user=user,
-    password=password
-)
-cursor = conn.cursor()
-
-# Create DB if not exists
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
-conn.database = db_name
-
-# Create table
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS top_insurance (
-    State VARCHAR(255),
-    Year VARCHAR(10),
-    Quarter INT,
-    Pincode VARCHAR(20),
-    Count BIGINT,
-    Amount DOUBLE
-)
-""")
-print("✅ Table 'top_insurance' checked/created successfully.")
-
-# Define path
-data_path = r"D:\phonepe_data_dashboard\data\top\insurance\country\india\state"
-
-# Collect data
-clm = {
-    'State': [], 'Year': [], 'Quarter': [],
-    'Pincode': [], 'Count': [], 'Amount': []
-}
-
-states = os.listdir(data_path)
-
-for state in states:
-    state_path = os.path.join(data_path, state)
-    if not os.path.isdir(state_path):
-        continue
-
-    years = os.listdir(state_path)
-    for year in years:
-        year_path = os.path.join(state_path, year)
-        if not os.path.isdir(year_path):
-            continue
-
-        quarters = os.listdir(year_path)
-        for quarter_file in quarters:
-            file_path = os.path.join(year_path, quarter_file)
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-
-                pincodes = data['data'].get('pincodes', [])
-                for entry in pincodes:
-                    clm['State'].append(state)
-                    clm['Year'].append(year)
-                    clm['Quarter'].append(int(quarter_file.strip('.json')))
-                    clm['Pincode'].append(entry['entityName'])
-                    clm['Count'].append(entry['metric']['count'])
-                    clm['Amount'].append(entry['metric']['amount'])
-            except Exception as e:
-                print(f"⚠️ Error parsing {file_path}: {e}")
-
-# Create DataFrame
-df = pd.DataFrame(clm)
-print(f"✅ DataFrame created with {len(df)} records.")
-
-# Insert into MySQL
-insert_query = """
-INSERT INTO top_insurance 
-(State, Year, Quarter, Pincode, Count, Amount)
-VALUES (%s, %s, %s, %s, %s, %s)
-"""
-
-for row in df.itertuples(index=False):
-    cursor.execute(insert_query, tuple(row))
-
-conn.commit()
-print("✅ Data inserted into MySQL table 'top_insurance'.")
-
-# Cleanup
-cursor.close()
-conn.close()
-print("✅ MySQL connection closed. All done!")
\ No newline at end of file
+        sources[name] = (data_path, list_quarter_files(data_path))
+    return sources
+
+
+def ingest(conn, cursor, name, data_path, files, args, star_keys, pool=None):
+    """Load new or changed quarter files of one dataset into its staging table.
+
+    Files already recorded in the manifest with the same size/mtime/hash are
+    skipped. The live table is never written: a full reload fills an empty
+    staging copy, a partial one copies the live rows and deletes those of
+    every (State, Year, Quarter) being reloaded, so reruns replace data
+    instead of appending duplicates. The changed files then stream through
+    the pipeline (parser -> typed chunks of a fixed row count -> labels
+    swapped for dimension keys -> bulk insert), so memory stays flat however
+    much history a dataset holds.
+
+    Every chunk commits together with the checkpoint rows of the files it
+    completes, so a load that is killed resumes where it stopped: the next
+    run keeps the staging table and only loads the files not yet
+    checkpointed. The staged rows are checked before run() publishes them.
+    Returns (changed files, manifest entries to record).
+    """
+    # Step 1: Create table (with keys and indexes) if not exists
+    create_dataset_table(cursor, name)
+    print(f"✅ Table '{name}' checked/created successfully.")
+
+    # Step 2: Work out which files need loading
+    changed, entries = find_changed_files(cursor, name, data_path, files, args.full_refresh)
+    print(f"🔎 {len(changed)} of {len(files)} files new or changed for '{name}'.")
+    if not changed:
+        # Nothing to publish: drop what an interrupted load may have staged
+        cursor.execute(f"DROP TABLE IF EXISTS {staging_table(name)}")
+        clear_checkpoint(cursor, [name])
+        conn.commit()
+        return changed, entries
+
+    # Step 3: Pick up the staging table of an interrupted load, or start a new one
+    full_reload = len(changed) == len(files)
+    start = "empty" if full_reload else "copy"
+    stage = staging_table(name)
+    digests = {rel_path: digest for _, rel_path, _, _, digest in entries}
+    # Checkpoint row of each (State, Year, Quarter) unit being loaded
+    units = {}
+    for state, year, quarter, file_path in changed:
+        rel_path = relative_path(data_path, file_path)
+        units[(state, year, quarter)] = (name, rel_path, digests[rel_path])
+    staged = resume_point(cursor, name, start, [rel_path for _, rel_path, _ in units.values()])
+    if staged is None:
+        stage_dataset(cursor, name, keep_live_rows=not full_reload)
+        start_checkpoint(cursor, name, start)
+        staged = {}
+    pending = [file_info for file_info in changed
+               if staged.get(units[file_info[:3]][1]) != units[file_info[:3]][2]]
+    if staged:
+        print(f"⏯️ Resuming '{name}': {len(changed) - len(pending)} of {len(changed)} files already staged.")
+    if pending and (staged or not full_reload):
+        # Stage rows of the files about to load: live rows being replaced, or a half-loaded chunk
+        deleted = delete_affected_rows(cursor, stage, pending, star_keys.keys['State'])
+        print(f"🧹 Replacing rows for {deleted} (State, Year, Quarter) periods.")
+    conn.commit()
+    kept = count_rows(cursor, stage)
+
+    # Step 4: Stream the pending files in, one checkpointed chunk at a time
+    inserted = 0
+    if pending:
+        chunk_rows = plan_chunk_rows(name)
+        if args.no_cache:
+            chunks = stream_parsed(name, pending, chunk_rows, args.jobs, pool)
+        else:
+            chunks = stream_with_cache(name, data_path, files, chunk_rows,
+                                       wanted=pending, jobs=args.jobs, pool=pool)
+        for chunk, completed in whole_units(chunks):
+            inserted += bulk_insert(cursor, stage, star_keys.encode(cursor, chunk))
+            record_checkpoint(cursor, [units[unit] for unit in completed])
+            conn.commit()
+        # Files that parsed to no rows are done too
+        record_checkpoint(cursor, [units[file_info[:3]] for file_info in pending])
+        conn.commit()
+        print(f"✅ {inserted} rows staged in chunks of up to {chunk_rows}.")
+
+    check_staged_dataset(cursor, name, kept + inserted)
+    return changed, entries
+
+
+def run(names, args):
+    """Scan, extract and load the selected datasets over one connection and one worker pool.
+
+    Every updated table, its rollups and the dimension catalog are built as
+    staging copies and published together in one swap, which also records
+    the manifest and bumps the data version: the dashboard never sees a
+    half-finished load. On MySQL and SQLite it keeps reading the previous
+    snapshot meanwhile; a DuckDB file can only be loaded with the dashboard
+    stopped (see connect_to_database).
+    """
+    conn, cursor = connect_to_database()
+
+    applied = migrate(conn, cursor)
+    if applied and len(names) < len(DATASETS):
+        # Migrations rebuild every table, so a partial load would leave some empty
+        print("🛠️ Schema migrated: loading all datasets this run.")
+        names = list(DATASETS)
+
+    create_checkpoint_table(cursor)
+    if applied:
+        # Staging tables of an interrupted load have the old layout
+        clear_checkpoint(cursor)
+    sources = scan_sources(names)
+    star_keys = StarKeys.load(cursor)
+
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        updated = []
+        entries = []
+        for name in names:
+            data_path, files = sources[name]
+            changed, recorded = ingest(conn, cursor, name, data_path, files, args, star_keys, pool)
+            entries += recorded
+            if changed:
+                updated.append(name)
+
+        # Stage the dashboard rollups of every table whose rows changed
+        rollups = rollups_for(updated)
+        refresh_rollups(cursor, rollups, STAGING_SUFFIX)
+        # ... and the filter values the dashboard offers for them
+        if updated:
+            refresh_dimensions(cursor, updated, STAGING_SUFFIX)
+        conn.commit()
+
+        def finish(cursor):
+            record_files(cursor, entries)
+            clear_checkpoint(cursor, updated)
+            if updated or applied:
+                # Invalidates the dashboard's cached query results
+                version = bump_data_version(cursor)
+                print(f"🔖 Data version is now {version}.")
+
+        tables = updated + rollups + ([DIMENSION_TABLE] if updated else [])
+        publish(conn, cursor, tables, finish)
+        if tables:
+            print(f"📦 Published {len(updated)} table(s), {len(rollups)} rollup(s) and the dimension catalog.")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        cursor.close()
+        conn.close()
+        print("✅ Database connection closed.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract PhonePe Pulse JSON and load it into the database")
+    parser.add_argument("datasets", nargs="*", metavar="DATASET",
+                        help="datasets to load (default: all). Use --list to see the names")
+    parser.add_argument("--list", action="store_true", help="list the registered datasets and exit")
+    parser.add_argument("--jobs", type=int, default=get_default_jobs(),
+                        help="worker processes used to parse JSON files (default: CPU count)")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="ignore the ingest manifest and reload every file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse JSON directly instead of going through the Parquet parse cache")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    if args.list:
+        for name in DATASETS:
+            print(f"{name:<24} {source_path(name)}")
+        return
+
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+    names = args.datasets or list(DATASETS)
+
+    print(f"📂 Reading Pulse data from {get_data_dir()}")
+    print(f"⚙️ Extracting with {args.jobs} worker process(es).")
+    run(names, args)
+    print("✅ All done!")
+
+
+# The guard keeps worker processes (spawned on Windows) from re-running the load
+if __name__ == "__main__":
+    main()
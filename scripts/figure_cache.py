@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+# Memory budget for cached figures, in MB of figure JSON
+DEFAULT_FIGURE_CACHE_MB = 64
+
+
+def get_figure_cache_mb():
+    """Figure cache budget in MB (FIGURE_CACHE_MB in .env, default 64)"""
+    try:
+        return max(1, int(os.getenv("FIGURE_CACHE_MB", DEFAULT_FIGURE_CACHE_MB)))
+    except ValueError:
+        return DEFAULT_FIGURE_CACHE_MB
+
+
+class FigureCache:
+    """LRU cache of finished Plotly figures as JSON, bounded by the size of that JSON.
+
+    Keys are (panel id, filters, data version). Entries hold the figure's
+    JSON text, not the Figure: every session gets its own figure rebuilt
+    from it, so changing a figure after caching it (or after a hit) can't
+    leak into what other sessions are shown. Each entry is charged the
+    length of its JSON, which is what the browser receives.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or get_figure_cache_mb() * 1024 * 1024
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Figure rebuilt from the JSON cached for key, or None"""
+        with self.lock:
+            text = self.entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return pio.from_json(text)
+
+    def put(self, key, figure):
+        """Cache figure's JSON under key and return the figure"""
+        text = figure.to_json()
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= len(self.entries.pop(key))
+            if len(text) > self.max_bytes:
+                # Never cache a figure bigger than the whole budget
+                return figure
+            self.entries[key] = text
+            self.bytes += len(text)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+        return figure
+
+    def get_or_build(self, key, build):
+        """(figure, True) from the cache for key, or (build(), False) after caching it"""
+        figure = self.get(key)
+        if figure is not None:
+            return figure, True
+        return self.put(key, build()), False
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
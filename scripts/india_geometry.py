@@ -0,0 +1,80 @@
+import json
+import os
+
+# Vendored India state outlines, written by build_geometry.py (one GeoJSON per level).
+# The shipped files are traced from the Pulse insurance grid and only approximate
+# the state borders; build_geometry.py --source replaces them with a real boundary file.
+GEOMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app", "geo")
+
+# Detail level -> simplification tolerance in degrees. Coarser levels have
+# fewer vertices, so the figure sent to the browser is smaller.
+GEOMETRY_LEVELS = {'detailed': 0.02, 'balanced': 0.05, 'light': 0.1}
+DEFAULT_GEOMETRY_LEVEL = 'balanced'
+
+# Pulse state slug -> geometry feature id (ISO 3166-2:IN code)
+STATE_IDS = {
+    'andaman-&-nicobar-islands': 'IN-AN',
+    'andhra-pradesh': 'IN-AP',
+    'arunachal-pradesh': 'IN-AR',
+    'assam': 'IN-AS',
+    'bihar': 'IN-BR',
+    'chandigarh': 'IN-CH',
+    'chhattisgarh': 'IN-CG',
+    'dadra-&-nagar-haveli-&-daman-&-diu': 'IN-DH',
+    'delhi': 'IN-DL',
+    'goa': 'IN-GA',
+    'gujarat': 'IN-GJ',
+    'haryana': 'IN-HR',
+    'himachal-pradesh': 'IN-HP',
+    'jammu-&-kashmir': 'IN-JK',
+    'jharkhand': 'IN-JH',
+    'karnataka': 'IN-KA',
+    'kerala': 'IN-KL',
+    'ladakh': 'IN-LA',
+    'lakshadweep': 'IN-LD',
+    'madhya-pradesh': 'IN-MP',
+    'maharashtra': 'IN-MH',
+    'manipur': 'IN-MN',
+    'meghalaya': 'IN-ML',
+    'mizoram': 'IN-MZ',
+    'nagaland': 'IN-NL',
+    'odisha': 'IN-OD',
+    'puducherry': 'IN-PY',
+    'punjab': 'IN-PB',
+    'rajasthan': 'IN-RJ',
+    'sikkim': 'IN-SK',
+    'tamil-nadu': 'IN-TN',
+    'telangana': 'IN-TS',
+    'tripura': 'IN-TR',
+    'uttar-pradesh': 'IN-UP',
+    'uttarakhand': 'IN-UK',
+    'west-bengal': 'IN-WB',
+}
+
+
+def state_slug(name):
+    """Pulse slug of a state name ('Tamil Nadu' -> 'tamil-nadu', 'Jammu and Kashmir' -> 'jammu-&-kashmir')"""
+    words = name.strip().lower().replace(" and ", " & ").split()
+    return "-".join(words)
+
+
+def geometry_path(level):
+    return os.path.join(GEOMETRY_DIR, f"india_states_{level}.geojson")
+
+
+def geometry_source(geometry):
+    """(approximate, attribution) recorded by build_geometry.py in a FeatureCollection.
+
+    Files without the record predate it and were traced from the Pulse
+    grid, so they count as approximate.
+    """
+    source = geometry.get('metadata') or {}
+    return source.get('approximate', True), source.get('attribution', "Approximate state outlines")
+
+
+def load_state_geometry(level=DEFAULT_GEOMETRY_LEVEL):
+    """FeatureCollection of state outlines at a detail level; features have id = STATE_IDS[slug]"""
+    if level not in GEOMETRY_LEVELS:
+        raise ValueError(f"Unknown geometry level '{level}' (choose from {', '.join(GEOMETRY_LEVELS)})")
+    with open(geometry_path(level), encoding="utf-8") as f:
+        return json.load(f)
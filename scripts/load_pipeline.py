@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from datasets import DATASETS, column_names
+from pulse_extract import iter_extracted
+
+# Rows per chunk handed to the database writer (LOAD_CHUNK_ROWS in .env)
+DEFAULT_CHUNK_ROWS = 50000
+# Rough ceiling, in MB, on the parsed rows the loader holds at once (LOAD_MEMORY_MB in .env)
+DEFAULT_LOAD_MEMORY_MB = 256
+
+# Column dtype of each SQL type used in the dataset registry (text stays object)
+SQL_DTYPES = {
+    'TINYINT': np.int8,
+    'SMALLINT': np.int16,
+    'INT': np.int32,
+    'BIGINT': np.int64,
+    'FLOAT': np.float64,
+    'DOUBLE': np.float64,
+}
+
+# Columns identifying the quarter file (load unit) a row came from
+UNIT_COLUMNS = ['State', 'Year', 'Quarter']
+
+# Approximate bytes of one parsed value while it sits in a Python list:
+# the list slot plus the boxed int / float, or a short str
+VALUE_BYTES = 40
+TEXT_BYTES = 80
+
+
+def _env_int(name, default):
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def get_chunk_rows():
+    return _env_int("LOAD_CHUNK_ROWS", DEFAULT_CHUNK_ROWS)
+
+
+def get_load_memory_mb():
+    return _env_int("LOAD_MEMORY_MB", DEFAULT_LOAD_MEMORY_MB)
+
+
+def column_dtypes(name):
+    """{column: dtype} of a dataset's chunks, from its SQL column types"""
+    return {column: SQL_DTYPES.get(sql_type.split('(')[0], object)
+            for column, sql_type in DATASETS[name]['columns']}
+
+
+def row_bytes(name):
+    """Estimated memory of one parsed row of a dataset"""
+    return sum(TEXT_BYTES if dtype is object else VALUE_BYTES
+               for dtype in column_dtypes(name).values())
+
+
+def plan_chunk_rows(name, chunk_rows=None, memory_mb=None):
+    """Rows per chunk for a dataset, cut down so the loader stays under the memory ceiling.
+
+    At any time the loader holds the row buffer (up to one chunk plus one
+    parsed batch), the typed chunk being written and the parsed batches
+    waiting in the pool, so a chunk gets a third of the budget.
+    """
+    chunk_rows = chunk_rows or get_chunk_rows()
+    budget_rows = (memory_mb or get_load_memory_mb()) * 1024 * 1024 // row_bytes(name)
+    return max(1000, min(chunk_rows, budget_rows // 3))
+
+
+def _typed(values, dtype):
+    if dtype is object:
+        return pd.Series(values, dtype=object)
+    try:
+        return pd.Series(values).astype(dtype)
+    except (TypeError, ValueError):
+        # Missing values in a numeric column: keep them as NaN (NULL in the table)
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+
+
+def typed_frame(name, clm):
+    """DataFrame of a columnar dict, with each column in its dataset dtype"""
+    return pd.DataFrame({column: _typed(clm[column], dtype)
+                         for column, dtype in column_dtypes(name).items()})
+
+
+def rechunk(name, clm_chunks, chunk_rows):
+    """Typed DataFrames of chunk_rows rows (the last one shorter) from columnar dicts of any size"""
+    columns = column_names(name)
+    buffer = {column: [] for column in columns}
+    size = 0
+    for clm in clm_chunks:
+        for column in columns:
+            buffer[column].extend(clm[column])
+        size += len(clm[columns[0]])
+        while size >= chunk_rows:
+            yield typed_frame(name, {column: values[:chunk_rows] for column, values in buffer.items()})
+            for values in buffer.values():
+                del values[:chunk_rows]
+            size -= chunk_rows
+    if size:
+        yield typed_frame(name, buffer)
+
+
+def stream_parsed(name, files, chunk_rows, jobs=None, pool=None):
+    """Parse quarter files straight from JSON into typed chunks of chunk_rows rows"""
+    parsed = iter_extracted(DATASETS[name]['parser'], column_names(name), files, jobs, pool)
+    yield from rechunk(name, parsed, chunk_rows)
+
+
+def whole_units(chunks):
+    """Yield (chunk, units): chunks cut back so no (State, Year, Quarter) unit spans two of them.
+
+    Each quarter file's rows arrive together, so only the last unit of a
+    chunk can continue in the next one; its rows are held back and go out
+    at the front of the next chunk. `units` lists the (state, year, quarter)
+    keys the chunk completes, which lets a caller checkpoint per file.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        keys = chunk[UNIT_COLUMNS]
+        last = keys.iloc[-1]
+        tail = (keys == last).all(axis=1).to_numpy()
+        carry = chunk[tail]
+        done = chunk[~tail].reset_index(drop=True)
+        if len(done):
+            yield done, list(done[UNIT_COLUMNS].drop_duplicates().itertuples(index=False, name=None))
+    if carry is not None and len(carry):
+        yield carry.reset_index(drop=True), [tuple(carry[UNIT_COLUMNS].iloc[0])]
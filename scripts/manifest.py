@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+# Table recording every ingested source file, one row per (table, file)
+MANIFEST_TABLE = "ingest_manifest"
+
+
+def create_manifest_table(cursor):
+    """Create the ingest manifest table if it does not exist"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+        Table_name VARCHAR(64) NOT NULL,
+        File_path VARCHAR(255) NOT NULL,
+        File_size BIGINT,
+        File_mtime DOUBLE,
+        Content_hash CHAR(64),
+        PRIMARY KEY (Table_name, File_path)
+    )
+    """)
+
+
+def file_hash(file_path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def relative_path(data_path, file_path):
+    """Path of a source file relative to its dataset folder, as stored in the manifest"""
+    return os.path.relpath(file_path, data_path).replace(os.sep, '/')
+
+
+def load_manifest(cursor, table_name):
+    """Return {relative path: (size, mtime, hash)} for files already ingested into table_name"""
+    cursor.execute(
+        f"SELECT File_path, File_size, File_mtime, Content_hash FROM {MANIFEST_TABLE} WHERE Table_name = %s",
+        (table_name,)
+    )
+    return {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+
+def find_changed_files(cursor, table_name, data_path, files, full_refresh=False):
+    """Split quarter files into those that need (re)loading and the rest.
+
+    A file is unchanged when its size and mtime match the manifest; if only
+    the mtime moved, the content hash decides. Returns (changed, entries)
+    where entries holds the manifest rows to record once the load commits.
+    """
+    manifest = {} if full_refresh else load_manifest(cursor, table_name)
+    changed = []
+    entries = []
+
+    for file_info in files:
+        file_path = file_info[3]
+        rel_path = relative_path(data_path, file_path)
+        stat = os.stat(file_path)
+        known = manifest.get(rel_path)
+
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+            continue
+
+        digest = file_hash(file_path)
+        entries.append((table_name, rel_path, stat.st_size, stat.st_mtime, digest))
+        if known and known[2] == digest:
+            continue  # touched but identical: just refresh the stat in the manifest
+        changed.append(file_info)
+
+    return changed, entries
+
+
+def delete_affected_rows(cursor, table_name, files, state_keys):
+    """Remove existing rows for every (State, Year, Quarter) about to be reloaded.
+
+    Fact tables store the state as its dimension key; state_keys maps a
+    state to it (states without a key have no rows yet).
+    """
+    keys = sorted({(state_keys[state], year, quarter) for state, year, quarter, _ in files
+                   if state in state_keys})
+    if keys:
+        cursor.executemany(
+            f"DELETE FROM {table_name} WHERE State_id = %s AND Year = %s AND Quarter = %s",
+            keys
+        )
+    return len(keys)
+
+
+def record_files(cursor, entries):
+    """Upsert manifest rows for the files that were just checked or loaded"""
+    if entries:
+        cursor.executemany(
+            f"REPLACE INTO {MANIFEST_TABLE} "
+            "(Table_name, File_path, File_size, File_mtime, Content_hash) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            entries
+        )
@@ -0,0 +1,243 @@
+import numpy as np
+import pandas as pd
+
+from db_backend import table_exists
+from manifest import MANIFEST_TABLE, load_manifest
+from parse_cache import read_cached_table
+from schema_catalog import SchemaCatalog
+
+# Fact tables held in memory, with the metrics each dashboard query needs.
+# Columns are read through the schema catalog and renamed to metric names.
+ENGINE_TABLES = {
+    'country_transaction': ['transaction_count', 'transaction_amount'],
+    'aggregated_transaction': ['transaction_type', 'transaction_count', 'transaction_amount'],
+    'aggregated_user': ['device_brand', 'user_count', 'user_percentage'],
+    'aggregated_insurance': ['insurance_type', 'insurance_count', 'insurance_amount'],
+    'map_transaction': ['district', 'transaction_count', 'transaction_amount'],
+    'map_user': ['registered_users', 'app_opens'],
+    'top_user': ['district', 'registered_users'],
+}
+
+# Text columns stored as pandas categoricals (integer codes + labels)
+CATEGORY_COLUMNS = ('State', 'district', 'transaction_type', 'device_brand', 'insurance_type')
+
+EMPTY = np.array([], dtype=np.int64)
+
+
+class FactTable:
+    """One fact table as typed columns plus (Year, Quarter) and State row indexes"""
+
+    def __init__(self, df):
+        for column in df.columns:
+            if column in CATEGORY_COLUMNS:
+                df[column] = df[column].astype('category')
+            elif column in ('Year', 'Quarter'):
+                df[column] = df[column].astype(np.int16)
+            else:
+                # Decimal / int / float from any backend -> float64
+                df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+        self.df = df
+        self.period_index = {key: np.asarray(rows, dtype=np.int64)
+                             for key, rows in df.groupby(['Year', 'Quarter']).indices.items()}
+        self.state_index = {key: np.asarray(rows, dtype=np.int64)
+                            for key, rows in df.groupby('State', observed=True).indices.items()}
+
+    def rows(self, year=None, quarter=None, state=None):
+        """Row positions for a period and/or state (all rows when unfiltered)"""
+        rows = None
+        if year is not None:
+            rows = self.period_index.get((int(year), int(quarter)), EMPTY)
+        if state is not None:
+            state_rows = self.state_index.get(state, EMPTY)
+            rows = state_rows if rows is None else np.intersect1d(rows, state_rows, assume_unique=True)
+        return np.arange(len(self.df)) if rows is None else rows
+
+    def values(self, column, rows):
+        return self.df[column].to_numpy()[rows]
+
+    def group_sum(self, key, metrics, rows):
+        """Per-category sums of metrics over rows: (labels, {metric: sums}, row counts)"""
+        categories = self.df[key].cat
+        codes = categories.codes.to_numpy()[rows]
+        valid = codes >= 0
+        codes = codes[valid]
+        size = len(categories.categories)
+        counts = np.bincount(codes, minlength=size)
+        present = counts > 0
+        sums = {metric: np.bincount(codes, weights=self.values(metric, rows)[valid],
+                                    minlength=size)[present]
+                for metric in metrics}
+        return categories.categories.to_numpy()[present], sums, counts[present]
+
+
+def top_n(order_by, limit=None):
+    """Positions sorting order_by descending, cut to limit"""
+    order = np.argsort(-order_by, kind='stable')
+    return order if limit is None else order[:limit]
+
+
+def as_int(value):
+    return int(round(float(value)))
+
+
+class MemoryEngine:
+    """In-process answers to the dashboard's registered queries (dashboard_queries.QUERIES).
+
+    Every fact table the dashboard reads is loaded once into category-encoded
+    pandas columns with (Year, Quarter) and State row indexes, and each query
+    id is answered with NumPy filtering and bincount group-bys. Results have
+    the same row shape as the SQL versions, so callers can use either.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @classmethod
+    def load(cls, cursor):
+        """Load the fact tables, from the loader's Parquet parse cache where it matches the database.
+
+        A table is read from the cache only when the cache was built from the
+        same source files the database's ingest manifest records for it;
+        otherwise (no cache, a newer unpublished load, --no-cache loads) it
+        is queried from the database.
+        """
+        catalog = SchemaCatalog.load(cursor)
+        has_manifest = table_exists(cursor, MANIFEST_TABLE)
+        tables = {}
+        for table_name, metrics in ENGINE_TABLES.items():
+            columns = ["State", "Year", "Quarter"] + [catalog.column(table_name, metric) for metric in metrics]
+            published = load_manifest(cursor, table_name) if has_manifest else {}
+            df = read_cached_table(table_name, columns, published)
+            if df is None:
+                cursor.execute(catalog.select_sql(table_name, columns))
+                df = pd.DataFrame(cursor.fetchall(), columns=columns)
+            df.columns = ["State", "Year", "Quarter"] + metrics
+            tables[table_name] = FactTable(df)
+        return cls(tables)
+
+    def run(self, query_id, **params):
+        """Rows for a registered query id, like cursor.fetchall() on its SQL"""
+        return getattr(self, f"_{query_id}")(**params)
+
+    # -- Home ---------------------------------------------------------------
+
+    def _home_totals(self):
+        # National totals come from the country-level files, the state count from the state files
+        country = self.tables['country_transaction']
+        rows = country.rows(state='india')
+        if not len(rows):
+            return []
+        states = self.tables['aggregated_transaction'].df['State'].cat.categories
+        return [(len(states),
+                 as_int(country.values('transaction_count', rows).sum()),
+                 float(country.values('transaction_amount', rows).sum()))]
+
+    # -- Transaction Dynamics -------------------------------------------------
+
+    def _txn_top_states(self, year, quarter):
+        table = self.tables['aggregated_transaction']
+        states, sums, _ = table.group_sum('State', ['transaction_amount', 'transaction_count'],
+                                          table.rows(year, quarter))
+        return [(states[i], float(sums['transaction_amount'][i]), as_int(sums['transaction_count'][i]))
+                for i in top_n(sums['transaction_amount'], 10)]
+
+    def _txn_types(self, year, quarter):
+        table = self.tables['aggregated_transaction']
+        types, sums, _ = table.group_sum('transaction_type', ['transaction_count', 'transaction_amount'],
+                                         table.rows(year, quarter))
+        return [(types[i], as_int(sums['transaction_count'][i]), float(sums['transaction_amount'][i]))
+                for i in range(len(types))]
+
+    # -- Device & User Analysis -----------------------------------------------
+
+    def _brand_rows(self, year=None, quarter=None):
+        table = self.tables['aggregated_user']
+        rows = table.rows(year, quarter)
+        users = table.values('user_count', rows)
+        brands = table.df['device_brand'].cat.codes.to_numpy()[rows]
+        return table, rows[(users > 0) & (brands >= 0)]
+
+    def _device_check(self, year, quarter):
+        table, rows = self._brand_rows(year, quarter)
+        if not len(rows):
+            return [(0, 0, None)]
+        brands, sums, _ = table.group_sum('device_brand', ['user_count'], rows)
+        return [(len(rows), len(brands), as_int(sums['user_count'].sum()))]
+
+    def _top_brands(self, table, rows):
+        brands, sums, counts = table.group_sum('device_brand', ['user_count', 'user_percentage'], rows)
+        average = np.divide(sums['user_percentage'], counts, out=np.zeros(len(counts)), where=counts > 0)
+        return [(brands[i], as_int(sums['user_count'][i]), float(average[i]))
+                for i in top_n(sums['user_count'], 10)]
+
+    def _device_top_brands(self, year, quarter):
+        return self._top_brands(*self._brand_rows(year, quarter))
+
+    def _device_top_brands_all_time(self):
+        return self._top_brands(*self._brand_rows())
+
+    # -- map_user panels ------------------------------------------------------
+
+    def _users_by_state_rows(self, year, quarter, limit=None):
+        table = self.tables['map_user']
+        rows = table.rows(year, quarter)
+        rows = rows[table.values('registered_users', rows) > 0]
+        states, sums, _ = table.group_sum('State', ['registered_users', 'app_opens'], rows)
+        return [(states[i], as_int(sums['registered_users'][i]), as_int(sums['app_opens'][i]))
+                for i in top_n(sums['registered_users'], limit)]
+
+    def _users_top_states(self, year, quarter):
+        return self._users_by_state_rows(year, quarter, 15)
+
+    def _users_by_state(self, year, quarter):
+        return self._users_by_state_rows(year, quarter)
+
+    def _users_trend(self, from_year, to_year):
+        table = self.tables['map_user']
+        result = []
+        for year, quarter in sorted(table.period_index):
+            if not from_year <= year <= to_year:
+                continue
+            rows = table.rows(year, quarter)
+            users = table.values('registered_users', rows)
+            keep = users > 0
+            if keep.any():
+                result.append((int(year), int(quarter), as_int(users[keep].sum()),
+                               as_int(table.values('app_opens', rows)[keep].sum())))
+        return result
+
+    # -- Insurance Analytics --------------------------------------------------
+
+    def _insurance_group(self, key, year, quarter):
+        table = self.tables['aggregated_insurance']
+        rows = table.rows(year, quarter)
+        rows = rows[(table.values('insurance_count', rows) > 0) & (table.values('insurance_amount', rows) > 0)]
+        return table.group_sum(key, ['insurance_count', 'insurance_amount'], rows)
+
+    def _insurance_top_states(self, year, quarter):
+        states, sums, _ = self._insurance_group('State', year, quarter)
+        return [(states[i], as_int(sums['insurance_count'][i]), float(sums['insurance_amount'][i]))
+                for i in top_n(sums['insurance_amount'], 15)]
+
+    def _insurance_types(self, year, quarter):
+        types, sums, _ = self._insurance_group('insurance_type', year, quarter)
+        return [(types[i], as_int(sums['insurance_count'][i]), float(sums['insurance_amount'][i]))
+                for i in range(len(types))]
+
+    # -- Market Expansion -----------------------------------------------------
+
+    def _market_districts(self, state, year, quarter):
+        table = self.tables['map_transaction']
+        rows = table.rows(year, quarter, state)
+        rows = rows[(table.values('transaction_count', rows) > 0) & (table.values('transaction_amount', rows) > 0)]
+        districts, sums, _ = table.group_sum('district', ['transaction_count', 'transaction_amount'], rows)
+        return [(districts[i], as_int(sums['transaction_count'][i]), float(sums['transaction_amount'][i]))
+                for i in top_n(sums['transaction_amount'], 15)]
+
+    def _market_top_user_districts(self, state, year, quarter):
+        table = self.tables['top_user']
+        rows = table.rows(year, quarter, state)
+        rows = rows[table.values('registered_users', rows) > 0]
+        districts, sums, _ = table.group_sum('district', ['registered_users'], rows)
+        return [(districts[i], as_int(sums['registered_users'][i]))
+                for i in top_n(sums['registered_users'], 10)]
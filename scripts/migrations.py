@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from datasets import DATASETS, create_table_sql, create_index_sql
+from db_backend import table_exists
+from dimensions import DIMENSION_TABLE, refresh_dimensions
+from manifest import MANIFEST_TABLE, create_manifest_table
+from rollups import ROLLUPS, refresh_rollups
+from star_schema import STAR_DIMENSIONS, create_star_dimensions
+
+# Table recording which schema migrations have been applied
+SCHEMA_TABLE = "schema_version"
+
+
+def create_dataset_table(cursor, name):
+    """Create a dataset table with its primary key and indexes, if it does not exist yet"""
+    if table_exists(cursor, name):
+        return False
+    # ... and the dimension tables its keys point into
+    create_star_dimensions(cursor)
+    cursor.execute(create_table_sql(name))
+    for statement in create_index_sql(name):
+        cursor.execute(statement)
+    return True
+
+
+def rebuild_dataset_tables(cursor, names):
+    """Drop and recreate dataset tables, and forget their files in the manifest.
+
+    The next load then refills them (from the parse cache when present)
+    instead of converting legacy rows in SQL, which keeps migrations
+    identical on MySQL, SQLite and DuckDB.
+    """
+    for name in names:
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        create_dataset_table(cursor, name)
+        cursor.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE Table_name = %s", (name,))
+
+
+# ---------------------------------------------------------------------------
+# Migrations, applied in order. Each takes a cursor and must be safe to run
+# against both a fresh database and one created by an older loader.
+# ---------------------------------------------------------------------------
+
+def migration_1_typed_keys(cursor):
+    # Year SMALLINT / Quarter TINYINT, natural primary keys, dashboard indexes
+    rebuild_dataset_tables(cursor, list(DATASETS))
+
+
+def migration_2_rollups(cursor):
+    # Pre-aggregated summary tables read by the dashboard panels
+    for name in ROLLUPS:
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+    refresh_rollups(cursor, [name for name, spec in ROLLUPS.items()
+                             if table_exists(cursor, spec['source'])])
+
+
+def migration_3_dimensions(cursor):
+    # Years, quarters, states, districts, brands and types present per table
+    cursor.execute(f"DROP TABLE IF EXISTS {DIMENSION_TABLE}")
+    refresh_dimensions(cursor, [name for name in DATASETS if table_exists(cursor, name)])
+
+
+def migration_4_map_insurance(cursor):
+    # map_insurance was loaded empty (its grid was read from the wrong level)
+    rebuild_dataset_tables(cursor, ['map_insurance'])
+
+
+def migration_5_pincodes_and_country(cursor):
+    # Pincode tables, country-level tables and the national totals rollup
+    new_tables = ['top_transaction_pincode', 'top_user_pincode',
+                  'country_transaction', 'country_user', 'country_insurance']
+    for name in new_tables:
+        create_dataset_table(cursor, name)
+    refresh_rollups(cursor, ['rollup_country_totals'])
+
+
+def migration_6_star_schema(cursor):
+    # Text columns become integer keys into dim_* tables; the tables are reloaded
+    for spec in STAR_DIMENSIONS.values():
+        cursor.execute(f"DROP TABLE IF EXISTS {spec['table']}")
+    create_star_dimensions(cursor)
+    rebuild_dataset_tables(cursor, list(DATASETS))
+
+
+MIGRATIONS = [
+    (1, "Typed Year/Quarter, primary keys and dashboard indexes", migration_1_typed_keys),
+    (2, "Pre-aggregated rollup tables for dashboard panels", migration_2_rollups),
+    (3, "Dimension catalog of the filter values present per table", migration_3_dimensions),
+    (4, "Reload map_insurance district coordinates", migration_4_map_insurance),
+    (5, "Pincode and country-level tables with national totals", migration_5_pincodes_and_country),
+    (6, "Star schema: dimension tables with integer keys", migration_6_star_schema),
+]
+
+
+def get_schema_version(cursor):
+    """Highest applied migration (0 for a legacy or empty database)"""
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (
+        Version INT NOT NULL PRIMARY KEY,
+        Description VARCHAR(255),
+        Applied_at VARCHAR(32)
+    )
+    """)
+    cursor.execute(f"SELECT MAX(Version) FROM {SCHEMA_TABLE}")
+    row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def migrate(conn, cursor):
+    """Apply pending migrations. Returns the list of versions applied."""
+    create_manifest_table(cursor)
+    current = get_schema_version(cursor)
+    applied = []
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"🛠️ Applying schema migration {version}: {description}")
+        migration(cursor)
+        cursor.execute(
+            f"INSERT INTO {SCHEMA_TABLE} (Version, Description, Applied_at) VALUES (%s, %s, %s)",
+            (version, description, datetime.now().isoformat(timespec='seconds'))
+        )
+        conn.commit()
+        applied.append(version)
+
+    return applied
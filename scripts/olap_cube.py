@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from schema_catalog import SchemaCatalog
+
+# Cubes built for range queries: SQL grouped to (Year, Quarter, State, category)
+# with the metrics to sum. Fact rows are grouped on their integer keys and the
+# state / category labels joined onto the groups. Metric placeholders resolve
+# through the schema catalog.
+CUBE_SOURCES = {
+    'transactions': {
+        'category': 'Category',
+        'metrics': ['Transaction_Count', 'Transaction_Amount'],
+        'query': """SELECT g.Year, g.Quarter, dim_state.State, dim_transaction_type.Transacion_type,
+                           g.Total_Count, g.Total_Amount
+                    FROM (SELECT Year, Quarter, State_id, Transacion_type_id,
+                                 SUM({aggregated_transaction[transaction_count]}) AS Total_Count,
+                                 SUM({aggregated_transaction[transaction_amount]}) AS Total_Amount
+                          FROM aggregated_transaction
+                          GROUP BY Year, Quarter, State_id, Transacion_type_id) g
+                    JOIN dim_state ON dim_state.State_id = g.State_id
+                    JOIN dim_transaction_type
+                        ON dim_transaction_type.Transacion_type_id = g.Transacion_type_id""",
+    },
+    'users': {
+        'category': None,
+        'metrics': ['Registered_Users', 'App_Opens'],
+        'query': """SELECT Year, Quarter, State, Total_Users, Total_Opens
+                    FROM rollup_map_user_state""",
+    },
+    'insurance': {
+        'category': 'Category',
+        'metrics': ['Insurance_Count', 'Insurance_Amount'],
+        'query': """SELECT g.Year, g.Quarter, dim_state.State, dim_insurance_type.Insurance_type,
+                           g.Total_Count, g.Total_Amount
+                    FROM (SELECT Year, Quarter, State_id, Insurance_type_id,
+                                 SUM({aggregated_insurance[insurance_count]}) AS Total_Count,
+                                 SUM({aggregated_insurance[insurance_amount]}) AS Total_Amount
+                          FROM aggregated_insurance
+                          GROUP BY Year, Quarter, State_id, Insurance_type_id) g
+                    JOIN dim_state ON dim_state.State_id = g.State_id
+                    JOIN dim_insurance_type ON dim_insurance_type.Insurance_type_id = g.Insurance_type_id""",
+    },
+}
+
+
+def period_key(year, quarter):
+    """Sortable integer for a (Year, Quarter) pair"""
+    return int(year) * 10 + int(quarter)
+
+
+class PeriodCube:
+    """Year x Quarter x State x category cube with prefix sums along time.
+
+    prefix[i] holds the totals of the first i periods, so the sum over any
+    run of periods is prefix[end] - prefix[start]: one subtraction per
+    (state, category, metric) cell however many quarters are loaded.
+    """
+
+    def __init__(self, periods, states, categories, metrics, values):
+        self.periods = periods
+        self.keys = np.array([period_key(year, quarter) for year, quarter in periods], dtype=np.int64)
+        self.states = states
+        self.categories = categories
+        self.metrics = metrics
+        self.prefix = np.concatenate([np.zeros((1,) + values.shape[1:]), values.cumsum(axis=0)])
+
+    @classmethod
+    def from_frame(cls, df, metrics, category=None):
+        """Cube from rows of (Year, Quarter, State[, category], metrics...)"""
+        periods = sorted(set(zip(df['Year'].astype(int), df['Quarter'].astype(int))))
+        period_codes = np.searchsorted([period_key(*p) for p in periods],
+                                       df['Year'].astype(int) * 10 + df['Quarter'].astype(int))
+        states = pd.Categorical(df['State'])
+        categories = pd.Categorical(df[category]) if category else pd.Categorical(['all'] * len(df))
+
+        values = np.zeros((len(periods), len(states.categories), len(categories.categories), len(metrics)))
+        np.add.at(values, (period_codes, states.codes, categories.codes),
+                  df[metrics].to_numpy(dtype=np.float64))
+        return cls(periods, list(states.categories), list(categories.categories), metrics, values)
+
+    def _bounds(self, start, end):
+        """Prefix indexes covering periods start..end (inclusive (Year, Quarter) pairs)"""
+        first = np.searchsorted(self.keys, period_key(*start), side='left')
+        last = np.searchsorted(self.keys, period_key(*end), side='right')
+        return first, max(first, last)
+
+    def range_sum(self, start, end):
+        """(state, category, metric) totals over periods start..end"""
+        first, last = self._bounds(start, end)
+        return self.prefix[last] - self.prefix[first]
+
+    def latest(self, start, end):
+        """(state, category, metric) values of the last loaded period in start..end"""
+        first, last = self._bounds(start, end)
+        if last == first:
+            return np.zeros(self.prefix.shape[1:])
+        return self.prefix[last] - self.prefix[last - 1]
+
+    def by_state(self, start, end, latest=False):
+        """DataFrame of metric totals per state over the range"""
+        cells = self.latest(start, end) if latest else self.range_sum(start, end)
+        return pd.DataFrame(cells.sum(axis=1), index=self.states, columns=self.metrics)
+
+
+class PulseCube:
+    """The transaction, user and insurance cubes behind the dashboard's range panels"""
+
+    def __init__(self, cubes):
+        self.cubes = cubes
+
+    @classmethod
+    def load(cls, cursor):
+        catalog = SchemaCatalog.load(cursor)
+        cubes = {}
+        for name, spec in CUBE_SOURCES.items():
+            cursor.execute(catalog.render(spec['query']))
+            columns = ['Year', 'Quarter', 'State'] + ([spec['category']] if spec['category'] else []) \
+                + spec['metrics']
+            df = pd.DataFrame(cursor.fetchall(), columns=columns)
+            if not df.empty:
+                cubes[name] = PeriodCube.from_frame(df, spec['metrics'], spec['category'])
+        return cls(cubes)
+
+    def state_summary(self, from_year, to_year, from_quarter=1, to_quarter=4):
+        """Per-state totals over a year/quarter range.
+
+        Transactions, app opens and insurance are summed over the range;
+        registered users is a running total, so it is taken at the range's
+        last loaded quarter.
+        """
+        start, end = (from_year, from_quarter), (to_year, to_quarter)
+        frames = []
+        for name, cube in self.cubes.items():
+            if name == 'users':
+                flows = cube.by_state(start, end)[['App_Opens']]
+                stock = cube.by_state(start, end, latest=True)[['Registered_Users']]
+                frames += [stock, flows]
+            else:
+                frames.append(cube.by_state(start, end))
+        if not frames:
+            return pd.DataFrame()
+        summary = pd.concat(frames, axis=1).fillna(0.0)
+        summary.index.name = 'State'
+        return summary.reset_index()
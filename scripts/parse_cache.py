@@ -0,0 +1,249 @@
+import json
+import os
+
+import pandas as pd
+
+from datasets import DATASETS, column_names
+from load_pipeline import stream_parsed
+from manifest import file_hash, relative_path
+
+# Parsed-data cache: one Parquet file per dataset plus a sidecar manifest of
+# the source files it was built from (override location with PULSE_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache"))
+
+KEY_COLUMNS = ['State', 'Year', 'Quarter']
+
+# Bump when the parsed column types or parsers change so old caches are rebuilt
+CACHE_VERSION = 4
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Parquet type of each SQL type used in the dataset registry
+ARROW_TYPES = {
+    'TINYINT': 'int8',
+    'SMALLINT': 'int16',
+    'INT': 'int32',
+    'BIGINT': 'int64',
+    'FLOAT': 'float64',
+    'DOUBLE': 'float64',
+}
+
+
+def get_cache_dir():
+    """Directory holding the <dataset>.parquet cache files"""
+    return os.getenv("PULSE_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def cache_paths(name):
+    """(parquet file, manifest file) for a dataset"""
+    cache_dir = get_cache_dir()
+    return (os.path.join(cache_dir, f"{name}.parquet"),
+            os.path.join(cache_dir, f"{name}.manifest.json"))
+
+
+def arrow_schema(name):
+    """Parquet schema of a dataset's cache file"""
+    return pa.schema([(column, ARROW_TYPES.get(sql_type.split('(')[0], 'string'))
+                      for column, sql_type in DATASETS[name]['columns']])
+
+
+def read_cached_columns(name):
+    """Column names of a dataset's cache file, or None when there is no cache"""
+    parquet_path, _ = cache_paths(name)
+    if not PARQUET_AVAILABLE or not os.path.exists(parquet_path):
+        return None
+    return pq.read_schema(parquet_path).names
+
+
+def iter_cached_chunks(name, chunk_rows):
+    """DataFrames of up to chunk_rows rows read from a dataset's cache file"""
+    parquet_path, _ = cache_paths(name)
+    for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def read_cache_manifest(name):
+    """{relative path: [size, mtime, hash]} of the files the cache was built from.
+
+    Returns None when there is no manifest or it was written by an older
+    cache version.
+    """
+    _, manifest_path = cache_paths(name)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        stored = json.load(f)
+    if not isinstance(stored, dict) or stored.get('version') != CACHE_VERSION:
+        return None
+    return stored['files']
+
+
+def read_cached_table(name, columns, published):
+    """Columns of a dataset read straight from its cache, or None when the cache can't stand in for the table.
+
+    `published` is the database's manifest of the table ({relative path:
+    (size, mtime, hash)}); the cache is only used when it was built from
+    exactly those file contents, so it holds the same rows as the table.
+    """
+    if read_cached_columns(name) != column_names(name):
+        return None
+    cached_manifest = read_cache_manifest(name)
+    if cached_manifest is None or not published:
+        return None
+    if ({rel_path: entry[2] for rel_path, entry in cached_manifest.items()}
+            != {rel_path: entry[2] for rel_path, entry in published.items()}):
+        return None
+    parquet_path, _ = cache_paths(name)
+    return pq.read_table(parquet_path, columns=columns).to_pandas()
+
+
+class CacheWriter:
+    """Writes a dataset's cache chunk by chunk to temp files, renamed over the old ones on commit"""
+
+    def __init__(self, name):
+        self.name = name
+        self.parquet_path, self.manifest_path = cache_paths(name)
+        os.makedirs(os.path.dirname(self.parquet_path), exist_ok=True)
+        self.schema = arrow_schema(name)
+        self.writer = pq.ParquetWriter(self.parquet_path + ".tmp", self.schema)
+        # (State, Year, Quarter) units written so far, and the one the last row belongs to
+        self.units = set()
+        self.last_unit = None
+
+    def write(self, df):
+        if len(df):
+            self.writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+            keys = df[KEY_COLUMNS]
+            self.units.update(keys.drop_duplicates().itertuples(index=False, name=None))
+            self.last_unit = tuple(keys.iloc[-1])
+
+    def completed_units(self):
+        """Units whose rows are all written: every unit seen except possibly the last one"""
+        return self.units - {self.last_unit}
+
+    def commit(self, manifest):
+        self.writer.close()
+        with open(self.manifest_path + ".tmp", 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'files': manifest}, f)
+        os.replace(self.parquet_path + ".tmp", self.parquet_path)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+
+    def abort(self):
+        self.writer.close()
+        os.remove(self.parquet_path + ".tmp")
+
+
+def find_stale_files(data_path, files, cached_manifest):
+    """Split files into those the cache already covers and those that must be re-parsed"""
+    stale = []
+    manifest = {}
+    for file_info in files:
+        file_path = file_info[3]
+        rel_path = relative_path(data_path, file_path)
+        stat = os.stat(file_path)
+        known = cached_manifest.get(rel_path)
+
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+            manifest[rel_path] = known
+            continue
+
+        digest = file_hash(file_path)
+        manifest[rel_path] = [stat.st_size, stat.st_mtime, digest]
+        if not known or known[2] != digest:
+            stale.append(file_info)
+    return stale, manifest
+
+
+def rows_for_files(df, files):
+    """Boolean mask of the rows whose (State, Year, Quarter) comes from one of files"""
+    if not files:
+        return pd.Series(False, index=df.index).to_numpy()
+    keys = pd.MultiIndex.from_tuples([(state, year, quarter) for state, year, quarter, _ in files],
+                                     names=KEY_COLUMNS)
+    return pd.MultiIndex.from_frame(df[KEY_COLUMNS]).isin(keys)
+
+
+def select_files(df, files):
+    """Rows of df that come from one of files, renumbered"""
+    return df[rows_for_files(df, files)].reset_index(drop=True)
+
+
+def stream_with_cache(name, data_path, files, chunk_rows, wanted=None, jobs=None, pool=None):
+    """Yield typed chunks of a dataset, decoding JSON only for files the cache does not cover.
+
+    `files` is the full current file list of the dataset; the cache is
+    refreshed against it (vanished files dropped, stale files among `wanted`
+    re-parsed) while the chunks stream past, so neither the cache nor the
+    dataset is ever held in memory whole. Yields the rows of `wanted` files
+    (default: all files). The cache manifest may cover only some of the
+    files; the others count as stale next time. The new cache replaces the
+    old one once every chunk has been consumed, or, when the load stops
+    early, keeps the files whose rows were completely written so a resumed
+    load doesn't decode them again. Without pyarrow this streams `wanted`
+    straight from JSON.
+    """
+    if wanted is None:
+        wanted = files
+    everything = len(wanted) == len(files)
+
+    if not PARQUET_AVAILABLE:
+        yield from stream_parsed(name, wanted, chunk_rows, jobs, pool)
+        return
+
+    cached_columns = read_cached_columns(name)
+    cached_manifest = read_cache_manifest(name) if cached_columns is not None else None
+    if cached_manifest is None or cached_columns != column_names(name):
+        cached_manifest = None  # missing, outdated or different layout: rebuild
+
+    stale, manifest = find_stale_files(data_path, files, cached_manifest or {})
+
+    if cached_manifest is not None and not stale and manifest == cached_manifest:
+        print(f"💾 Parse cache for '{name}' is current ({len(files)} files).")
+        for chunk in iter_cached_chunks(name, chunk_rows):
+            chunk = chunk if everything else select_files(chunk, wanted)
+            if len(chunk):
+                yield chunk
+        return
+
+    # Only stale files this load wants are decoded; other stale files stay out of the new cache
+    wanted_set = set(wanted)
+    parse = [file_info for file_info in stale if file_info in wanted_set]
+    units = {relative_path(data_path, file_path): (state, year, quarter)
+             for state, year, quarter, file_path in files}
+    skipped = {relative_path(data_path, file_info[3]) for file_info in stale if file_info not in wanted_set}
+    manifest = {rel_path: entry for rel_path, entry in manifest.items() if rel_path not in skipped}
+
+    writer = CacheWriter(name)
+    try:
+        if cached_manifest is not None:
+            # Keep cached rows only for files that still exist and did not change
+            for chunk in iter_cached_chunks(name, chunk_rows):
+                chunk = chunk[rows_for_files(chunk, files) & ~rows_for_files(chunk, stale)]
+                writer.write(chunk)
+                chunk = chunk.reset_index(drop=True) if everything else select_files(chunk, wanted)
+                if len(chunk):
+                    yield chunk
+        for chunk in stream_parsed(name, parse, chunk_rows, jobs, pool):
+            writer.write(chunk)
+            yield chunk
+    except BaseException:
+        # Interrupted (or the consumer stopped early): keep the files written in full
+        completed = writer.completed_units()
+        partial = {rel_path: entry for rel_path, entry in manifest.items() if units[rel_path] in completed}
+        if partial:
+            writer.commit(partial)
+            print(f"💾 Kept {len(partial)} files in the parse cache for '{name}'.")
+        else:
+            writer.abort()
+        raise
+    writer.commit(manifest)
+    if cached_manifest is None:
+        print(f"💾 Built parse cache for '{name}' from {len(parse)} files.")
+    else:
+        print(f"💾 Parse cache for '{name}': {len(parse)} files re-parsed, "
+              f"{len(files) - len(stale)} served from cache.")
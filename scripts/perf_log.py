@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Timings kept in memory for the dashboard's debug panel
+DEFAULT_RECENT_TIMINGS = 200
+# Queries slower than this are listed as slow (SLOW_QUERY_MS in .env)
+DEFAULT_SLOW_QUERY_MS = 500
+
+
+def get_slow_query_ms():
+    try:
+        return float(os.getenv("SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+    except ValueError:
+        return DEFAULT_SLOW_QUERY_MS
+
+
+class PerfLog:
+    """Timings of dashboard queries, transforms and chart renders.
+
+    Every timed step becomes a record tagged with page, panel and filters.
+    The latest records stay in memory for the debug panel; when a log path
+    is set (PERF_LOG in .env) each record is also appended to it as one JSON
+    line, so timings from many sessions can be aggregated later
+    (perf_report.py).
+    """
+
+    def __init__(self, log_path=None, recent=DEFAULT_RECENT_TIMINGS, slow_query_ms=None):
+        self.log_path = log_path if log_path is not None else os.getenv("PERF_LOG") or None
+        self.recent = deque(maxlen=recent)
+        self.slow_query_ms = slow_query_ms if slow_query_ms is not None else get_slow_query_ms()
+        self.lock = threading.Lock()
+        if self.log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+
+    @contextmanager
+    def timed(self, kind, page, panel, filters=None, session=None):
+        """Time the block as one record; yields the record so the block can add fields"""
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "session": session,
+                  "page": page, "panel": panel, "kind": kind,
+                  "filters": {key: value for key, value in sorted((filters or {}).items())}}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = str(e)
+            raise
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self.add(record)
+
+    def add(self, record):
+        line = json.dumps(record, default=str)
+        with self.lock:
+            self.recent.append(record)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def latest(self, n=None):
+        """Most recent records, newest first"""
+        with self.lock:
+            records = list(self.recent)
+        records.reverse()
+        return records[:n] if n else records
+
+    def slow_queries(self, n=10):
+        """Slowest recent queries over the slow threshold"""
+        slow = [r for r in self.latest() if r["kind"] == "query" and r["ms"] >= self.slow_query_ms]
+        return sorted(slow, key=lambda r: r["ms"], reverse=True)[:n]
+
+    def hit_rates(self):
+        """{kind: (cached records, records)} for the kinds that report a cache status"""
+        rates = {}
+        for record in self.latest():
+            if "cached" in record:
+                hits, total = rates.get(record["kind"], (0, 0))
+                rates[record["kind"]] = (hits + bool(record["cached"]), total + 1)
+        return rates
@@ -0,0 +1,63 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from perf_log import get_slow_query_ms
+
+
+def read_log(path):
+    """Records of a JSON-lines perf log (malformed lines are skipped)"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return pd.DataFrame.from_records(records)
+
+
+def hot_spots(df):
+    """Per (page, panel, kind): count, cache hit share, median / p95 / max and total ms"""
+    grouped = df.groupby(["page", "panel", "kind"], dropna=False)
+    summary = grouped["ms"].agg(count="count", p50="median", p95=lambda ms: ms.quantile(0.95),
+                                max="max", total="sum")
+    if "cached" in df:
+        summary["hit_rate"] = grouped["cached"].mean()
+    return summary.sort_values("total", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise the dashboard's JSON-lines perf log (PERF_LOG)")
+    parser.add_argument("log", help="path of the perf log")
+    parser.add_argument("--kind", choices=["query", "transform", "figure", "render"],
+                        help="only report one kind of step")
+    parser.add_argument("--top", type=int, default=20, help="rows to show (default: 20)")
+    args = parser.parse_args()
+
+    df = read_log(args.log)
+    if df.empty:
+        print(f"❌ No timings in {args.log}")
+        sys.exit(1)
+    if args.kind:
+        df = df[df["kind"] == args.kind]
+
+    sessions = df["session"].nunique() if "session" in df else 0
+    print(f"⏱️ {len(df):,} timings from {sessions} session(s), {df['ts'].min()} to {df['ts'].max()}")
+    print("\n🔥 Hot spots by total time")
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:,.1f}".format):
+        print(hot_spots(df).head(args.top).to_string())
+
+        slow_ms = get_slow_query_ms()
+        slow = df[(df["kind"] == "query") & (df["ms"] >= slow_ms)]
+        if not slow.empty:
+            print(f"\n🐢 Queries slower than {slow_ms:.0f} ms")
+            slow = slow.assign(filters=slow["filters"].map(json.dumps))
+            print(slow.sort_values("ms", ascending=False)
+                  [["ts", "page", "panel", "filters", "ms"]].head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from memory_engine import FactTable
+from schema_catalog import SchemaCatalog
+
+# Zoom levels of the district map: map zoom and hexagon size (circumradius in
+# degrees). Each level bins the points at roughly the resolution it can show,
+# so the browser draws a few thousand hexagons instead of every grid point.
+BIN_LEVELS = {
+    'Country': {'zoom': 3.3, 'size': 0.4},
+    'Region': {'zoom': 4.5, 'size': 0.15},
+    'State': {'zoom': 6.0, 'size': 0.05},
+    'District': {'zoom': 7.5, 'size': 0.02},
+}
+# Levels fine enough that they are only binned within one state
+STATE_ONLY_LEVELS = ('State', 'District')
+
+SQRT3 = np.sqrt(3.0)
+
+
+def hex_cells(lng, lat, size):
+    """Axial (q, r) coordinates of the pointy-top hexagon holding each point"""
+    x, y = lng / size, lat / size
+    q = SQRT3 / 3 * x - y / 3
+    r = 2 / 3 * y
+    # Cube rounding: round all three coordinates, then fix the one that moved most
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def hex_bins(lng, lat, weights, size, labels=None):
+    """Sum weights into hexagons of the given size.
+
+    Returns a DataFrame of hexagon centres (Longitude, Latitude) with the
+    summed weight (Total), the number of points (Points) and, when labels
+    are given, the label carrying the most weight in each hexagon (Top).
+    """
+    columns = ['Longitude', 'Latitude', 'Total', 'Points'] + (['Top'] if labels is not None else [])
+    if not len(lng):
+        return pd.DataFrame(columns=columns)
+    q, r = hex_cells(lng, lat, size)
+    # One int64 key per hexagon, so np.unique sorts a flat array
+    r_min, r_span = r.min(), r.max() - r.min() + 1
+    keys, cell_of_point = np.unique(q * r_span + (r - r_min), return_inverse=True)
+    cell_q, cell_r = np.divmod(keys, r_span)
+    cell_r = cell_r + r_min
+    bins = pd.DataFrame({
+        'Longitude': size * SQRT3 * (cell_q + cell_r / 2),
+        'Latitude': size * 1.5 * cell_r,
+        'Total': np.bincount(cell_of_point, weights=weights, minlength=len(keys)),
+        'Points': np.bincount(cell_of_point, minlength=len(keys)),
+    })
+    if labels is not None:
+        # Last point of each cell after sorting by (cell, weight) is its heaviest
+        order = np.lexsort((weights, cell_of_point))
+        last = np.r_[cell_of_point[order][1:] != cell_of_point[order][:-1], True]
+        bins['Top'] = np.asarray(labels)[order][last]
+    return bins
+
+
+class InsurancePoints:
+    """map_insurance grid points (Latitude, Longitude, Insurance_Count) held in memory for binning"""
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def load(cls, cursor):
+        catalog = SchemaCatalog.load(cursor)
+        cursor.execute(catalog.select_sql('map_insurance', [
+            'State', 'Year', 'Quarter', catalog.column('map_insurance', 'district'),
+            'Latitude', 'Longitude', catalog.column('map_insurance', 'insurance_count')]))
+        df = pd.DataFrame(cursor.fetchall(),
+                          columns=['State', 'Year', 'Quarter', 'district', 'Latitude', 'Longitude',
+                                   'insurance_count'])
+        return cls(FactTable(df))
+
+    def bins(self, level, state=None, year=None, quarter=None):
+        """Hexagons of a zoom level over one state (or India) and one quarter (or all quarters)"""
+        if level in STATE_ONLY_LEVELS and state is None:
+            raise ValueError(f"The '{level}' level is binned per state; pick a state")
+        table = self.table
+        rows = table.rows(year, quarter, state)
+        return hex_bins(table.values('Longitude', rows), table.values('Latitude', rows),
+                        table.values('insurance_count', rows), BIN_LEVELS[level]['size'],
+                        labels=table.values('district', rows))
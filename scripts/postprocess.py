@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Indian number scale used for amount labels: (threshold, divisor, suffix)
+AMOUNT_SCALES = [(10000000, 10000000, "Cr"), (100000, 100000, "L"), (1000, 1000, "K")]
+
+
+def safe_float_conversion(value):
+    """Safely convert decimal/numeric values to float"""
+    if value is None:
+        return 0.0
+    if isinstance(value, Decimal):
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def format_number(num):
+    """Format large numbers for display"""
+    num = safe_float_conversion(num)
+    for threshold, divisor, suffix in AMOUNT_SCALES:
+        if num >= threshold:
+            return f"₹{num/divisor:.2f}{suffix}"
+    return f"₹{num:.2f}"
+
+
+def to_float_array(values):
+    """float64 array from query values (Decimal, int, float, numeric str or None -> 0.0)"""
+    try:
+        array = np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Non-numeric strings: fall back to the per-value conversion
+        array = np.fromiter((safe_float_conversion(v) for v in values), dtype=np.float64, count=len(values))
+    # None becomes NaN in the bulk conversion
+    return np.nan_to_num(array, nan=0.0)
+
+
+def rows_to_frame(rows, columns, numeric=()):
+    """DataFrame from cursor rows with the numeric columns converted straight to float64"""
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for name in numeric:
+        df[name] = to_float_array(df[name].to_numpy())
+    return df
+
+
+def safe_ratio(numerator, denominator):
+    """numerator / denominator element-wise, 0.0 where the denominator is not positive"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0)
+
+
+def format_amounts(values):
+    """format_number() over a whole column at once; returns an array of labels"""
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    conditions = [values >= threshold for threshold, _, _ in AMOUNT_SCALES]
+    divisors = np.select(conditions, [divisor for _, divisor, _ in AMOUNT_SCALES], 1)
+    suffixes = np.select(conditions, [suffix for _, _, suffix in AMOUNT_SCALES], "")
+    return np.char.add(np.char.add("₹", np.char.mod("%.2f", values / divisors)), suffixes)
@@ -0,0 +1,232 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Number of quarter files handed to a worker in one task
+FILES_PER_TASK = 32
+
+
+# ---------------------------------------------------------------------------
+# JSON parsers: one per Pulse dataset. Each appends the rows found in one
+# quarter file to the columnar dict `clm`.
+# ---------------------------------------------------------------------------
+
+def parse_aggregated_transaction(data, state, year, quarter, clm):
+    for txn in data['data']['transactionData']:
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['Transacion_type'].append(txn['name'])
+        clm['Transacion_count'].append(txn['paymentInstruments'][0]['count'])
+        clm['Transacion_amount'].append(txn['paymentInstruments'][0]['amount'])
+
+
+def parse_aggregated_user(data, state, year, quarter, clm):
+    if data['data']['usersByDevice'] is not None:
+        for user in data['data']['usersByDevice']:
+            clm['State'].append(state)
+            clm['Year'].append(year)
+            clm['Quarter'].append(quarter)
+            clm['Device_Brand'].append(user['brand'])
+            clm['User_Count'].append(user['count'])
+            clm['User_Percentage'].append(user['percentage'])
+
+
+def parse_map_transaction(data, state, year, quarter, clm):
+    for district_info in data['data']['hoverDataList']:
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['District'].append(district_info['name'])
+        clm['Transaction_count'].append(district_info['metric'][0]['count'])
+        clm['Transaction_amount'].append(district_info['metric'][0]['amount'])
+
+
+def parse_map_user(data, state, year, quarter, clm):
+    for district, values in data['data']['hoverData'].items():
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['District'].append(district)
+        clm['RegisteredUsers'].append(values.get('registeredUsers', 0))
+        clm['AppOpens'].append(values.get('appOpens', 0))
+
+
+def parse_top_transaction(data, state, year, quarter, clm):
+    for district in data['data'].get('districts', []):
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['District'].append(district.get('entityName', 'Unknown'))
+        clm['Transaction_count'].append(district['metric'].get('count', 0))
+        clm['Transaction_amount'].append(district['metric'].get('amount', 0.0))
+
+
+def parse_top_user(data, state, year, quarter, clm):
+    for district in data['data'].get('districts', []):
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['District'].append(district.get('name', 'Unknown'))
+        clm['Registered_users'].append(district.get('registeredUsers', 0))
+        clm['App_opens'].append(district.get('appOpens', 0))
+
+
+def parse_aggregated_insurance(data, state, year, quarter, clm):
+    for entry in data['data']['transactionData']:
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['Insurance_type'].append(entry['name'])
+        clm['Insurance_count'].append(entry['paymentInstruments'][0]['count'])
+        clm['Insurance_amount'].append(entry['paymentInstruments'][0]['amount'])
+
+
+def parse_map_insurance(data, state, year, quarter, clm):
+    # Heat map grid: data.data holds {"columns": [lat, lng, metric, label], "data": [[...], ...]}
+    grid = data.get("data", {}).get("data") or {}
+    columns_in_file = grid.get("columns", [])
+    for row in grid.get("data", []):
+        row_dict = dict(zip(columns_in_file, row))
+        lat = row_dict.get("lat")
+        lng = row_dict.get("lng")
+        metric = row_dict.get("metric")
+        district = row_dict.get("label")
+        if None in [lat, lng, metric, district]:
+            continue
+        clm["State"].append(state)
+        clm["Year"].append(year)
+        clm["Quarter"].append(quarter)
+        clm["District"].append(district)
+        clm["Latitude"].append(lat)
+        clm["Longitude"].append(lng)
+        clm["Insurance_Count"].append(int(metric))
+
+
+def parse_top_insurance(data, state, year, quarter, clm):
+    for entry in data['data'].get('pincodes', []):
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        # A few files carry a null pincode; keep the row under 'Unknown' (it is part of the key)
+        clm['Pincode'].append(entry['entityName'] or 'Unknown')
+        clm['Count'].append(entry['metric']['count'])
+        clm['Amount'].append(entry['metric']['amount'])
+
+
+def parse_top_transaction_pincode(data, state, year, quarter, clm):
+    for pincode in data['data'].get('pincodes') or []:
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['Pincode'].append(pincode.get('entityName') or 'Unknown')
+        clm['Transaction_count'].append(pincode['metric'].get('count', 0))
+        clm['Transaction_amount'].append(pincode['metric'].get('amount', 0.0))
+
+
+def parse_top_user_pincode(data, state, year, quarter, clm):
+    for pincode in data['data'].get('pincodes') or []:
+        clm['State'].append(state)
+        clm['Year'].append(year)
+        clm['Quarter'].append(quarter)
+        clm['Pincode'].append(pincode.get('name') or 'Unknown')
+        clm['Registered_users'].append(pincode.get('registeredUsers', 0))
+
+
+def parse_country_user(data, state, year, quarter, clm):
+    # Country files carry the national totals under data.aggregated
+    totals = data['data'].get('aggregated') or {}
+    clm['State'].append(state)
+    clm['Year'].append(year)
+    clm['Quarter'].append(quarter)
+    clm['Registered_users'].append(totals.get('registeredUsers', 0))
+    clm['App_opens'].append(totals.get('appOpens', 0))
+
+
+# ---------------------------------------------------------------------------
+# Directory walk and parallel extraction
+# ---------------------------------------------------------------------------
+
+def list_quarter_files(data_path):
+    """Return (state, year, quarter, file_path) for every quarter file under data_path"""
+    files = []
+    for state in sorted(os.listdir(data_path)):
+        state_path = os.path.join(data_path, state)
+        if not os.path.isdir(state_path):
+            continue
+
+        for year in sorted(os.listdir(state_path)):
+            year_path = os.path.join(state_path, year)
+            if not os.path.isdir(year_path):
+                continue
+
+            for quarter_file in sorted(os.listdir(year_path)):
+                if not quarter_file.endswith('.json'):
+                    continue
+                quarter = int(quarter_file.strip('.json'))
+                files.append((state, int(year), quarter, os.path.join(year_path, quarter_file)))
+    return files
+
+
+def extract_files(parser, columns, files):
+    """Parse a batch of quarter files into one columnar chunk (runs in a worker)"""
+    clm = {column: [] for column in columns}
+    for state, year, quarter, file_path in files:
+        try:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            parser(data, state, year, quarter, clm)
+        except Exception as e:
+            print(f"⚠️ Error parsing {file_path}: {e}")
+    return clm
+
+
+def get_default_jobs():
+    """Default worker count: one per CPU core"""
+    return os.cpu_count() or 1
+
+
+def iter_extracted(parser, columns, files, jobs=None, pool=None, max_pending=None):
+    """Yield the columnar chunk of each batch of quarter files, in file order.
+
+    Batches of FILES_PER_TASK files are parsed on `pool` (or a pool of `jobs`
+    workers; in-process when jobs=1), but at most `max_pending` batches are
+    in flight at once (default: two per worker). A new batch is only
+    submitted when the consumer takes a finished one, so a slow writer holds
+    the parsing back instead of letting parsed rows pile up in memory.
+    """
+    if jobs is None:
+        jobs = get_default_jobs()
+
+    batches = [files[i:i + FILES_PER_TASK] for i in range(0, len(files), FILES_PER_TASK)]
+
+    if len(batches) <= 1 or (pool is None and jobs <= 1):
+        for batch in batches:
+            yield extract_files(parser, columns, batch)
+        return
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=jobs) as own_pool:
+            yield from iter_extracted(parser, columns, files, jobs, own_pool, max_pending)
+        return
+
+    if max_pending is None:
+        max_pending = 2 * jobs
+    queued = iter(batches)
+    pending = deque()
+    try:
+        for batch in queued:
+            pending.append(pool.submit(extract_files, parser, columns, batch))
+            if len(pending) >= max_pending:
+                break
+        while pending:
+            chunk = pending.popleft().result()
+            batch = next(queued, None)
+            if batch is not None:
+                pending.append(pool.submit(extract_files, parser, columns, batch))
+            yield chunk
+    finally:
+        # Consumer stopped early: drop the batches that have not started
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+
+# Query results kept per process, least recently used dropped first
+DEFAULT_QUERY_CACHE_ENTRIES = 512
+
+
+class QueryCache:
+    """LRU cache of dashboard query results, shared by every session of a process.
+
+    Keys are (query id, parameters, data version). The dashboard looks
+    results up on its script thread; the worker threads that run missed
+    queries store their rows with put(), so entries and counters are
+    guarded by a lock.
+    """
+
+    def __init__(self, max_entries=DEFAULT_QUERY_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.calls = 0
+        self.misses = 0
+        self.data_version = None
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Rows cached for key (a copy of the list), or None"""
+        with self.lock:
+            self.calls += 1
+            rows = self.entries.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            return list(rows)
+
+    def put(self, key, rows):
+        with self.lock:
+            self.entries[key] = list(rows)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def switch_version(self, data_version):
+        """Note the current data version; True when it replaced an older one (entries dropped)"""
+        with self.lock:
+            changed = self.data_version is not None and self.data_version != data_version
+            if changed:
+                # Entries for older data can never be hit again
+                self.entries.clear()
+            self.data_version = data_version
+            return changed
+
+    def stats(self):
+        with self.lock:
+            return {"calls": self.calls, "misses": self.misses, "entries": len(self.entries),
+                    "data_version": self.data_version}
@@ -0,0 +1,152 @@
+from db_backend import get_table_columns, table_exists
+from star_schema import STAR_DIMENSIONS, label_joins, stored_column
+
+# ---------------------------------------------------------------------------
+# Rollup registry: summary tables at the grain each dashboard panel reads.
+#   source   - fact table the rollup is computed from
+#   keys     - (column, SQL type) group-by columns; also the primary key, so
+#              every panel lookup by (Year, Quarter[, ...]) is an index seek
+#   measures - (column, SQL type, aggregate expression over the source)
+#   where    - optional row filter applied before grouping (mirrors the panel);
+#              {Column} stands for a text column, which the table may store as a key
+# ---------------------------------------------------------------------------
+ROLLUPS = {
+    # Home: national totals from the country-level files, one row for 'india'
+    'rollup_country_totals': {
+        'source': 'country_transaction',
+        'keys': [('State', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Count', 'BIGINT', 'SUM(Transacion_count)'),
+            ('Total_Amount', 'DOUBLE', 'SUM(Transacion_amount)'),
+        ],
+    },
+    # Transaction Dynamics: top states
+    'rollup_txn_state': {
+        'source': 'aggregated_transaction',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('State', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Count', 'BIGINT', 'SUM(Transacion_count)'),
+            ('Total_Amount', 'DOUBLE', 'SUM(Transacion_amount)'),
+        ],
+    },
+    # Transaction Dynamics: distribution by transaction type
+    'rollup_txn_type': {
+        'source': 'aggregated_transaction',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('Transacion_type', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Count', 'BIGINT', 'SUM(Transacion_count)'),
+            ('Total_Amount', 'DOUBLE', 'SUM(Transacion_amount)'),
+        ],
+    },
+    # Device & User Analysis: device brands. Percentages are kept as a sum and a
+    # row count so averages over any set of quarters stay exact.
+    'rollup_user_brand': {
+        'source': 'aggregated_user',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('Device_Brand', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Users', 'BIGINT', 'SUM(User_Count)'),
+            ('Sum_Percentage', 'DOUBLE', 'SUM(User_Percentage)'),
+            ('Records', 'INT', 'COUNT(*)'),
+        ],
+        'where': '{Device_Brand} IS NOT NULL AND User_Count > 0',
+    },
+    # Device & User Analysis, User Engagement and Geo Analysis: users by state
+    'rollup_map_user_state': {
+        'source': 'map_user',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('State', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Users', 'BIGINT', 'SUM(RegisteredUsers)'),
+            ('Total_Opens', 'BIGINT', 'SUM(AppOpens)'),
+        ],
+        'where': 'RegisteredUsers > 0',
+    },
+    # User Engagement: Year x Quarter trend
+    'rollup_map_user_period': {
+        'source': 'map_user',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT')],
+        'measures': [
+            ('Total_Users', 'BIGINT', 'SUM(RegisteredUsers)'),
+            ('Total_Opens', 'BIGINT', 'SUM(AppOpens)'),
+        ],
+        'where': 'RegisteredUsers > 0',
+    },
+    # Insurance Analytics: states
+    'rollup_ins_state': {
+        'source': 'aggregated_insurance',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('State', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Count', 'BIGINT', 'SUM(Insurance_count)'),
+            ('Total_Amount', 'DOUBLE', 'SUM(Insurance_amount)'),
+        ],
+        'where': 'Insurance_count > 0 AND Insurance_amount > 0',
+    },
+    # Insurance Analytics: insurance types
+    'rollup_ins_type': {
+        'source': 'aggregated_insurance',
+        'keys': [('Year', 'SMALLINT'), ('Quarter', 'TINYINT'), ('Insurance_type', 'VARCHAR(64)')],
+        'measures': [
+            ('Total_Count', 'BIGINT', 'SUM(Insurance_count)'),
+            ('Total_Amount', 'DOUBLE', 'SUM(Insurance_amount)'),
+        ],
+        'where': 'Insurance_count > 0 AND Insurance_amount > 0',
+    },
+}
+
+
+def create_rollup_sql(name, table=None):
+    """CREATE TABLE IF NOT EXISTS statement for a rollup (under another name when `table` is given)"""
+    spec = ROLLUPS[name]
+    column_defs = [f"{column} {sql_type}" for column, sql_type in spec['keys']]
+    column_defs += [f"{column} {sql_type}" for column, sql_type, _ in spec['measures']]
+    key_list = ", ".join(column for column, _ in spec['keys'])
+    column_defs.append(f"PRIMARY KEY ({key_list})")
+    return f"CREATE TABLE IF NOT EXISTS {table or name} (\n    " + ",\n    ".join(column_defs) + "\n)"
+
+
+def rebuild_rollup_sql(name, source_columns, table_suffix=""):
+    """INSERT ... SELECT statement that fills a rollup from its source.
+
+    Rows are grouped on the columns the source stores (integer keys for
+    labelled columns) and the labels are joined onto the grouped rows only.
+    table_suffix reads and writes suffixed copies of the tables (staging).
+    """
+    spec = ROLLUPS[name]
+    keys = [column for column, _ in spec['keys']]
+    measures = [column for column, _, _ in spec['measures']]
+    stored = [stored_column(column, source_columns) for column in keys]
+    where = ""
+    if spec.get('where'):
+        text_columns = {column: stored_column(column, source_columns) for column in STAR_DIMENSIONS}
+        where = " WHERE " + spec['where'].format(**text_columns)
+    aggregates = [f"{expression} AS {column}" for column, _, expression in spec['measures']]
+    grouped = (f"SELECT {', '.join(stored + aggregates)} "
+               f"FROM {spec['source']}{table_suffix}{where} GROUP BY {', '.join(stored)}")
+    labels, joins = label_joins('g', keys, source_columns)
+    return (f"INSERT INTO {name}{table_suffix} ({', '.join(keys + measures)}) "
+            f"SELECT {', '.join(labels + [f'g.{column}' for column in measures])} "
+            f"FROM ({grouped}) g {joins}").rstrip()
+
+
+def rollups_for(tables):
+    """Names of the rollups computed from any of the given fact tables"""
+    return [name for name, spec in ROLLUPS.items() if spec['source'] in tables]
+
+
+def refresh_rollups(cursor, names, table_suffix=""):
+    """Recompute rollups from their fact tables (creating them if needed).
+
+    Rollups are a few thousand rows at most, so a full rebuild from the
+    indexed fact table is cheaper than tracking per-period deltas. With a
+    table_suffix the rollups are rebuilt from, and into, the suffixed
+    (staging) copies of the tables instead.
+    """
+    for name in names:
+        table = name + table_suffix
+        if table_suffix:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        if not table_exists(cursor, table):
+            cursor.execute(create_rollup_sql(name, table))
+        cursor.execute(f"DELETE FROM {table}")
+        source_columns = get_table_columns(cursor, ROLLUPS[name]['source'] + table_suffix)
+        cursor.execute(rebuild_rollup_sql(name, source_columns, table_suffix))
+    return len(names)
@@ -0,0 +1,80 @@
+from db_backend import get_schema
+from star_schema import label_joins, logical_columns
+
+# Logical metric -> physical column names it may have, in order of preference.
+# Tables loaded by older scripts (or other Pulse loaders) spell some columns
+# differently, e.g. map_user RegisteredUsers vs top_user Registered_users.
+METRIC_COLUMNS = {
+    'district': ('District',),
+    'transaction_type': ('Transacion_type', 'Transaction_type'),
+    'transaction_count': ('Transacion_count', 'Transaction_count', 'Count'),
+    'transaction_amount': ('Transacion_amount', 'Transaction_amount', 'Amount'),
+    'insurance_type': ('Insurance_type',),
+    'insurance_count': ('Insurance_count', 'Count'),
+    'insurance_amount': ('Insurance_amount', 'Amount'),
+    'device_brand': ('Device_Brand', 'Brand'),
+    'user_count': ('User_Count', 'Count'),
+    'user_percentage': ('User_Percentage', 'Percentage'),
+    'registered_users': ('RegisteredUsers', 'Registered_users'),
+    'app_opens': ('AppOpens', 'App_opens'),
+}
+
+
+class TableColumns(dict):
+    """Metric -> physical column map of one table"""
+
+    def __init__(self, table_name, mapping):
+        super().__init__(mapping)
+        self.table_name = table_name
+
+    def __missing__(self, metric):
+        raise KeyError(f"table '{self.table_name}' has no column for metric '{metric}'")
+
+
+class SchemaCatalog:
+    """Columns of every table, read once, with logical metrics resolved to physical columns.
+
+    Query templates name metrics as {table[metric]}, e.g.
+    "SELECT SUM({top_user[registered_users]}) FROM top_user", and render()
+    fills in whichever spelling the table actually has, so no query has to
+    be tried twice.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        # Key columns of the star schema resolve under the label they stand for
+        self.metrics = {table_name: TableColumns(table_name, self._resolve(logical_columns(columns)))
+                        for table_name, columns in schema.items()}
+
+    @classmethod
+    def load(cls, cursor):
+        return cls(get_schema(cursor))
+
+    @staticmethod
+    def _resolve(columns):
+        # MySQL column names are case-insensitive, so match them that way
+        by_lower = {column.lower(): column for column in columns}
+        resolved = {}
+        for metric, candidates in METRIC_COLUMNS.items():
+            for candidate in candidates:
+                if candidate.lower() in by_lower:
+                    resolved[metric] = by_lower[candidate.lower()]
+                    break
+        return resolved
+
+    def columns(self, table_name):
+        """Physical column names of a table ([] when it doesn't exist)"""
+        return self.schema.get(table_name, [])
+
+    def column(self, table_name, metric):
+        """Physical column holding a metric in a table"""
+        return self.metrics[table_name][metric]
+
+    def select_sql(self, table_name, columns):
+        """SELECT of columns from a table, joining dimension tables for labels stored as keys"""
+        expressions, joins = label_joins('f', columns, self.columns(table_name))
+        return f"SELECT {', '.join(expressions)} FROM {table_name} f {joins}".rstrip()
+
+    def render(self, template, **params):
+        """Fill filter values and {table[metric]} column placeholders into a query template"""
+        return template.format(**params, **self.metrics)
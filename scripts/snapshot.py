@@ -0,0 +1,111 @@
+from datasets import DATASETS, create_index_sql, create_table_sql
+from db_backend import get_backend, table_exists
+from star_schema import key_column
+
+# The loader builds changed tables as <table>__staging next to the live ones
+# and swaps them in together; the replaced tables are renamed <table>__retired
+# for the moment of the swap, then dropped.
+STAGING_SUFFIX = "__staging"
+RETIRED_SUFFIX = "__retired"
+
+
+def staging_table(name):
+    return name + STAGING_SUFFIX
+
+
+def stage_dataset(cursor, name, keep_live_rows):
+    """Create a dataset's staging table, empty or holding a copy of the live rows.
+
+    Staging tables get the primary key only; secondary indexes are built as
+    part of publishing (see publish).
+    """
+    stage = staging_table(name)
+    cursor.execute(f"DROP TABLE IF EXISTS {stage}")
+    cursor.execute(create_table_sql(name, stage))
+    if keep_live_rows and table_exists(cursor, name):
+        cursor.execute(f"INSERT INTO {stage} SELECT * FROM {name}")
+    return stage
+
+
+def count_rows(cursor, table):
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def check_staged_dataset(cursor, name, expected_rows):
+    """Raise when a dataset's staging table doesn't hold the rows the load put there"""
+    stage = staging_table(name)
+    cursor.execute(f"SELECT COUNT(*), "
+                   f"SUM(CASE WHEN {key_column('State')} IS NULL OR Year IS NULL OR Quarter IS NULL "
+                   f"THEN 1 ELSE 0 END) FROM {stage}")
+    rows, incomplete = cursor.fetchone()
+    if rows != expected_rows:
+        raise RuntimeError(f"Staging table {stage} holds {rows} rows, expected {expected_rows}; "
+                           f"nothing was published")
+    if incomplete:
+        raise RuntimeError(f"Staging table {stage} has {incomplete} rows without State, Year or Quarter; "
+                           f"nothing was published")
+
+
+def secondary_index_sql(table, on=None):
+    """CREATE INDEX statements of a live table ([] for rollups and the catalog)"""
+    return create_index_sql(table, on) if table in DATASETS else []
+
+
+def publish(conn, cursor, tables, finish=None):
+    """Swap the staging copies of `tables` in for the live tables, all at once.
+
+    On SQLite and DuckDB the renames, the secondary indexes of the new
+    tables and finish(cursor) (e.g. the data version bump) run in one
+    transaction, so readers see every old table or every new one and the
+    version moves with the data. MySQL renames every pair in a single
+    RENAME TABLE statement, which is atomic but commits on its own; finish
+    runs right after it.
+    """
+    if get_backend() == "mysql":
+        publish_mysql(conn, cursor, tables, finish)
+    else:
+        publish_embedded(conn, cursor, tables, finish)
+
+
+def publish_mysql(conn, cursor, tables, finish):
+    renames = []
+    for table in tables:
+        # MySQL index names are per table, so the staging copy is indexed before the swap
+        for statement in secondary_index_sql(table, staging_table(table)):
+            cursor.execute(statement)
+        cursor.execute(f"DROP TABLE IF EXISTS {table}{RETIRED_SUFFIX}")
+        if table_exists(cursor, table):
+            renames.append(f"{table} TO {table}{RETIRED_SUFFIX}")
+        renames.append(f"{staging_table(table)} TO {table}")
+    if renames:
+        cursor.execute("RENAME TABLE " + ", ".join(renames))
+    for table in tables:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}{RETIRED_SUFFIX}")
+    if finish is not None:
+        finish(cursor)
+    conn.commit()
+
+
+def publish_embedded(conn, cursor, tables, finish):
+    conn.commit()
+    cursor.execute("BEGIN TRANSACTION")
+    try:
+        for table in tables:
+            retired = table + RETIRED_SUFFIX
+            if table_exists(cursor, table):
+                # Index names are database-wide and DuckDB won't rename an indexed
+                # table, so the old indexes go and the new table is indexed here
+                for index_name, _ in DATASETS.get(table, {}).get('indexes', []):
+                    cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+                cursor.execute(f"ALTER TABLE {table} RENAME TO {retired}")
+            cursor.execute(f"ALTER TABLE {staging_table(table)} RENAME TO {table}")
+            for statement in secondary_index_sql(table):
+                cursor.execute(statement)
+            cursor.execute(f"DROP TABLE IF EXISTS {retired}")
+        if finish is not None:
+            finish(cursor)
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Star schema: the text columns of the fact tables are stored as integer
+# keys into small dimension tables that hold each label once.
+#   table      - dimension table
+#   key        - key column, in the dimension table and in every fact table
+#   key_type   - SQL type of the key
+#   label_type - SQL type of the label column, which keeps the fact column's name
+# Year and Quarter stay in the fact tables as they are (SMALLINT / TINYINT).
+# ---------------------------------------------------------------------------
+STAR_DIMENSIONS = {
+    'State': {'table': 'dim_state', 'key': 'State_id', 'key_type': 'SMALLINT',
+              'label_type': 'VARCHAR(64)'},
+    'District': {'table': 'dim_district', 'key': 'District_id', 'key_type': 'INT',
+                 'label_type': 'VARCHAR(128)'},
+    'Device_Brand': {'table': 'dim_device_brand', 'key': 'Device_Brand_id', 'key_type': 'SMALLINT',
+                     'label_type': 'VARCHAR(64)'},
+    'Transacion_type': {'table': 'dim_transaction_type', 'key': 'Transacion_type_id',
+                        'key_type': 'SMALLINT', 'label_type': 'VARCHAR(64)'},
+    'Insurance_type': {'table': 'dim_insurance_type', 'key': 'Insurance_type_id',
+                       'key_type': 'SMALLINT', 'label_type': 'VARCHAR(64)'},
+}
+
+
+def key_column(column):
+    """Fact-table column that stores a column (its key for labelled columns)"""
+    spec = STAR_DIMENSIONS.get(column)
+    return spec['key'] if spec else column
+
+
+def fact_columns(columns):
+    """(column, SQL type) of a fact table whose parsed columns are `columns`"""
+    return [(STAR_DIMENSIONS[column]['key'], STAR_DIMENSIONS[column]['key_type'])
+            if column in STAR_DIMENSIONS else (column, sql_type)
+            for column, sql_type in columns]
+
+
+def stored_column(column, table_columns):
+    """Column of an existing table holding `column`: its key when the table stores one, else itself.
+
+    Tables loaded before the star schema keep their text columns, so the
+    physical columns decide.
+    """
+    spec = STAR_DIMENSIONS.get(column)
+    return spec['key'] if spec and spec['key'] in table_columns else column
+
+
+def logical_columns(table_columns):
+    """Column names of a table with every key column shown as the label it stands for"""
+    labels = {spec['key']: column for column, spec in STAR_DIMENSIONS.items()}
+    return [labels.get(column, column) for column in table_columns]
+
+
+def label_joins(alias, columns, table_columns):
+    """(select expressions, JOIN clause) showing `columns` of the rows aliased `alias`.
+
+    Columns stored as keys are read from their dimension table, joined on
+    the key; the others come straight from `alias`.
+    """
+    expressions, joins = [], []
+    for column in columns:
+        stored = stored_column(column, table_columns)
+        if stored == column:
+            expressions.append(f"{alias}.{column}")
+            continue
+        spec = STAR_DIMENSIONS[column]
+        expressions.append(f"{spec['table']}.{column}")
+        joins.append(f"JOIN {spec['table']} ON {spec['table']}.{stored} = {alias}.{stored}")
+    return expressions, " ".join(joins)
+
+
+def create_star_dimensions(cursor):
+    """Create the dimension tables (key primary key, unique label) if they don't exist"""
+    for column, spec in STAR_DIMENSIONS.items():
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {spec['table']} (
+            {spec['key']} {spec['key_type']} NOT NULL PRIMARY KEY,
+            {column} {spec['label_type']} NOT NULL,
+            UNIQUE ({column})
+        )
+        """)
+
+
+class StarKeys:
+    """Label -> key of every dimension table, assigning keys to labels seen for the first time.
+
+    Loaded once per run; new labels are inserted into their dimension table
+    in the loader's transaction, so they commit with the fact rows that use
+    them.
+
+    Unlike the fact rows, which go to staging tables, these inserts write
+    the live dim_* tables before the load is published. That is safe
+    because the dashboard never lists a dimension table: labels are
+    joined onto the keys of published fact and rollup rows, and the
+    states, districts and types it offers come from the dimension
+    catalog, which is staged and published with the rest. A new key
+    therefore stays unreachable until rows using it are published.
+    Keys are only ever added, never renumbered or reused. If a load
+    fails, its new labels stay behind unused and keep their keys for
+    the next run, which is also what lets a resumed load reuse the keys
+    already in its staged rows.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    @classmethod
+    def load(cls, cursor):
+        create_star_dimensions(cursor)
+        keys = {}
+        for column, spec in STAR_DIMENSIONS.items():
+            cursor.execute(f"SELECT {spec['key']}, {column} FROM {spec['table']}")
+            keys[column] = {label: int(key) for key, label in cursor.fetchall()}
+        return cls(keys)
+
+    def encode(self, cursor, df):
+        """Fact rows of a parsed chunk: each labelled column replaced by its key"""
+        for column, spec in STAR_DIMENSIONS.items():
+            if column not in df:
+                continue
+            keys = self.keys[column]
+            labels = df[column]
+            new = [label for label in pd.unique(labels.dropna()) if label not in keys]
+            if new:
+                first = max(keys.values(), default=0) + 1
+                rows = [(first + i, label) for i, label in enumerate(new)]
+                cursor.executemany(f"INSERT INTO {spec['table']} ({spec['key']}, {column}) VALUES (%s, %s)",
+                                   rows)
+                keys.update((label, key) for key, label in rows)
+            ids = labels.map(keys)
+            if ids.isna().any():
+                # Missing labels stay NULL
+                ids = ids.astype(object).where(ids.notna(), None)
+            else:
+                ids = ids.astype(np.int64)
+            df = df.assign(**{column: ids}).rename(columns={column: spec['key']})
+        return df
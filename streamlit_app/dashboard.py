@@ -1,28 +1,48 @@
 # PhonePe Pulse Data Visualization Dashboard - Complete Fixed Version
 import streamlit as st
 from streamlit_option_menu import option_menu
-import mysql.connector as sql
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import os
+import sys
+import uuid
 from dotenv import load_dotenv
 import numpy as np
-from decimal import Decimal
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Shared database backend helpers live next to the loader in scripts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from connection_pool import ConnectionPool, get_pool_size
+from dashboard_queries import QUERIES
+from data_version import get_data_version
+from dimensions import DimensionCatalog
+from figure_cache import FigureCache
+from india_geometry import (GEOMETRY_LEVELS, DEFAULT_GEOMETRY_LEVEL, STATE_IDS, geometry_source,
+                            load_state_geometry)
+from memory_engine import MemoryEngine
+from olap_cube import PulseCube
+from perf_log import PerfLog
+from point_bins import BIN_LEVELS, STATE_ONLY_LEVELS, InsurancePoints
+from query_cache import QueryCache
+from postprocess import (safe_float_conversion, format_number, rows_to_frame, safe_ratio,
+                         format_amounts)
+from schema_catalog import SchemaCatalog
 
 # Load environment variables
 load_dotenv()
 
-# Database connection with environment variables
+# Database connections (MySQL, SQLite or DuckDB depending on DB_BACKEND) come
+# from one pool per process; each query checks out its own cursor, so reruns
+# reuse open connections and concurrent sessions don't share a cursor.
+@st.cache_resource
+def get_connection_pool():
+    """Process-wide connection pool (DB_POOL_SIZE connections)"""
+    return ConnectionPool()
+
 try:
-    Mydb = sql.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        user=os.getenv("DB_USER", "root"),
-        password=os.getenv("DB_PASSWORD", "P@rimi18"),
-        database=os.getenv("DB_NAME", "phonepe_pulse")
-    )
-    mycursor = Mydb.cursor(buffered=True)
+    get_connection_pool()
 except Exception as e:
     st.error(f"Database connection failed: {e}")
 
@@ -78,29 +98,6 @@ with st.sidebar:
         }
     )
 
-# Date filters in sidebar
-st.sidebar.markdown("### 📅 Time Filters")
-available_years = [2018, 2019, 2020, 2021, 2022, 2023, 2024]
-selected_year = st.sidebar.selectbox("Select Year", available_years, index=len(available_years)-1)
-selected_quarter = st.sidebar.selectbox("Select Quarter", [1, 2, 3, 4], index=0)
-
-# Date range selector
-st.sidebar.markdown("### 📊 Date Range")
-from_year = st.sidebar.selectbox("From Year", available_years, index=0)
-to_year = st.sidebar.selectbox("To Year", available_years, index=len(available_years)-1)
-
-# Helper function to safely convert decimal to float
-def safe_float_conversion(value):
-    """Safely convert decimal/numeric values to float"""
-    if value is None:
-        return 0.0
-    if isinstance(value, Decimal):
-        return float(value)
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return 0.0
-
 # Helper function to safely convert to list for plotly
 def safe_to_list(series):
     """Safely convert pandas series to list for plotly"""
@@ -109,29 +106,242 @@ def safe_to_list(series):
     except:
         return []
 
-# Helper function to format numbers
-def format_number(num):
-    """Format large numbers for display"""
-    num = safe_float_conversion(num)
-    if num >= 10000000:  # 1 crore
-        return f"₹{num/10000000:.2f}Cr"
-    elif num >= 100000:  # 1 lakh
-        return f"₹{num/100000:.2f}L"
-    elif num >= 1000:
-        return f"₹{num/1000:.2f}K"
-    else:
-        return f"₹{num:.2f}"
+# Timings of every query, transform, figure build and chart render, tagged
+# with page, panel and filters (PERF_LOG=<file> also appends them as JSON lines)
+DASHBOARD_DEBUG = os.getenv("DASHBOARD_DEBUG", "").strip().lower() in ("1", "true", "yes")
+PERF_SESSION = st.session_state.setdefault("perf_session", uuid.uuid4().hex[:8])
+
+@st.cache_resource
+def get_perf_log():
+    """Process-wide perf log (last timings in memory, optional JSON-lines file)"""
+    return PerfLog()
+
+def perf_timer(kind, panel, **filters):
+    """Time a block of the current page's panel"""
+    return get_perf_log().timed(kind, selected, panel, filters, PERF_SESSION)
+
+# Query cache: results are shared by every session of this process and keyed
+# on (query id, parameters, data version). A load bumps the data version, so
+# fresh data is picked up within DATA_VERSION_TTL seconds.
+DATA_VERSION_TTL = 30
+QUERY_CACHE_ENTRIES = 512
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide LRU cache of query results (QUERY_CACHE_ENTRIES)"""
+    return QueryCache(QUERY_CACHE_ENTRIES)
+
+@st.cache_data(ttl=DATA_VERSION_TTL, show_spinner=False)
+def current_data_version():
+    """Data version written by the loader"""
+    try:
+        with get_connection_pool().cursor() as cursor:
+            return get_data_version(cursor)
+    except Exception:
+        return 0
+
+@st.cache_resource(max_entries=4)
+def get_schema_catalog(data_version):
+    """Columns of every table, read in one statement per process and data version"""
+    with get_connection_pool().cursor() as cursor:
+        return SchemaCatalog.load(cursor)
 
 # Helper function to get available table columns
 def get_table_columns(table_name):
-    """Get column names for a table"""
+    """Get column names for a table (from the schema catalog, no query)"""
     try:
-        mycursor.execute(f"DESCRIBE {table_name}")
-        columns = [row[0] for row in mycursor.fetchall()]
-        return columns
+        return get_schema_catalog(current_data_version()).columns(table_name)
     except:
         return []
 
+# DASHBOARD_ENGINE=memory answers every panel from an in-process copy of the
+# fact tables instead of SQL (reloaded when the data version changes)
+USE_MEMORY_ENGINE = os.getenv("DASHBOARD_ENGINE", "sql").strip().lower() == "memory"
+
+@st.cache_resource(max_entries=1, show_spinner="Loading data into memory...")
+def get_memory_engine(data_version):
+    """Fact tables held in memory for the current data version"""
+    with get_connection_pool().cursor() as cursor:
+        return MemoryEngine.load(cursor)
+
+@st.cache_resource(max_entries=1)
+def get_pulse_cube(data_version):
+    """Year x Quarter x State cubes with time prefix sums, for range totals"""
+    with get_connection_pool().cursor() as cursor:
+        return PulseCube.load(cursor)
+
+@st.cache_resource
+def get_state_geometry(level):
+    """Vendored, pre-simplified India state outlines (no download at runtime)"""
+    return load_state_geometry(level)
+
+def geometry_caption(level):
+    """Source line shown under maps drawn with the state outlines"""
+    approximate, attribution = geometry_source(get_state_geometry(level))
+    if approximate:
+        return f"⚠️ {attribution}: borders are indicative only."
+    return f"State boundaries: {attribution}"
+
+@st.cache_resource(max_entries=1, show_spinner="Loading insurance map points...")
+def get_insurance_points(data_version):
+    """map_insurance grid points held in memory for server-side binning"""
+    with get_connection_pool().cursor() as cursor:
+        return InsurancePoints.load(cursor)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def insurance_bins(level, state, year, quarter, data_version):
+    """Hexagon bins of the insurance grid for one zoom level, area and period"""
+    return get_insurance_points(data_version).bins(level, state, year, quarter)
+
+def query_fetcher(data_version):
+    """fetch(query_id, params) running a registered query on the memory engine or a pooled connection.
+
+    The engine, catalog and pool are looked up here, on the script thread,
+    so the returned function touches no Streamlit cache and can run on a
+    worker thread.
+    """
+    if USE_MEMORY_ENGINE:
+        engine = get_memory_engine(data_version)
+        return lambda query_id, params: engine.run(query_id, **dict(params))
+    catalog = get_schema_catalog(data_version)
+    pool = get_connection_pool()
+
+    def fetch(query_id, params):
+        # Column names come from the catalog, so each query is issued exactly once
+        query = catalog.render(QUERIES[query_id], **dict(params))
+        with pool.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+    return fetch
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide LRU cache of finished panel figures (FIGURE_CACHE_MB)"""
+    return FigureCache()
+
+def show_figure(panel_id, build, data_version, **filters):
+    """Draw a panel's figure: built by build() once per filters and data version, then reused.
+
+    data_version must be the one the panel's rows were queried with, so a
+    figure is never cached under a newer version than its data.
+    """
+    key = (panel_id, tuple(sorted(filters.items())), data_version)
+    with perf_timer("figure", panel_id, **filters) as record:
+        fig, record["cached"] = get_figure_cache().get_or_build(key, build)
+    with perf_timer("render", panel_id, **filters):
+        st.plotly_chart(fig, use_container_width=True)
+
+def checked_data_version():
+    """Current data version, dropping cached results left from an older one"""
+    data_version = current_data_version()
+    if get_query_cache().switch_version(data_version):
+        get_figure_cache().clear()
+    return data_version
+
+def fetch_and_cache(fetch, query_cache, timer, key):
+    """Run a query that missed the cache under its perf timer and cache the rows.
+
+    Uses only the objects passed in, so it is safe on a worker thread.
+    """
+    query_id, params, _ = key
+    with timer as record:
+        record["cached"] = False
+        rows = fetch(query_id, params)
+        record["rows"] = len(rows)
+    query_cache.put(key, rows)
+    return rows
+
+def start_query(query_id, params, data_version, fetch, executor=None):
+    """Future of a registered query's rows for the given filters.
+
+    The cache is checked on the script thread: a hit resolves at once, a
+    miss runs the raw query on executor (inline when there is none).
+    """
+    params = tuple(sorted(params.items()))
+    key = (query_id, params, data_version)
+    query_cache = get_query_cache()
+    rows = query_cache.get(key)
+    if rows is not None:
+        with perf_timer("query", query_id, **dict(params)) as record:
+            record.update(cached=True, rows=len(rows))
+    elif executor is not None:
+        return executor.submit(fetch_and_cache, fetch, query_cache,
+                               perf_timer("query", query_id, **dict(params)), key)
+    else:
+        rows = fetch_and_cache(fetch, query_cache, perf_timer("query", query_id, **dict(params)), key)
+    future = Future()
+    future.set_result(rows)
+    return future
+
+def run_query(query_id, data_version, **params):
+    """Rows of a registered dashboard query for the given filters and data version, cached when possible"""
+    return start_query(query_id, params, data_version, query_fetcher(data_version)).result()
+
+@st.cache_resource
+def get_query_executor():
+    """Threads that run a page's queries side by side, one pooled connection each"""
+    return ThreadPoolExecutor(max_workers=get_pool_size(), thread_name_prefix="panel-query")
+
+def submit_queries(data_version, *requests):
+    """Dispatch a page's independent queries together, all for one data version.
+
+    Takes (query_id, params) pairs and returns {query_id: future}; each panel
+    calls .result() on its own future, so the first panel renders as soon as
+    its rows arrive while the others are still running, and the page takes
+    about as long as its slowest query.
+    """
+    # Cache lookups, perf timers and shared resources are resolved here, on
+    # the script thread; the workers only run the raw queries that missed
+    fetch = query_fetcher(data_version)
+    executor = get_query_executor()
+    return {query_id: start_query(query_id, params, data_version, fetch, executor)
+            for query_id, params in requests}
+
+# Tables each page reads: its filters only offer periods and states that
+# have rows in at least one of them (None = any table)
+PAGE_TABLES = {
+    "Home": None,
+    "Transaction Dynamics": ["aggregated_transaction"],
+    "Device & User Analysis": ["aggregated_user"],
+    "Insurance Analytics": ["aggregated_insurance"],
+    "Market Expansion": ["map_transaction", "top_user"],
+    "User Engagement": ["map_user"],
+    "Geo Analysis": ["aggregated_transaction", "map_user", "aggregated_insurance"],
+}
+DEFAULT_STATE = "tamil-nadu"
+
+@st.cache_resource(max_entries=1)
+def get_dimension_catalog(data_version):
+    """Years, quarters, states and districts present, listed by the loader"""
+    with get_connection_pool().cursor() as cursor:
+        return DimensionCatalog.load(cursor)
+
+# Every panel of this run reads one data version: its queries, cubes and
+# cached figures are all keyed by it, so a load published mid-run can't mix
+# rows of two snapshots or cache a figure under a version it wasn't built from
+data_version = checked_data_version()
+
+try:
+    dimensions = get_dimension_catalog(data_version)
+except Exception:
+    dimensions = DimensionCatalog([])
+page_tables = PAGE_TABLES.get(selected)
+available_years = dimensions.years(page_tables)
+if not available_years:
+    st.warning("No data loaded yet. Run scripts/extract_and_load.py to load the PhonePe Pulse data.")
+    st.stop()
+
+# Date filters in sidebar
+st.sidebar.markdown("### 📅 Time Filters")
+selected_year = st.sidebar.selectbox("Select Year", available_years, index=len(available_years)-1)
+available_quarters = dimensions.quarters(selected_year, page_tables)
+selected_quarter = st.sidebar.selectbox("Select Quarter", available_quarters, index=0)
+
+# Date range selector
+st.sidebar.markdown("### 📊 Date Range")
+from_year = st.sidebar.selectbox("From Year", available_years, index=0)
+to_year = st.sidebar.selectbox("To Year", available_years, index=len(available_years)-1)
+
 # Home Page
 if selected == "Home":
     st.markdown('<h1 class="main-header">📱 PhonePe Pulse Data Analytics Dashboard</h1>', unsafe_allow_html=True)
@@ -153,7 +363,7 @@ if selected == "Home":
         
         ### 🛠️ Technologies Used
         - **Frontend**: Streamlit, Plotly for interactive visualizations
-        - **Backend**: MySQL database with Python connectivity
+        - **Backend**: MySQL, SQLite or DuckDB database with Python connectivity
         - **Data Processing**: Pandas for data manipulation and analysis
         - **Visualization**: Plotly Express for charts and geographical maps
         """)
@@ -161,18 +371,12 @@ if selected == "Home":
     with col2:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         try:
-            # Get some quick stats
-            mycursor.execute("SELECT COUNT(DISTINCT State) FROM aggregated_transaction")
-            result = mycursor.fetchone()
+            # National totals: one precomputed row from the country-level files
+            rows = run_query("home_totals", data_version)
+            result = rows[0] if rows else None
             states_count = result[0] if result else 0
-            
-            mycursor.execute("SELECT SUM(Transacion_count) FROM aggregated_transaction")
-            result = mycursor.fetchone()
-            total_transactions = safe_float_conversion(result[0]) if result else 0
-            
-            mycursor.execute("SELECT SUM(Transacion_amount) FROM aggregated_transaction")
-            result = mycursor.fetchone()
-            total_amount = safe_float_conversion(result[0]) if result else 0
+            total_transactions = safe_float_conversion(result[1]) if result else 0
+            total_amount = safe_float_conversion(result[2]) if result else 0
             
             st.metric("Total States", f"{states_count}")
             st.metric("Total Transactions", f"{total_transactions:,.0f}" if total_transactions else "N/A")
@@ -188,43 +392,41 @@ elif selected == "Transaction Dynamics":
     
     col1, col2 = st.columns(2)
     
+    # Start every panel's query at once; each panel waits only for its own rows
+    page_queries = submit_queries(
+        data_version,
+        ("txn_top_states", dict(year=selected_year, quarter=selected_quarter)),
+        ("txn_types", dict(year=selected_year, quarter=selected_quarter))
+    )
+    
     with col1:
         st.markdown("### 💳 Transaction Amount by State")
         try:
-            query = f"""
-            SELECT State, SUM(Transacion_amount) as Total_Amount, SUM(Transacion_count) as Total_Count
-            FROM aggregated_transaction 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-            GROUP BY State 
-            ORDER BY Total_Amount DESC 
-            LIMIT 10
-            """
-            mycursor.execute(query)
-            result = mycursor.fetchall()
+            result = page_queries["txn_top_states"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['State', 'Total_Amount', 'Total_Count'])
-                
-                # Convert to float safely
-                df['Total_Amount'] = df['Total_Amount'].apply(safe_float_conversion)
-                df['Total_Count'] = df['Total_Count'].apply(safe_float_conversion)
+                with perf_timer("transform", "txn_top_states", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['State', 'Total_Amount', 'Total_Count'], numeric=['Total_Amount', 'Total_Count'])
                 
-                # Format state names for better display
-                df['State'] = df['State'].str.replace('-', ' ').str.title()
+                    # Format state names for better display
+                    df['State'] = df['State'].str.replace('-', ' ').str.title()
                 
-                fig = px.bar(df, x='State', y='Total_Amount', 
-                           title=f'Top 10 States by Transaction Amount (Q{selected_quarter} {selected_year})',
-                           color='Total_Amount',
-                           color_continuous_scale='viridis',
-                           text='Total_Amount')
-                fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-                fig.update_layout(xaxis_tickangle=45)
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.bar(df, x='State', y='Total_Amount', 
+                               title=f'Top 10 States by Transaction Amount (Q{selected_quarter} {selected_year})',
+                               color='Total_Amount',
+                               color_continuous_scale='viridis',
+                               text='Total_Amount')
+                    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+                    fig.update_layout(xaxis_tickangle=45)
+                    return fig
+
+                show_figure("txn_top_states", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show data table
                 st.markdown("#### Top States Data")
                 df_display = df.copy()
-                df_display['Total_Amount_Formatted'] = df_display['Total_Amount'].apply(format_number)
+                df_display['Total_Amount_Formatted'] = format_amounts(df_display['Total_Amount'])
                 df_display['Total_Count'] = df_display['Total_Count'].astype(int)
                 df_display.index = range(1, len(df_display) + 1)  # Add serial numbers
                 st.dataframe(df_display[['State', 'Total_Amount_Formatted', 'Total_Count']], use_container_width=True)
@@ -236,35 +438,28 @@ elif selected == "Transaction Dynamics":
     with col2:
         st.markdown("### 📈 Transaction Types Distribution")
         try:
-            query = f"""
-            SELECT Transacion_type, SUM(Transacion_count) as Count, SUM(Transacion_amount) as Amount
-            FROM aggregated_transaction 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-            GROUP BY Transacion_type
-            """
-            mycursor.execute(query)
-            result = mycursor.fetchall()
+            result = page_queries["txn_types"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['Transaction_Type', 'Count', 'Amount'])
-                
-                # Convert to float safely
-                df['Count'] = df['Count'].apply(safe_float_conversion)
-                df['Amount'] = df['Amount'].apply(safe_float_conversion)
+                with perf_timer("transform", "txn_types", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['Transaction_Type', 'Count', 'Amount'], numeric=['Count', 'Amount'])
                 
-                # Format transaction types for better display
-                df['Transaction_Type'] = df['Transaction_Type'].str.replace('-', ' ').str.title()
+                    # Format transaction types for better display
+                    df['Transaction_Type'] = df['Transaction_Type'].str.replace('-', ' ').str.title()
                 
-                fig = px.pie(df, values='Amount', names='Transaction_Type',
-                           title=f'Transaction Distribution by Type (Q{selected_quarter} {selected_year})',
-                           color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.pie(df, values='Amount', names='Transaction_Type',
+                               title=f'Transaction Distribution by Type (Q{selected_quarter} {selected_year})',
+                               color_discrete_sequence=px.colors.qualitative.Set3)
+                    fig.update_traces(textposition='inside', textinfo='percent+label')
+                    return fig
+
+                show_figure("txn_types", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show summary
                 st.markdown("#### Transaction Types Summary")
                 df_display = df.copy()
-                df_display['Amount_Formatted'] = df_display['Amount'].apply(format_number)
+                df_display['Amount_Formatted'] = format_amounts(df_display['Amount'])
                 df_display['Count'] = df_display['Count'].astype(int)
                 df_display.index = range(1, len(df_display) + 1)  # Add serial numbers
                 st.dataframe(df_display[['Transaction_Type', 'Count', 'Amount_Formatted']], use_container_width=True)
@@ -284,58 +479,43 @@ elif selected == "Device & User Analysis":
     
     col1, col2 = st.columns(2)
     
+    # Start every panel's query at once; each panel waits only for its own rows
+    page_queries = submit_queries(
+        data_version,
+        ("device_check", dict(year=selected_year, quarter=selected_quarter)),
+        ("device_top_brands", dict(year=selected_year, quarter=selected_quarter)),
+        ("users_top_states", dict(year=selected_year, quarter=selected_quarter))
+    )
+    
     with col1:
         st.markdown("### 📱 Top Device Brands by User Count")
         try:
             # First check what data is available
-            check_query = f"""
-            SELECT COUNT(*) as total_records, 
-                   COUNT(DISTINCT Device_Brand) as unique_brands,
-                   SUM(User_Count) as total_users
-            FROM aggregated_user 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND Device_Brand IS NOT NULL 
-                AND User_Count > 0
-            """
-            mycursor.execute(check_query)
-            check_result = mycursor.fetchone()
+            check_result = page_queries["device_check"].result()[0]
             
             st.info(f"Data check: {check_result[0]} records, {check_result[1]} brands, {check_result[2]} total users")
             
             if check_result[0] > 0:
-                query = f"""
-                SELECT Device_Brand, 
-                       SUM(User_Count) as Total_Users, 
-                       AVG(User_Percentage) as Avg_Percentage
-                FROM aggregated_user 
-                WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND Device_Brand IS NOT NULL 
-                    AND User_Count > 0
-                GROUP BY Device_Brand 
-                ORDER BY Total_Users DESC 
-                LIMIT 10
-                """
-                mycursor.execute(query)
-                result = mycursor.fetchall()
+                result = page_queries["device_top_brands"].result()
                 
                 if result:
-                    df = pd.DataFrame(result, columns=['Device_Brand', 'Total_Users', 'Avg_Percentage'])
-                    
-                    # Convert to float safely
-                    df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-                    df['Avg_Percentage'] = df['Avg_Percentage'].apply(safe_float_conversion)
+                    with perf_timer("transform", "device_top_brands", year=selected_year, quarter=selected_quarter):
+                        df = rows_to_frame(result, ['Device_Brand', 'Total_Users', 'Avg_Percentage'], numeric=['Total_Users', 'Avg_Percentage'])
                     
-                    # Clean device brand names
-                    df['Device_Brand'] = df['Device_Brand'].str.title()
+                        # Clean device brand names
+                        df['Device_Brand'] = df['Device_Brand'].str.title()
                     
-                    fig = px.bar(df, x='Device_Brand', y='Total_Users',
-                               title=f'Device Brand Usage (Q{selected_quarter} {selected_year})',
-                               color='Avg_Percentage',
-                               color_continuous_scale='sunset',
-                               text='Total_Users')
-                    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-                    fig.update_layout(xaxis_tickangle=45)
-                    st.plotly_chart(fig, use_container_width=True)
+                    def build_figure():
+                        fig = px.bar(df, x='Device_Brand', y='Total_Users',
+                                   title=f'Device Brand Usage (Q{selected_quarter} {selected_year})',
+                                   color='Avg_Percentage',
+                                   color_continuous_scale='sunset',
+                                   text='Total_Users')
+                        fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+                        fig.update_layout(xaxis_tickangle=45)
+                        return fig
+
+                    show_figure("device_top_brands", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                     
                     # Show data table with serial numbers
                     st.markdown("#### Device Brand Data")
@@ -350,31 +530,22 @@ elif selected == "Device & User Analysis":
                 st.warning("No device data available for selected period. Showing overall trends:")
                 
                 # Show overall device trends
-                query = """
-                SELECT Device_Brand, 
-                       SUM(User_Count) as Total_Users, 
-                       AVG(User_Percentage) as Avg_Percentage
-                FROM aggregated_user 
-                WHERE Device_Brand IS NOT NULL AND User_Count > 0
-                GROUP BY Device_Brand 
-                ORDER BY Total_Users DESC 
-                LIMIT 10
-                """
-                mycursor.execute(query)
-                result = mycursor.fetchall()
+                result = run_query("device_top_brands_all_time", data_version)
                 
                 if result:
-                    df = pd.DataFrame(result, columns=['Device_Brand', 'Total_Users', 'Avg_Percentage'])
-                    df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-                    df['Avg_Percentage'] = df['Avg_Percentage'].apply(safe_float_conversion)
-                    df['Device_Brand'] = df['Device_Brand'].str.title()
+                    with perf_timer("transform", "device_top_brands_all_time"):
+                        df = rows_to_frame(result, ['Device_Brand', 'Total_Users', 'Avg_Percentage'], numeric=['Total_Users', 'Avg_Percentage'])
+                        df['Device_Brand'] = df['Device_Brand'].str.title()
                     
-                    fig = px.bar(df, x='Device_Brand', y='Total_Users',
-                               title='Overall Device Brand Usage (All Time)',
-                               color='Avg_Percentage',
-                               color_continuous_scale='sunset')
-                    fig.update_layout(xaxis_tickangle=45)
-                    st.plotly_chart(fig, use_container_width=True)
+                    def build_figure():
+                        fig = px.bar(df, x='Device_Brand', y='Total_Users',
+                                   title='Overall Device Brand Usage (All Time)',
+                                   color='Avg_Percentage',
+                                   color_continuous_scale='sunset')
+                        fig.update_layout(xaxis_tickangle=45)
+                        return fig
+
+                    show_figure("device_top_brands_all_time", build_figure, data_version)
                     
                     # Show data table with serial numbers
                     df_display = df.copy()
@@ -393,68 +564,34 @@ elif selected == "Device & User Analysis":
             map_user_columns = get_table_columns("map_user")
             st.info(f"Map user columns: {map_user_columns}")
             
-            # Try different column name variations
-            possible_queries = [
-                f"""
-                SELECT State, SUM(RegisteredUsers) as Total_Users, SUM(AppOpens) as Total_Opens
-                FROM map_user 
-                WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND RegisteredUsers > 0
-                GROUP BY State 
-                ORDER BY Total_Users DESC 
-                LIMIT 15
-                """,
-                f"""
-                SELECT State, SUM(Registered_users) as Total_Users, SUM(App_opens) as Total_Opens
-                FROM map_user 
-                WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND Registered_users > 0
-                GROUP BY State 
-                ORDER BY Total_Users DESC 
-                LIMIT 15
-                """
-            ]
-            
-            result = None
-            for query in possible_queries:
-                try:
-                    mycursor.execute(query)
-                    result = mycursor.fetchall()
-                    if result:
-                        break
-                except Exception as query_error:
-                    continue
+            result = page_queries["users_top_states"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['State', 'Total_Users', 'Total_Opens'])
+                with perf_timer("transform", "device_user_engagement", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['State', 'Total_Users', 'Total_Opens'], numeric=['Total_Users', 'Total_Opens'])
                 
-                # Convert to float safely
-                df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-                df['Total_Opens'] = df['Total_Opens'].apply(safe_float_conversion)
+                    # Clean state names
+                    df['State'] = df['State'].str.replace('-', ' ').str.title()
                 
-                # Clean state names
-                df['State'] = df['State'].str.replace('-', ' ').str.title()
-                
-                # Calculate engagement ratio safely
-                df['Engagement_Ratio'] = df.apply(
-                    lambda row: safe_float_conversion(row['Total_Opens'] / row['Total_Users']) 
-                    if row['Total_Users'] > 0 else 0, axis=1
-                )
+                    # Calculate engagement ratio safely
+                    df['Engagement_Ratio'] = safe_ratio(df['Total_Opens'], df['Total_Users'])
                 
                 # Create scatter plot
-                fig = px.scatter(
-                    df,
-                    x='Total_Users', 
-                    y='Total_Opens',
-                    size='Engagement_Ratio',
-                    hover_name='State',
-                    title=f'User Engagement Analysis (Q{selected_quarter} {selected_year})',
-                    color='Engagement_Ratio',
-                    color_continuous_scale='plasma',
-                    labels={'Total_Users': 'Registered Users', 'Total_Opens': 'App Opens'}
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.scatter(
+                        df,
+                        x='Total_Users', 
+                        y='Total_Opens',
+                        size='Engagement_Ratio',
+                        hover_name='State',
+                        title=f'User Engagement Analysis (Q{selected_quarter} {selected_year})',
+                        color='Engagement_Ratio',
+                        color_continuous_scale='plasma',
+                        labels={'Total_Users': 'Registered Users', 'Total_Opens': 'App Opens'}
+                    )
+                    return fig
+
+                show_figure("device_user_engagement", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show top engagement states with serial numbers
                 st.markdown("#### Top Engagement States")
@@ -475,44 +612,41 @@ elif selected == "Insurance Analytics":
     
     col1, col2 = st.columns(2)
     
+    # Start every panel's query at once; each panel waits only for its own rows
+    page_queries = submit_queries(
+        data_version,
+        ("insurance_top_states", dict(year=selected_year, quarter=selected_quarter)),
+        ("insurance_types", dict(year=selected_year, quarter=selected_quarter))
+    )
+    
     with col1:
         st.markdown("### 📊 Insurance Transactions by State")
         try:
-            query = f"""
-            SELECT State, SUM(Insurance_count) as Total_Count, SUM(Insurance_amount) as Total_Amount
-            FROM aggregated_insurance 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND Insurance_count > 0 AND Insurance_amount > 0
-            GROUP BY State 
-            ORDER BY Total_Amount DESC 
-            LIMIT 15
-            """
-            mycursor.execute(query)
-            result = mycursor.fetchall()
+            result = page_queries["insurance_top_states"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['State', 'Total_Count', 'Total_Amount'])
+                with perf_timer("transform", "insurance_top_states", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['State', 'Total_Count', 'Total_Amount'], numeric=['Total_Count', 'Total_Amount'])
                 
-                # Convert to float safely
-                df['Total_Count'] = df['Total_Count'].apply(safe_float_conversion)  
-                df['Total_Amount'] = df['Total_Amount'].apply(safe_float_conversion)
+                    # Clean state names
+                    df['State'] = df['State'].str.replace('-', ' ').str.title()
                 
-                # Clean state names
-                df['State'] = df['State'].str.replace('-', ' ').str.title()
-                
-                fig = px.bar(df, x='State', y='Total_Amount',
-                           title=f'Insurance Amount by State (Q{selected_quarter} {selected_year})',
-                           color='Total_Count',
-                           color_continuous_scale='blues',
-                           text='Total_Amount')
-                fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-                fig.update_layout(xaxis_tickangle=45)
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.bar(df, x='State', y='Total_Amount',
+                               title=f'Insurance Amount by State (Q{selected_quarter} {selected_year})',
+                               color='Total_Count',
+                               color_continuous_scale='blues',
+                               text='Total_Amount')
+                    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+                    fig.update_layout(xaxis_tickangle=45)
+                    return fig
+
+                show_figure("insurance_top_states", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show data table with serial numbers
                 st.markdown("#### State-wise Insurance Data")
                 df_display = df.copy()
-                df_display['Total_Amount_Formatted'] = df_display['Total_Amount'].apply(format_number)
+                df_display['Total_Amount_Formatted'] = format_amounts(df_display['Total_Amount'])
                 df_display['Total_Count'] = df_display['Total_Count'].astype(int)
                 df_display.index = range(1, len(df_display) + 1)
                 st.dataframe(df_display[['State', 'Total_Count', 'Total_Amount_Formatted']], use_container_width=True)
@@ -524,37 +658,28 @@ elif selected == "Insurance Analytics":
     with col2:
         st.markdown("### 🏥 Insurance Types Distribution")
         try:
-            query = f"""
-            SELECT Insurance_type, SUM(Insurance_count) as Count, SUM(Insurance_amount) as Amount
-            FROM aggregated_insurance 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND Insurance_count > 0 AND Insurance_amount > 0
-            GROUP BY Insurance_type
-            HAVING SUM(Insurance_amount) > 0
-            """
-            mycursor.execute(query)
-            result = mycursor.fetchall()
+            result = page_queries["insurance_types"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['Insurance_Type', 'Count', 'Amount'])
+                with perf_timer("transform", "insurance_types", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['Insurance_Type', 'Count', 'Amount'], numeric=['Count', 'Amount'])
                 
-                # Convert to float safely
-                df['Count'] = df['Count'].apply(safe_float_conversion)
-                df['Amount'] = df['Amount'].apply(safe_float_conversion)
+                    # Clean insurance type names
+                    df['Insurance_Type'] = df['Insurance_Type'].str.replace('-', ' ').str.title()
                 
-                # Clean insurance type names
-                df['Insurance_Type'] = df['Insurance_Type'].str.replace('-', ' ').str.title()
-                
-                fig = px.pie(df, values='Amount', names='Insurance_Type',
-                           title=f'Insurance Distribution by Type (Q{selected_quarter} {selected_year})',
-                           color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.pie(df, values='Amount', names='Insurance_Type',
+                               title=f'Insurance Distribution by Type (Q{selected_quarter} {selected_year})',
+                               color_discrete_sequence=px.colors.qualitative.Set3)
+                    fig.update_traces(textposition='inside', textinfo='percent+label')
+                    return fig
+
+                show_figure("insurance_types", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show data table with serial numbers
                 st.markdown("#### Insurance Types Data")
                 df_display = df.copy()
-                df_display['Amount_Formatted'] = df_display['Amount'].apply(format_number)
+                df_display['Amount_Formatted'] = format_amounts(df_display['Amount'])
                 df_display['Count'] = df_display['Count'].astype(int)
                 df_display.index = range(1, len(df_display) + 1)
                 st.dataframe(df_display[['Insurance_Type', 'Count', 'Amount_Formatted']], use_container_width=True)
@@ -569,62 +694,55 @@ elif selected == "Market Expansion":
     st.markdown('<h1 class="main-header">🌍 Transaction Analysis for Market Expansion</h1>', unsafe_allow_html=True)
     
     # State selection for detailed analysis
-    state_options = [
-        'andaman-&-nicobar-islands', 'andhra-pradesh', 'arunachal-pradesh', 'assam', 'bihar',
-        'chandigarh', 'chhattisgarh', 'dadra-&-nagar-haveli-&-daman-&-diu', 'delhi', 'goa',
-        'gujarat', 'haryana', 'himachal-pradesh', 'jammu-&-kashmir', 'jharkhand', 'karnataka',
-        'kerala', 'ladakh', 'lakshadweep', 'madhya-pradesh', 'maharashtra', 'manipur',
-        'meghalaya', 'mizoram', 'nagaland', 'odisha', 'puducherry', 'punjab', 'rajasthan',
-        'sikkim', 'tamil-nadu', 'telangana', 'tripura', 'uttar-pradesh', 'uttarakhand', 'west-bengal'
-    ]
+    # States with rows in the tables this page reads
+    state_options = dimensions.states(page_tables)
     
-    selected_state = st.selectbox("Select State for Detailed Analysis", state_options, index=30)
+    selected_state = st.selectbox("Select State for Detailed Analysis", state_options,
+                                  index=state_options.index(DEFAULT_STATE) if DEFAULT_STATE in state_options else 0)
     
     col1, col2 = st.columns(2)
     
+    # Start every panel's query at once; each panel waits only for its own rows
+    page_queries = submit_queries(
+        data_version,
+        ("market_districts", dict(state=selected_state, year=selected_year, quarter=selected_quarter)),
+        ("market_top_user_districts", dict(state=selected_state, year=selected_year, quarter=selected_quarter))
+    )
+    
     with col1:
         st.markdown(f"### 📍 District-wise Transactions in {selected_state.title()}")
         try:
-            query = f"""
-            SELECT District, SUM(Transaction_count) as Total_Count, SUM(Transaction_amount) as Total_Amount
-            FROM map_transaction 
-            WHERE State = '{selected_state}' AND Year = {selected_year} AND Quarter = {selected_quarter}
-                AND Transaction_count > 0 AND Transaction_amount > 0
-            GROUP BY District 
-            ORDER BY Total_Amount DESC 
-            LIMIT 15
-            """
-            mycursor.execute(query)
-            result = mycursor.fetchall()
+            result = page_queries["market_districts"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['District', 'Total_Count', 'Total_Amount'])
-                
-                # Convert to float safely
-                df['Total_Count'] = df['Total_Count'].apply(safe_float_conversion)
-                df['Total_Amount'] = df['Total_Amount'].apply(safe_float_conversion)
+                with perf_timer("transform", "market_districts", state=selected_state, year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['District', 'Total_Count', 'Total_Amount'], numeric=['Total_Count', 'Total_Amount'])
                 
-                # Clean district names
-                df['District'] = df['District'].str.replace('-', ' ').str.title()
+                    # Clean district names
+                    df['District'] = df['District'].str.replace('-', ' ').str.title()
                 
-                fig = px.bar(df, x='District', y='Total_Amount',
-                           title=f'District Performance in {selected_state.replace("-", " ").title()}',
-                           color='Total_Count',
-                           color_continuous_scale='viridis',
-                           text='Total_Amount')
-                fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-                fig.update_layout(xaxis_tickangle=45)
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.bar(df, x='District', y='Total_Amount',
+                               title=f'District Performance in {selected_state.replace("-", " ").title()}',
+                               color='Total_Count',
+                               color_continuous_scale='viridis',
+                               text='Total_Amount')
+                    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+                    fig.update_layout(xaxis_tickangle=45)
+                    return fig
+
+                show_figure("market_districts", build_figure, data_version, state=selected_state, year=selected_year, quarter=selected_quarter)
                 
                 # Show district performance metrics with serial numbers
                 st.markdown("#### District Performance Metrics")
                 df_display = df.copy()
-                df_display['Total_Amount_Formatted'] = df_display['Total_Amount'].apply(format_number)
+                df_display['Total_Amount_Formatted'] = format_amounts(df_display['Total_Amount'])
                 df_display['Total_Count'] = df_display['Total_Count'].astype(int)
                 # Calculate average transaction safely
-                df_display['Avg_Transaction'] = df_display.apply(
-                    lambda row: format_number(row['Total_Amount'] / row['Total_Count']) if row['Total_Count'] > 0 else "₹0",
-                    axis=1
+                df_display['Avg_Transaction'] = np.where(
+                    df_display['Total_Count'] > 0,
+                    format_amounts(safe_ratio(df_display['Total_Amount'], df_display['Total_Count'])),
+                    "₹0"
                 )
                 df_display.index = range(1, len(df_display) + 1)
                 st.dataframe(df_display[['District', 'Total_Count', 'Total_Amount_Formatted', 'Avg_Transaction']], use_container_width=True)
@@ -640,52 +758,23 @@ elif selected == "Market Expansion":
             top_user_columns = get_table_columns("top_user")
             st.info(f"Top user columns: {top_user_columns}")
             
-            # Try different column name variations
-            possible_queries = [
-                f"""
-                SELECT District, SUM(Registered_users) as Total_Users
-                FROM top_user 
-                WHERE State = '{selected_state}' AND Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND Registered_users > 0
-                GROUP BY District 
-                ORDER BY Total_Users DESC 
-                LIMIT 10
-                """,
-                f"""
-                SELECT District, SUM(RegisteredUsers) as Total_Users
-                FROM top_user 
-                WHERE State = '{selected_state}' AND Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND RegisteredUsers > 0
-                GROUP BY District 
-                ORDER BY Total_Users DESC 
-                LIMIT 10
-                """
-            ]
-            
-            result = None
-            for query in possible_queries:
-                try:
-                    mycursor.execute(query)
-                    result = mycursor.fetchall()
-                    if result:
-                        break
-                except Exception as e:
-                    pass  # You can log or handle the exception if needed
+            result = page_queries["market_top_user_districts"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['District', 'Total_Users'])
-                
-                # Convert to float safely
-                df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
+                with perf_timer("transform", "market_top_user_districts", state=selected_state, year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['District', 'Total_Users'], numeric=['Total_Users'])
                 
-                # Clean district names
-                df['District'] = df['District'].str.replace('-', ' ').str.title()
+                    # Clean district names
+                    df['District'] = df['District'].str.replace('-', ' ').str.title()
                 
-                fig = px.treemap(df, path=['District'], values='Total_Users',
-                               title=f'User Distribution in {selected_state.replace("-", " ").title()}',
-                               color='Total_Users',
-                               color_continuous_scale='oranges')
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.treemap(df, path=['District'], values='Total_Users',
+                                   title=f'User Distribution in {selected_state.replace("-", " ").title()}',
+                                   color='Total_Users',
+                                   color_continuous_scale='oranges')
+                    return fig
+
+                show_figure("market_top_user_districts", build_figure, data_version, state=selected_state, year=selected_year, quarter=selected_quarter)
                 
                 # Show top districts with serial numbers
                 st.markdown("#### Top Districts by Users")
@@ -704,66 +793,47 @@ elif selected == "User Engagement":
     
     col1, col2 = st.columns(2)
     
+    # Start every panel's query at once; each panel waits only for its own rows
+    page_queries = submit_queries(
+        data_version,
+        ("users_trend", dict(from_year=from_year, to_year=to_year)),
+        ("users_top_states", dict(year=selected_year, quarter=selected_quarter))
+    )
+    
     with col1:
         st.markdown("### 📊 Quarterly User Growth Trend")
         try:
-            query = f"""
-            SELECT Year, Quarter, SUM(RegisteredUsers) as Total_Users, SUM(AppOpens) as Total_Opens
-            FROM map_user 
-            WHERE Year BETWEEN {from_year} AND {to_year}
-                AND RegisteredUsers > 0
-            GROUP BY Year, Quarter 
-            ORDER BY Year, Quarter
-            """
-            
-            # Try alternative column names if first query fails
-            try:
-                mycursor.execute(query)
-                result = mycursor.fetchall()
-            except:
-                query = f"""
-                SELECT Year, Quarter, SUM(Registered_users) as Total_Users, SUM(App_opens) as Total_Opens
-                FROM map_user 
-                WHERE Year BETWEEN {from_year} AND {to_year}
-                    AND Registered_users > 0
-                GROUP BY Year, Quarter 
-                ORDER BY Year, Quarter
-                """
-                mycursor.execute(query)
-                result = mycursor.fetchall()
+            result = page_queries["users_trend"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['Year', 'Quarter', 'Total_Users', 'Total_Opens'])
-                
-                # Convert to float safely
-                df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-                df['Total_Opens'] = df['Total_Opens'].apply(safe_float_conversion)
+                with perf_timer("transform", "users_trend", from_year=from_year, to_year=to_year):
+                    df = rows_to_frame(result, ['Year', 'Quarter', 'Total_Users', 'Total_Opens'], numeric=['Total_Users', 'Total_Opens'])
                 
-                # Create period column
-                df['Period'] = df['Year'].astype(str) + '-Q' + df['Quarter'].astype(str)
+                    # Create period column
+                    df['Period'] = df['Year'].astype(str) + '-Q' + df['Quarter'].astype(str)
                 
-                # Calculate engagement ratio safely
-                df['Engagement_Ratio'] = df.apply(
-                    lambda row: safe_float_conversion(row['Total_Opens'] / row['Total_Users']) 
-                    if row['Total_Users'] > 0 else 0, axis=1
-                )
+                    # Calculate engagement ratio safely
+                    df['Engagement_Ratio'] = safe_ratio(df['Total_Opens'], df['Total_Users'])
                 
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=df['Period'], y=df['Total_Users'], 
-                                       mode='lines+markers', name='Registered Users',
-                                       line=dict(color='blue', width=3)))
-                fig.add_trace(go.Scatter(x=df['Period'], y=df['Total_Opens'], 
-                                       mode='lines+markers', name='App Opens',
-                                       line=dict(color='red', width=3), yaxis='y2'))
+                def build_figure():
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=df['Period'], y=df['Total_Users'], 
+                                           mode='lines+markers', name='Registered Users',
+                                           line=dict(color='blue', width=3)))
+                    fig.add_trace(go.Scatter(x=df['Period'], y=df['Total_Opens'], 
+                                           mode='lines+markers', name='App Opens',
+                                           line=dict(color='red', width=3), yaxis='y2'))
                 
-                fig.update_layout(
-                    title='User Growth and Engagement Trends',
-                    xaxis_title='Period',
-                    yaxis=dict(title='Registered Users', side='left'),
-                    yaxis2=dict(title='App Opens', side='right', overlaying='y'),
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    fig.update_layout(
+                        title='User Growth and Engagement Trends',
+                        xaxis_title='Period',
+                        yaxis=dict(title='Registered Users', side='left'),
+                        yaxis2=dict(title='App Opens', side='right', overlaying='y'),
+                        hovermode='x unified'
+                    )
+                    return fig
+
+                show_figure("users_trend", build_figure, data_version, from_year=from_year, to_year=to_year)
                 
                 # Show trend data with serial numbers
                 st.markdown("#### Growth Trend Data")
@@ -781,57 +851,29 @@ elif selected == "User Engagement":
     with col2:
         st.markdown("### 🏅 State-wise User Rankings")
         try:
-            query = f"""
-            SELECT State, SUM(RegisteredUsers) as Total_Users, SUM(AppOpens) as Total_Opens
-            FROM map_user 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND RegisteredUsers > 0
-            GROUP BY State 
-            ORDER BY Total_Users DESC 
-            LIMIT 15
-            """
-            
-            # Try alternative column names if first query fails
-            try:
-                mycursor.execute(query)
-                result = mycursor.fetchall()
-            except:
-                query = f"""
-                SELECT State, SUM(Registered_users) as Total_Users, SUM(App_opens) as Total_Opens
-                FROM map_user 
-                WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                    AND Registered_users > 0
-                GROUP BY State 
-                ORDER BY Total_Users DESC 
-                LIMIT 15
-                """
-                mycursor.execute(query)
-                result = mycursor.fetchall()
+            result = page_queries["users_top_states"].result()
             
             if result:
-                df = pd.DataFrame(result, columns=['State', 'Total_Users', 'Total_Opens'])
+                with perf_timer("transform", "users_state_rankings", year=selected_year, quarter=selected_quarter):
+                    df = rows_to_frame(result, ['State', 'Total_Users', 'Total_Opens'], numeric=['Total_Users', 'Total_Opens'])
                 
-                # Convert to float safely
-                df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-                df['Total_Opens'] = df['Total_Opens'].apply(safe_float_conversion)
+                    # Clean state names
+                    df['State'] = df['State'].str.replace('-', ' ').str.title()
                 
-                # Clean state names
-                df['State'] = df['State'].str.replace('-', ' ').str.title()
+                    # Calculate engagement metrics
+                    df['Engagement_Score'] = safe_ratio(df['Total_Opens'], df['Total_Users'])
                 
-                # Calculate engagement metrics
-                df['Engagement_Score'] = df.apply(
-                    lambda row: safe_float_conversion(row['Total_Opens'] / row['Total_Users']) 
-                    if row['Total_Users'] > 0 else 0, axis=1
-                )
-                
-                fig = px.bar(df, x='State', y='Total_Users',
-                           title=f'State Rankings by User Base (Q{selected_quarter} {selected_year})',
-                           color='Engagement_Score',
-                           color_continuous_scale='plasma',
-                           text='Total_Users')
-                fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
-                fig.update_layout(xaxis_tickangle=45)
-                st.plotly_chart(fig, use_container_width=True)
+                def build_figure():
+                    fig = px.bar(df, x='State', y='Total_Users',
+                               title=f'State Rankings by User Base (Q{selected_quarter} {selected_year})',
+                               color='Engagement_Score',
+                               color_continuous_scale='plasma',
+                               text='Total_Users')
+                    fig.update_traces(texttemplate='%{text:.2s}', textposition='outside')
+                    fig.update_layout(xaxis_tickangle=45)
+                    return fig
+
+                show_figure("users_state_rankings", build_figure, data_version, year=selected_year, quarter=selected_quarter)
                 
                 # Show rankings with serial numbers
                 st.markdown("#### State Rankings")
@@ -848,70 +890,153 @@ elif selected == "User Engagement":
 
 # 6. Geo Analysis
 elif selected == "Geo Analysis":
-        # 🗺️ User Distribution Analysis
+    # 🗺️ State choropleth for the selected quarter, from the cube and the vendored
+    # outlines (approximate unless rebuilt from a boundary file, see the caption)
+    st.markdown("### 🗺️ State Map")
+
+    map_metrics = {"Registered Users": "Registered_Users", "App Opens": "App_Opens",
+                   "Transaction Amount": "Transaction_Amount"}
+    map_col1, map_col2 = st.columns([2, 1])
+    with map_col1:
+        map_metric = st.selectbox("Map Metric", list(map_metrics))
+    with map_col2:
+        map_detail = st.select_slider("Map Detail", options=list(GEOMETRY_LEVELS)[::-1],
+                                      value=DEFAULT_GEOMETRY_LEVEL)
+
+    try:
+        with perf_timer("query", "geo_state_map", year=selected_year, quarter=selected_quarter):
+            state_totals = get_pulse_cube(data_version).state_summary(
+                selected_year, selected_year, selected_quarter, selected_quarter)
+
+        if not state_totals.empty:
+            with perf_timer("transform", "geo_state_map", year=selected_year, quarter=selected_quarter, metric=map_metric, detail=map_detail):
+                state_totals['Id'] = state_totals['State'].map(STATE_IDS)
+                state_totals['State_Clean'] = state_totals['State'].str.replace('-', ' ').str.title()
+                metric_column = map_metrics[map_metric]
+
+            def build_figure():
+                fig = px.choropleth_map(
+                    state_totals.dropna(subset=['Id']),
+                    geojson=get_state_geometry(map_detail),
+                    locations='Id',
+                    color=metric_column,
+                    hover_name='State_Clean',
+                    hover_data={'Id': False, 'Registered_Users': ':,.0f', 'App_Opens': ':,.0f',
+                                'Transaction_Amount': ':,.0f'},
+                    color_continuous_scale='viridis',
+                    map_style='white-bg',
+                    center={"lat": 22.5, "lon": 82.5},
+                    zoom=3.3,
+                    title=f'{map_metric} by State (Q{selected_quarter} {selected_year})',
+                    labels={'Registered_Users': 'Registered Users', 'App_Opens': 'App Opens',
+                            'Transaction_Amount': 'Transaction Amount'}
+                )
+                fig.update_layout(height=650, margin={"l": 0, "r": 0, "t": 40, "b": 0})
+                return fig
+
+            show_figure("geo_state_map", build_figure, data_version, year=selected_year, quarter=selected_quarter, metric=map_metric, detail=map_detail)
+            st.caption(geometry_caption(map_detail))
+        else:
+            st.warning("No state data available for the selected period")
+
+    except Exception as e:
+        st.error(f"Error drawing state map: {e}")
+
+    # 📍 District insurance map: grid points are binned into hexagons on the
+    # server for the chosen zoom level, so the browser only draws the bins
+    st.markdown("### 📍 District Insurance Map")
+
+    pt_col1, pt_col2, pt_col3 = st.columns([2, 2, 1])
+    with pt_col1:
+        point_area = st.selectbox("Map Area", ["All India"] + dimensions.states(["map_insurance"]))
+    point_state = None if point_area == "All India" else point_area
+    point_levels = [level for level in BIN_LEVELS if point_state or level not in STATE_ONLY_LEVELS]
+    with pt_col2:
+        point_level = st.select_slider("Zoom Level", options=point_levels,
+                                       value='State' if point_state else point_levels[0])
+    with pt_col3:
+        all_quarters = st.checkbox("All Quarters")
+
+    try:
+        period = (None, None) if all_quarters else (selected_year, selected_quarter)
+        with perf_timer("query", "geo_insurance_hexagons", level=point_level, state=point_state, period=period):
+            bins = insurance_bins(point_level, point_state, *period, data_version)
+        period_label = "All Quarters" if all_quarters else f"Q{selected_quarter} {selected_year}"
+
+        if not bins.empty:
+            with perf_timer("transform", "geo_insurance_hexagons", level=point_level, state=point_state, period=period):
+                level = BIN_LEVELS[point_level]
+                # Hexagon diameter in pixels at the level's zoom (512 px tiles)
+                marker_size = max(4.0, 2 * level['size'] * 512 * 2 ** level['zoom'] / 360)
+                if point_state:
+                    center = {"lat": float(bins['Latitude'].mean()), "lon": float(bins['Longitude'].mean())}
+                else:
+                    center = {"lat": 22.5, "lon": 82.5}
+
+            def build_figure():
+                fig = go.Figure(go.Scattermap(
+                    lat=bins['Latitude'],
+                    lon=bins['Longitude'],
+                    mode='markers',
+                    marker=dict(size=marker_size, color=bins['Total'], colorscale='viridis',
+                                cmin=0, cmax=float(np.percentile(bins['Total'], 95)) or None,
+                                opacity=0.8, colorbar=dict(title='Insurance')),
+                    customdata=np.column_stack([bins['Top'].str.title(), bins['Total'], bins['Points']]),
+                    hovertemplate="%{customdata[0]}<br>Insurance: %{customdata[1]:,.0f}"
+                                  "<br>Grid points: %{customdata[2]}<extra></extra>"
+                ))
+                fig.update_layout(
+                    title=f'Insurance by {point_level} Hexagon — {point_area.replace("-", " ").title()} ({period_label})',
+                    height=650,
+                    margin={"l": 0, "r": 0, "t": 40, "b": 0},
+                    map=dict(style='white-bg', center=center, zoom=level['zoom'],
+                             layers=[dict(sourcetype='geojson', source=get_state_geometry(DEFAULT_GEOMETRY_LEVEL),
+                                          type='line', color='#999999', line=dict(width=1))])
+                )
+                return fig
+
+            show_figure("geo_insurance_hexagons", build_figure, data_version, level=point_level, state=point_state, period=period)
+            st.caption(f"{len(bins):,} hexagons from {int(bins['Points'].sum()):,} grid points. "
+                       f"{geometry_caption(DEFAULT_GEOMETRY_LEVEL)}")
+        else:
+            st.warning(f"No insurance map data for {period_label}")
+
+    except Exception as e:
+        st.error(f"Error drawing insurance map: {e}")
+
+    # 🗺️ User Distribution Analysis
     st.markdown("### 👥 User Distribution Analysis")
 
     try:
-        # Try different column name variations
-        possible_queries = [
-            f"""
-            SELECT State, SUM(RegisteredUsers) as Total_Users, SUM(AppOpens) as Total_Opens
-            FROM map_user 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND RegisteredUsers > 0
-            GROUP BY State 
-            ORDER BY Total_Users DESC
-            """,
-            f"""
-            SELECT State, SUM(Registered_users) as Total_Users, SUM(App_opens) as Total_Opens
-            FROM map_user 
-            WHERE Year = {selected_year} AND Quarter = {selected_quarter}
-                AND Registered_users > 0
-            GROUP BY State 
-            ORDER BY Total_Users DESC
-            """
-        ]
-        
-        result = None
-        for query in possible_queries:
-            try:
-                mycursor.execute(query)
-                result = mycursor.fetchall()
-                if result:
-                    break
-            except Exception as query_error:
-                continue
+        result = run_query("users_by_state", data_version, year=selected_year, quarter=selected_quarter)
 
         if result:
-            # Convert query result to DataFrame
-            df = pd.DataFrame(result, columns=['State', 'Total_Users', 'Total_Opens'])
-
-            # Convert to float safely
-            df['Total_Users'] = df['Total_Users'].apply(safe_float_conversion)
-            df['Total_Opens'] = df['Total_Opens'].apply(safe_float_conversion)
+            with perf_timer("transform", "geo_user_distribution", year=selected_year, quarter=selected_quarter):
+                # Convert query result to DataFrame
+                df = rows_to_frame(result, ['State', 'Total_Users', 'Total_Opens'], numeric=['Total_Users', 'Total_Opens'])
 
-            # Clean state names
-            df['State_Clean'] = df['State'].str.replace('-', ' ').str.title()
+                # Clean state names
+                df['State_Clean'] = df['State'].str.replace('-', ' ').str.title()
 
-            # Calculate engagement rate
-            df['Engagement_Rate'] = df.apply(
-                lambda row: safe_float_conversion(row['Total_Opens'] / row['Total_Users'])
-                if row['Total_Users'] > 0 else 0, axis=1
-            )
+                # Calculate engagement rate
+                df['Engagement_Rate'] = safe_ratio(df['Total_Opens'], df['Total_Users'])
 
             # Create bubble chart visualization
-            fig = px.scatter(
-                df, 
-                x='Total_Users', 
-                y='Total_Opens', 
-                size='Engagement_Rate', 
-                hover_name='State_Clean',
-                title=f'User Distribution & Engagement (Q{selected_quarter} {selected_year})',
-                color='Engagement_Rate',
-                color_continuous_scale='viridis',
-                labels={'Total_Users': 'Registered Users', 'Total_Opens': 'App Opens'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def build_figure():
+                fig = px.scatter(
+                    df, 
+                    x='Total_Users', 
+                    y='Total_Opens', 
+                    size='Engagement_Rate', 
+                    hover_name='State_Clean',
+                    title=f'User Distribution & Engagement (Q{selected_quarter} {selected_year})',
+                    color='Engagement_Rate',
+                    color_continuous_scale='viridis',
+                    labels={'Total_Users': 'Registered Users', 'Total_Opens': 'App Opens'}
+                )
+                return fig
+
+            show_figure("geo_user_distribution", build_figure, data_version, year=selected_year, quarter=selected_quarter)
 
             # Display tables side by side
             col1, col2 = st.columns(2)
@@ -945,6 +1070,47 @@ elif selected == "Geo Analysis":
     except Exception as e:
         st.error(f"Error in user distribution analysis: {e}")
 
+    # 📅 Totals over the sidebar's year range, answered from the prefix-sum cube
+    range_start, range_end = min(from_year, to_year), max(from_year, to_year)
+    st.markdown(f"### 📅 State Totals ({range_start}–{range_end})")
+
+    try:
+        with perf_timer("query", "geo_range_totals", from_year=range_start, to_year=range_end):
+            summary = get_pulse_cube(data_version).state_summary(range_start, range_end)
+
+        if not summary.empty and summary['Transaction_Amount'].sum() > 0:
+            with perf_timer("transform", "geo_range_totals", from_year=range_start, to_year=range_end):
+                summary['State_Clean'] = summary['State'].str.replace('-', ' ').str.title()
+                summary = summary.sort_values('Transaction_Amount', ascending=False)
+
+            def build_figure():
+                fig = px.bar(summary.head(15), x='State_Clean', y='Transaction_Amount',
+                             title=f'Top 15 States by Transaction Amount ({range_start}–{range_end})',
+                             color='App_Opens',
+                             color_continuous_scale='viridis',
+                             labels={'State_Clean': 'State', 'Transaction_Amount': 'Transaction Amount',
+                                     'App_Opens': 'App Opens'})
+                fig.update_layout(xaxis_tickangle=45)
+                return fig
+
+            show_figure("geo_range_totals", build_figure, data_version, from_year=range_start, to_year=range_end)
+
+            # Show range totals with serial numbers
+            st.markdown("#### Range Totals by State")
+            range_display = summary[['State_Clean', 'Transaction_Count', 'Registered_Users', 'App_Opens']].copy()
+            range_display['Transaction_Amount'] = format_amounts(summary['Transaction_Amount'])
+            range_display['Insurance_Amount'] = format_amounts(summary['Insurance_Amount'])
+            for column in ['Transaction_Count', 'Registered_Users', 'App_Opens']:
+                range_display[column] = range_display[column].astype(np.int64)
+            range_display.index = range(1, len(range_display) + 1)
+            st.caption("Registered users are as of the last quarter in the range; other columns are range totals.")
+            st.dataframe(range_display, use_container_width=True)
+        else:
+            st.warning("No data available for the selected year range")
+
+    except Exception as e:
+        st.error(f"Error computing range totals: {e}")
+
 
 # Summary and Insights Section
 st.markdown("---")
@@ -982,4 +1148,48 @@ with col3:
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Query cache statistics (shared by every session of this process)
+with st.sidebar.expander("⚡ Query Cache"):
+    cache_stats = get_query_cache().stats()
+    cache_hits = cache_stats["calls"] - cache_stats["misses"]
+    st.write(f"Engine: {'in-memory' if USE_MEMORY_ENGINE else 'SQL'} | Data version: {cache_stats['data_version']}")
+    st.write(f"Hits: {cache_hits:,} | Misses: {cache_stats['misses']:,}")
+    if cache_stats["calls"]:
+        st.write(f"Hit rate: {cache_hits / cache_stats['calls']:.1%}")
+    figure_stats = get_figure_cache().stats()
+    st.write(f"Figures: {figure_stats['entries']} cached ({figure_stats['bytes'] / 1024 / 1024:.1f} of "
+             f"{figure_stats['max_bytes'] / 1024 / 1024:.0f} MB) | Hits: {figure_stats['hits']:,} | "
+             f"Misses: {figure_stats['misses']:,}")
+    try:
+        pool_stats = get_connection_pool().stats()
+        st.write(f"Connections: {pool_stats['open']} open, {pool_stats['idle']} idle, "
+                 f"{pool_stats['reconnects']} reconnects")
+    except Exception:
+        pass
 
+# Performance panel (DASHBOARD_DEBUG=1): latest timings, hit rates and slow queries
+if DASHBOARD_DEBUG:
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        perf_log = get_perf_log()
+        recent = perf_log.latest(25)
+        if recent:
+            st.markdown("**Latest timings**")
+            st.dataframe(pd.DataFrame([{
+                "Page": r["page"], "Panel": r["panel"], "Step": r["kind"], "ms": r["ms"],
+                "Cached": "" if "cached" not in r else ("yes" if r["cached"] else "no"),
+                "Filters": ", ".join(f"{k}={v}" for k, v in r["filters"].items()),
+            } for r in recent]), hide_index=True, use_container_width=True)
+        hit_rates = perf_log.hit_rates()
+        if hit_rates:
+            st.write(" | ".join(f"{kind.title()} hit rate: {hits / total:.0%}"
+                                for kind, (hits, total) in hit_rates.items()))
+        slow = perf_log.slow_queries()
+        if slow:
+            st.markdown(f"**Slow queries (≥ {perf_log.slow_query_ms:.0f} ms)**")
+            st.dataframe(pd.DataFrame([{"Page": r["page"], "Query": r["panel"], "ms": r["ms"],
+                                        "Filters": ", ".join(f"{k}={v}" for k, v in r["filters"].items())}
+                                       for r in slow]), hide_index=True, use_container_width=True)
+        else:
+            st.caption(f"No queries over {perf_log.slow_query_ms:.0f} ms")
+        if perf_log.log_path:
+            st.caption(f"Logging timings to {perf_log.log_path}")